@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 import os
 from pathlib import Path
+from typing import Optional
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -14,6 +15,10 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    # gunicorn -c backend/gunicorn.conf.py: worker count, and whether the
+    # master loads the model once and shares it with the workers
+    workers: int = 1
+    prefork_preload: bool = True
     debug: bool = True
 
     model_confidence: float = 77.13  
@@ -41,6 +46,86 @@ class Settings(BaseSettings):
         / "random_forest_light_metadata.json"
     )
 
+    lookup_tables_path: str = str(
+        BASE_DIR
+        / "models_storage"
+        / "lookup_tables.json"
+    )
+    # Refuse to start when the lookup tables don't match the model's encoder
+    lookup_tables_strict: bool = False
+
+    # "sklearn" (Pipeline.predict) or "onnx" (onnxruntime, see
+    # prediction_models.export_onnx); onnx falls back to sklearn if unavailable
+    inference_backend: str = "sklearn"
+    # Defaults to model_path with an .onnx extension
+    onnx_model_path: Optional[str] = None
+    onnx_intra_op_threads: int = 1
+
+    # Threads per process for the sklearn backend (0 = available CPUs / workers),
+    # and the batch size from which forests predict on all of them
+    # (measure the crossover with prediction_models.parallel_bench)
+    predict_threads: int = 0
+    predict_parallel_min_rows: int = 1000
+
+    # Memory-mapped index behind /comparables/ (prediction_models.comparables)
+    comparables_index_dir: str = str(
+        BASE_DIR
+        / "models_storage"
+        / "comparables"
+    )
+
+    # Asynchronous /jobs/ queue (SQLite + files, see backend/services/jobs.py).
+    # job_workers > 0 starts that many worker processes with the API; with 0,
+    # run them separately: python -m backend.job_worker --workers N
+    jobs_dir: str = str(BASE_DIR / "jobs")
+    job_workers: int = 0
+    job_result_ttl_hours: float = 24.0
+    # A running job whose worker sent no heartbeat (one per scored chunk) for
+    # this long is requeued; keep it well above the time to score one chunk.
+    job_lease_seconds: float = 120.0
+
+    # Admission control in front of the scored routes (backend/services/admission.py),
+    # per worker process: concurrency caps, a bounded wait queue (503 +
+    # Retry-After when full or after the timeout) and per-client rate limits (429)
+    admission_enabled: bool = True
+    admission_max_rows: int = 100_000
+    admission_batch_rows_share: float = 0.8
+    admission_max_interactive: int = 32
+    admission_max_batch: int = 2
+    admission_queue_interactive: int = 64
+    admission_queue_batch: int = 4
+    admission_queue_timeout: float = 5.0
+    admission_max_body_mb: int = 64
+    rate_limit_rows_per_second: float = 2000.0   # 0 disables
+    rate_limit_burst_rows: float = 100_000.0
+
+    # Streaming input-drift monitor (backend/services/drift.py); the reference
+    # profile is written at training time (prediction_models.drift_reference)
+    drift_enabled: bool = True
+    drift_reference_path: str = str(
+        BASE_DIR
+        / "models_storage"
+        / "drift_reference.json"
+    )
+    drift_window_rows: int = 5000
+    drift_min_rows: int = 200
+    drift_max_pending_rows: int = 100_000
+    drift_check_interval: float = 300.0
+
+    # Startup (backend/services/warmup.py): load the scoring routes and artifacts
+    # in a background thread after the server is up (/health/ready turns 200
+    # when done), and the cold-import budget checked by python -m backend.startup_profile
+    startup_warmup_background: bool = True
+    startup_budget_seconds: float = 1.5
+
+    # Shadow evaluation (backend/services/shadow.py): comma-separated model names
+    # (models_storage/<name>.pkl) or paths scored on a sample of live requests
+    # by a background thread, e.g. "hist_gradient_boosting,random_forest_best";
+    # samples that would queue more than shadow_max_pending_rows rows are dropped
+    shadow_models: str = ""
+    shadow_sample_rate: float = 0.1
+    shadow_max_pending_rows: int = 50_000
+
     class Config:
         env_file = ".env"
 
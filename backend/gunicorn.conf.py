@@ -0,0 +1,37 @@
+"""
+Gunicorn config for multi-worker serving (see backend/services/prefork.py).
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+The app and its artifacts are loaded once in the master (preload_app) and
+shared copy-on-write by the uvicorn workers. WORKERS, API_HOST, API_PORT and
+PREFORK_PRELOAD come from the usual Settings / environment.
+"""
+
+import gc
+import os
+
+from backend.config import settings
+from backend.services.prefork import MASTER_PID_ENV
+
+# No collections while the app is imported in the master: they would free
+# and reshuffle objects right before the heap is frozen for the workers
+gc.disable()
+
+bind = f"{settings.api_host}:{settings.api_port}"
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.prefork_preload
+timeout = 60
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before the first fork."""
+    # Lets any worker find its siblings for the memory report
+    os.environ[MASTER_PID_ENV] = str(os.getpid())
+
+    if preload_app:
+        from backend.services.prefork import preload
+        preload()
+    else:
+        gc.enable()
@@ -0,0 +1,60 @@
+"""
+Standalone worker processes for the /jobs/ queue.
+
+Each worker loads the model once and scores queued jobs in chunks; the queue
+is the SQLite database under settings.jobs_dir, shared with the API, so no
+broker is needed. Use this instead of JOB_WORKERS when the API runs under
+gunicorn (several API workers, one job pool).
+
+Usage (from the repository root):
+    python -m backend.job_worker --workers 2
+"""
+
+import argparse
+import logging
+import signal
+import time
+from typing import List, Optional
+
+from backend.config import settings
+from backend.services.jobs import JobWorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run worker processes for the /jobs/ queue.")
+    parser.add_argument("--workers", type=int, default=max(settings.job_workers, 1))
+    parser.add_argument("--jobs-dir", default=settings.jobs_dir)
+    parser.add_argument("--ttl-hours", type=float, default=settings.job_result_ttl_hours)
+    parser.add_argument("--lease-seconds", type=float, default=settings.job_lease_seconds)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    pool = JobWorkerPool(args.jobs_dir, args.workers, args.ttl_hours * 3600, args.lease_seconds)
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    pool.start()
+    try:
+        while not stopping:
+            # Restart workers that died (e.g. out of memory on a huge job)
+            for i, process in enumerate(pool.processes):
+                if not process.is_alive():
+                    logger.warning(f"Job worker {process.pid} exited ({process.exitcode}); restarting")
+                    pool.processes[i] = pool.spawn()
+            time.sleep(1.0)
+    finally:
+        pool.stop()
+        print("✓ Job workers stopped")
+
+
+if __name__ == "__main__":
+    main()
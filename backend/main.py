@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.config import settings
-from backend.routes import predict, batch, health
+from backend.services.admission import AdmissionMiddleware
+from backend.services.warmup import WarmupGate, get_warmup
+from backend.routes import health
 import logging
 
 # Configure logging
@@ -15,6 +17,14 @@ app = FastAPI(
     version=settings.app_version,
 )
 
+# Bounded concurrency and load shedding for the scored routes (added first,
+# so CORS still wraps the 429 / 503 answers)
+app.add_middleware(AdmissionMiddleware)
+
+# 503 + Retry-After on the scoring routes until the background warm-up is
+# done (outside admission control, so those requests take no slot)
+app.add_middleware(WarmupGate)
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,10 +34,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
+@app.on_event("startup")
+def start_warmup():
+    """
+    Import the scoring routers, load the artifacts and start the background
+    services (drift checks, shadow evaluation, job workers); see
+    backend/services/warmup.py. In a background thread unless
+    STARTUP_WARMUP_BACKGROUND=false, so /health/live answers right away.
+    """
+    get_warmup().start(app, background=settings.startup_warmup_background)
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    from backend.services.jobs import stop_job_workers
+    stop_job_workers()
+
+# Include routers (the scoring routers are included by the warm-up)
 app.include_router(health.router)
-app.include_router(predict.router)
-app.include_router(batch.router)
 
 @app.get("/")
 def read_root():
@@ -38,8 +61,14 @@ def read_root():
         "docs": "/docs",
         "endpoints": {
             "health": "/health/",
+            "live": "/health/live",
+            "ready": "/health/ready",
             "predict": "/predict/",
             "batch": "/predict-batch/",
+            "curve": "/predict-curve/",
+            "explain": "/explain/",
+            "comparables": "/comparables/",
+            "jobs": "/jobs/",
         }
     }
 
@@ -1,11 +1,12 @@
-import joblib
 import json
 import logging
 import os
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
+# joblib / sklearn are imported where a model is loaded or inspected, so that
+# importing the app (and answering /health/live) doesn't pay for them
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +16,11 @@ class ModelLoader:
 
     _instance = None
 
-    _model: Optional[Pipeline] = None
+    _model: Optional["Pipeline"] = None
     _preprocessor = None
     _metadata: Optional[Dict[str, Any]] = None
     _feature_names = None
+    _lookup_tables: Optional[Dict[str, Any]] = None
 
     def __new__(cls):
         """Singleton pattern - only one model instance."""
@@ -45,6 +47,9 @@ class ModelLoader:
                     logger.warning(f"Model file not found: {model_path}")
                     return None
 
+                import joblib
+                from sklearn.pipeline import Pipeline
+
                 cls._model = joblib.load(model_path)
                 logger.info(f"✓ Model (Pipeline) loaded from {model_path}")
 
@@ -54,25 +59,7 @@ class ModelLoader:
                         logger.info("✓ Preprocessor extracted from Pipeline")
 
                         # === PATCH: OneHotEncoder.categories_ → string uniform ===
-                        try:
-                            transformers = getattr(
-                                cls._preprocessor, "transformers_", []
-                            )
-                            for name, transformer, cols in transformers:
-                                if isinstance(transformer, OneHotEncoder):
-                                    new_cats = []
-                                    for arr in transformer.categories_:
-                                        if arr.dtype == object:
-                                            arr_str = arr.astype(str)
-                                            new_cats.append(arr_str)
-                                        else:
-                                            new_cats.append(arr)
-                                    transformer.categories_ = new_cats
-                            logger.info("✓ Normalized OneHotEncoder.categories_ to string for object arrays")
-                        except Exception as patch_err:
-                            logger.warning(
-                                f"Could not normalize OneHotEncoder categories_ to string: {patch_err}"
-                            )
+                        cls.normalize_encoder_categories(cls._preprocessor)
 
                         # Feature names (optional)
                         try:
@@ -95,6 +82,29 @@ class ModelLoader:
         return cls._model
 
 
+    @staticmethod
+    def normalize_encoder_categories(preprocessor) -> None:
+        """Cast object OneHotEncoder.categories_ to str (requests send string columns)."""
+        from sklearn.preprocessing import OneHotEncoder
+
+        try:
+            transformers = getattr(preprocessor, "transformers_", [])
+            for name, transformer, cols in transformers:
+                if isinstance(transformer, OneHotEncoder):
+                    new_cats = []
+                    for arr in transformer.categories_:
+                        if arr.dtype == object:
+                            arr_str = arr.astype(str)
+                            new_cats.append(arr_str)
+                        else:
+                            new_cats.append(arr)
+                    transformer.categories_ = new_cats
+            logger.info("✓ Normalized OneHotEncoder.categories_ to string for object arrays")
+        except Exception as patch_err:
+            logger.warning(
+                f"Could not normalize OneHotEncoder categories_ to string: {patch_err}"
+            )
+
     # ========================================================================
     # PREPROCESSOR
     # ========================================================================
@@ -107,6 +117,9 @@ class ModelLoader:
         if cls._preprocessor is not None:
             return cls._preprocessor
 
+        import joblib
+        from sklearn.pipeline import Pipeline
+
         # 1) Încearcă din pipeline
         model = cls.load_model()
         if model is not None and isinstance(model, Pipeline):
@@ -185,6 +198,53 @@ class ModelLoader:
 
         return cls._metadata
 
+    # ========================================================================
+    # LOOKUP TABLES
+    # ========================================================================
+    @classmethod
+    def load_lookup_tables(cls, lookup_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Load the lookup-table artifact (model frequencies, vocabularies) from JSON."""
+        if lookup_path is None:
+            from backend.config import settings
+            lookup_path = settings.lookup_tables_path
+
+        if cls._lookup_tables is None:
+            try:
+                if not os.path.exists(lookup_path):
+                    logger.warning(f"Lookup tables file not found: {lookup_path}")
+                    return None
+
+                with open(lookup_path, "r", encoding="utf-8") as f:
+                    cls._lookup_tables = json.load(f)
+
+                logger.info(f"✓ Lookup tables loaded from {lookup_path}")
+
+            except Exception as e:
+                logger.error(f"Error loading lookup tables: {str(e)}")
+                cls._lookup_tables = None
+                return None
+
+        return cls._lookup_tables
+
+    # ========================================================================
+    # ENCODER CATEGORIES
+    # ========================================================================
+    @classmethod
+    def get_encoder_categories(cls) -> Optional[Dict[str, list]]:
+        """Map each one-hot encoded column to its categories_, if a model is loaded."""
+        preprocessor = cls.load_preprocessor()
+        if preprocessor is None:
+            return None
+
+        from sklearn.preprocessing import OneHotEncoder
+
+        categories: Dict[str, list] = {}
+        for name, transformer, cols in getattr(preprocessor, "transformers_", []):
+            if isinstance(transformer, OneHotEncoder):
+                for col, cats in zip(cols, transformer.categories_):
+                    categories[col] = [str(c) for c in cats]
+        return categories
+
     # ========================================================================
     # FEATURE NAMES
     # ========================================================================
@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic import BaseModel, Field
 
 class CarPredictionRequest(BaseModel):
@@ -12,6 +14,9 @@ class CarPredictionRequest(BaseModel):
     caroserie: str = Field(..., description="Body type")
     culoare: str = Field(..., description="Car color")
     cutie_viteza: str = Field(..., description="Transmission type")
+    descriere: Optional[str] = Field(
+        None, max_length=20000, description="Listing description (used by text-feature models)"
+    )
 
 class PricePrediction(BaseModel):
     """Response schema for price prediction"""
@@ -26,3 +31,85 @@ class BatchPredictionResponse(BaseModel):
     """Response schema for batch predictions"""
     car: dict
     prediction: dict
+
+class ComparableListing(BaseModel):
+    """One real listing close to the requested car"""
+    marca: str
+    model: str
+    an_fabricatie: int
+    rulaj: int
+    putere: int
+    capacitate_motor: int
+    combustibil: Optional[str] = None
+    caroserie: Optional[str] = None
+    cutie_viteza: Optional[str] = None
+    pret: float = Field(..., description="Listed price in EUR")
+    distance: float = Field(..., description="Distance to the requested car (lower is closer)")
+
+class ComparablesResponse(BaseModel):
+    """Response schema for comparable listings"""
+    partition: str = Field(..., description="marca|model slice searched (or the brand, as a fallback)")
+    comparables: List[ComparableListing]
+    median_price: Optional[float] = Field(None, description="Median price of the comparables")
+
+class SweepRange(BaseModel):
+    """Evenly spaced values from start to stop (inclusive)"""
+    start: float
+    stop: float
+    num: int = Field(10, ge=1, le=100, description="Number of values")
+
+class PriceCurveRequest(BaseModel):
+    """Base car plus the fields to sweep; several ranges make a grid"""
+    car: CarPredictionRequest
+    rulaj: Optional[SweepRange] = Field(None, description="Mileage sweep (km)")
+    an_fabricatie: Optional[SweepRange] = Field(None, description="Year sweep")
+    putere: Optional[SweepRange] = Field(None, description="Power sweep (HP)")
+
+class CurvePoint(BaseModel):
+    """Prediction for one grid point"""
+    rulaj: int
+    an_fabricatie: int
+    putere: float
+    predicted: float
+    min_price: float
+    max_price: float
+
+class PriceCurveResponse(BaseModel):
+    """Grid predictions, row-major over the swept axes (in axes order)"""
+    axes: Dict[str, List[float]] = Field(..., description="Values of every swept field")
+    shape: List[int]
+    points: List[CurvePoint]
+    confidence: float = Field(..., description="Model confidence percentage")
+
+class FieldContribution(BaseModel):
+    """Share of the price attributed to one request field"""
+    field: str
+    log_contribution: float = Field(..., description="Additive effect on log(price + 1)")
+    percent: float = Field(..., description="Multiplicative effect on the price, in %")
+    eur: float = Field(..., description="EUR share; base_price + sum(eur) = predicted")
+
+class FeatureContribution(BaseModel):
+    """Contribution of one engineered feature"""
+    feature: str
+    log_contribution: float
+
+class ExplanationResponse(BaseModel):
+    """Response schema for a price explanation"""
+    predicted: float = Field(..., description="Predicted price in EUR")
+    base_price: float = Field(..., description="Price of the average training car")
+    contributions: List[FieldContribution]
+    top_features: List[FeatureContribution]
+
+class JobStatus(BaseModel):
+    """Status and progress of an asynchronous batch job"""
+    job_id: str
+    status: str = Field(..., description="queued, running, done, failed, cancelled or expired")
+    n_rows: int
+    processed: int
+    progress_percent: float
+    cancel_requested: bool
+    created_at: float = Field(..., description="Unix timestamps")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = Field(None, description="When the result file is deleted")
+    error: Optional[str] = None
@@ -1,46 +1,62 @@
-from fastapi import APIRouter, HTTPException
+import time
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
 from backend.models.schemas import CarPredictionRequest
+from backend.services.columnar import ColumnarError, dumps, loads, parse_columnar, score_columns
+from backend.services.drift import observe_features
 from backend.services.feature_engineer import engineer_features
 from backend.services.predictor import predict_price, price_confidence_interval
+from backend.services.shadow import shadow_submit
 from backend.config import settings
 
 router = APIRouter(prefix="/predict-batch", tags=["batch"])
 
 
+def _predict_cars(cars: List[CarPredictionRequest]) -> List[dict]:
+    predictions = []
+
+    for car_data in cars:
+        # 1) Feature engineering for this car
+        features = engineer_features(car_data)
+        observe_features(features)
+
+        # 2) Point prediction
+        start = time.perf_counter()
+        predicted_price = predict_price(features)
+        shadow_submit(features, predicted_price, (time.perf_counter() - start) * 1000)
+
+        # 3) Interval based on percentage (MAPE) + small absolute floor
+        interval = price_confidence_interval(predicted_price, features)
+
+        predictions.append({
+            "car": {
+                "marca": car_data.marca,
+                "model": car_data.model,
+                "an_fabricatie": car_data.an_fabricatie,
+                "rulaj": car_data.rulaj,
+            },
+            "prediction": {
+                "predicted": predicted_price,
+                "min_price": interval["min_price"],
+                "max_price": interval["max_price"],
+                "margin": interval["margin"],
+                "confidence": interval.get("confidence"),
+                "residual_std": settings.model_mae,
+            },
+        })
+
+    return predictions
+
+
 @router.post("/")
 async def predict_batch(cars: List[CarPredictionRequest]):
     """Predict prices for multiple cars."""
     try:
-        predictions = []
-
-        for car_data in cars:
-            # 1) Feature engineering for this car
-            features = engineer_features(car_data)
-
-            # 2) Point prediction
-            predicted_price = predict_price(features)
-
-            # 3) Interval based on percentage (MAPE) + small absolute floor
-            interval = price_confidence_interval(predicted_price, features)
-
-            predictions.append({
-                "car": {
-                    "marca": car_data.marca,
-                    "model": car_data.model,
-                    "an_fabricatie": car_data.an_fabricatie,
-                    "rulaj": car_data.rulaj,
-                },
-                "prediction": {
-                    "predicted": predicted_price,
-                    "min_price": interval["min_price"],
-                    "max_price": interval["max_price"],
-                    "margin": interval["margin"],
-                    "confidence": interval.get("confidence"),
-                    "residual_std": settings.model_mae,
-                },
-            })
+        # Off the event loop, so admission control and other requests keep running
+        predictions = await run_in_threadpool(_predict_cars, cars)
 
         return {
             "count": len(predictions),
@@ -52,3 +68,36 @@ async def predict_batch(cars: List[CarPredictionRequest]):
             status_code=400,
             detail=f"Batch prediction error: {str(e)}",
         )
+
+
+@router.post("/columnar")
+async def predict_batch_columnar(request: Request):
+    """
+    Columnar batch: one array per CarPredictionRequest field in, one array
+    per prediction field out (same order), scored in a single model call.
+    """
+    try:
+        payload = loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+
+    try:
+        columns, n_rows = parse_columnar(payload)
+    except ColumnarError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    try:
+        predicted, intervals = await run_in_threadpool(score_columns, columns, True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Batch prediction error: {str(e)}")
+
+    body = dumps({
+        "count": n_rows,
+        "predicted": predicted,
+        "min_price": intervals["min_price"],
+        "max_price": intervals["max_price"],
+        "margin": intervals["margin"],
+        "confidence": intervals["confidence"],
+        "residual_std": settings.model_mae,
+    })
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,45 @@
+import statistics
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.models.schemas import CarPredictionRequest, ComparablesResponse
+from backend.services.comparables import get_comparables_index
+from backend.services.feature_engineer import build_features
+
+router = APIRouter(prefix="/comparables", tags=["comparables"])
+
+@router.post("/", response_model=ComparablesResponse)
+async def comparables_endpoint(
+    car_data: CarPredictionRequest,
+    k: int = Query(5, ge=1, le=50, description="Number of listings to return"),
+):
+    """Closest real listings (same brand and model when possible) with their prices"""
+    index = get_comparables_index()
+    if index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Comparables index not available (python -m prediction_models.comparables)",
+        )
+
+    try:
+        features = build_features(
+            car_data.marca,
+            car_data.model,
+            car_data.an_fabricatie,
+            car_data.rulaj,
+            car_data.putere,
+            car_data.capacitate_motor,
+            car_data.combustibil,
+            car_data.caroserie,
+            car_data.culoare,
+            car_data.cutie_viteza,
+        )
+        result = index.query(features, k=k)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Comparables error: {str(e)}")
+
+    prices = [c["pret"] for c in result["comparables"]]
+    return ComparablesResponse(
+        partition=result["partition"],
+        comparables=result["comparables"],
+        median_price=statistics.median(prices) if prices else None,
+    )
@@ -0,0 +1,79 @@
+import itertools
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from backend.models.schemas import PriceCurveRequest, PriceCurveResponse
+from backend.services.feature_engineer import engineer_features_grid
+from backend.services.predictor import predict_prices, price_confidence_interval
+
+router = APIRouter(prefix="/predict-curve", tags=["predictions"])
+
+# Largest grid scored in one request
+MAX_GRID_POINTS = 2500
+
+# Swept field -> (min, max) accepted by CarPredictionRequest, and value type
+SWEEP_FIELDS = {
+    "rulaj": ((0, None), int),
+    "an_fabricatie": ((2000, 2025), int),
+    "putere": ((1, None), float),
+}
+
+
+def _axis_values(name: str, sweep) -> List[Any]:
+    (low, high), cast = SWEEP_FIELDS[name]
+    values = np.linspace(sweep.start, sweep.stop, sweep.num)
+    if cast is int:
+        values = np.rint(values)
+
+    if values.min() < low or (high is not None and values.max() > high):
+        raise HTTPException(
+            status_code=422,
+            detail=f"{name} sweep must stay within [{low}, {high if high is not None else '∞'}]",
+        )
+    # Duplicates appear when a short integer range is asked for many values
+    return [cast(v) for v in dict.fromkeys(values.tolist())]
+
+
+@router.post("/", response_model=PriceCurveResponse)
+async def predict_curve(request: PriceCurveRequest):
+    """Price against mileage / year / power for one car, scored in a single model call"""
+    axes: Dict[str, List[Any]] = {
+        name: _axis_values(name, getattr(request, name))
+        for name in SWEEP_FIELDS
+        if getattr(request, name) is not None
+    }
+    if not axes:
+        raise HTTPException(status_code=422, detail="Give at least one of rulaj, an_fabricatie, putere")
+
+    shape = [len(v) for v in axes.values()]
+    if int(np.prod(shape)) > MAX_GRID_POINTS:
+        raise HTTPException(status_code=422, detail=f"Grid too large (max {MAX_GRID_POINTS} points)")
+
+    points = [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+    try:
+        features = engineer_features_grid(request.car, points)
+        prices = predict_prices(features)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+    base = request.car
+    results = []
+    for point, price in zip(points, prices.tolist()):
+        interval = price_confidence_interval(price)
+        results.append({
+            "rulaj": point.get("rulaj", base.rulaj),
+            "an_fabricatie": point.get("an_fabricatie", base.an_fabricatie),
+            "putere": point.get("putere", base.putere),
+            "predicted": price,
+            "min_price": interval["min_price"],
+            "max_price": interval["max_price"],
+        })
+
+    return PriceCurveResponse(
+        axes=axes,
+        shape=shape,
+        points=results,
+        confidence=interval["confidence"],
+    )
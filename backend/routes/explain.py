@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from backend.model_loader import ModelLoader
+from backend.models.schemas import CarPredictionRequest, ExplanationResponse
+from backend.services.explainer import explain_row, get_explainer
+from backend.services.feature_engineer import engineer_features
+
+router = APIRouter(prefix="/explain", tags=["predictions"])
+
+@router.post("/", response_model=ExplanationResponse)
+async def explain_price(car_data: CarPredictionRequest):
+    """Per-field contributions (EUR and %) to the predicted price"""
+    model = ModelLoader.load_model()
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not available")
+
+    try:
+        explainer = get_explainer(model)
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    try:
+        features = engineer_features(car_data)
+        return ExplanationResponse(**explain_row(explainer, features))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Explanation error: {str(e)}")
@@ -1,11 +1,35 @@
 from fastapi import APIRouter
-from backend.model_loader import ModelLoader
+from fastapi.responses import JSONResponse
+from backend.services.warmup import get_warmup
+
+# The service modules behind these endpoints are imported inside them: this
+# router is served before the warm-up has imported numpy / pandas / sklearn
 
 router = APIRouter(tags=["health"])
 
+@router.get("/health/live")
+def liveness():
+    """The process is up and serving (never waits for the warm-up)"""
+    return {"status": "ok"}
+
+@router.get("/health/ready")
+def readiness():
+    """200 once the scoring routes and artifacts are loaded, 503 while warming up or failed"""
+    warmup = get_warmup().status()
+    if warmup["status"] == "failed":
+        return JSONResponse(status_code=503, content=warmup)
+    if warmup["status"] != "ready":
+        return JSONResponse(status_code=503, content=warmup, headers={"Retry-After": "1"})
+    return warmup
+
 @router.get("/health/")
 def health_check():
     """Health check endpoint"""
+    from backend.model_loader import ModelLoader
+    from backend.services.lookup_tables import lookup_status
+    from backend.services.comparables import comparables_status
+    from backend.services.predictor import inference_backend_status
+
     try:
         model_info = ModelLoader.get_model_info()
 
@@ -32,4 +56,32 @@ def health_check():
         "version": "1.0.0",
         "model_status": model_status,
         "model_info": model_info,
+        "lookup_tables": lookup_status(),
+        "comparables": comparables_status(),
+        "inference_backend": inference_backend_status(),
+        "warmup": get_warmup().status(),
     }
+
+@router.get("/health/memory")
+def memory_status():
+    """Shared vs. private RSS of every worker (and the pre-fork master)"""
+    from backend.services.prefork import memory_report
+    return memory_report()
+
+@router.get("/health/admission")
+def admission_status():
+    """In-flight work, queue depths and shed counts of the admission controller"""
+    from backend.services.admission import admission_stats
+    return admission_stats()
+
+@router.get("/health/drift")
+def drift_status():
+    """PSI / KS scores of recent requests against the training reference profile"""
+    from backend.services.drift import drift_report
+    return drift_report()
+
+@router.get("/health/shadow")
+def shadow_status():
+    """Latency and price differences of the shadow models against the serving model"""
+    from backend.services.shadow import shadow_summary
+    return shadow_summary()
@@ -0,0 +1,110 @@
+import io
+from typing import List
+
+import pandas as pd
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from backend.models.schemas import JobStatus
+from backend.services.columnar import COLUMN_SPECS, MAX_JOB_ROWS, ColumnarError, loads, parse_columnar
+from backend.services.jobs import STATUS_DONE, STATUS_EXPIRED, get_job_store, job_view
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _submit(payload) -> JobStatus:
+    try:
+        columns, n_rows = parse_columnar(payload, max_rows=MAX_JOB_ROWS)
+    except ColumnarError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    store = get_job_store()
+    job_id = store.submit(columns, n_rows)
+    return JobStatus(**job_view(store.get(job_id)))
+
+
+def _submit_json(body: bytes) -> JobStatus:
+    try:
+        payload = loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+
+    if isinstance(payload, list):
+        if not all(isinstance(row, dict) for row in payload):
+            raise HTTPException(status_code=422, detail="A list body must contain car objects")
+        fields = {name for row in payload for name in row}
+        payload = {name: [row.get(name) for row in payload] for name in fields}
+
+    return _submit(payload)
+
+
+def _submit_csv(data: bytes) -> JobStatus:
+    string_columns = {name: str for name, (kind, _, _) in COLUMN_SPECS.items() if kind is str}
+    try:
+        df = pd.read_csv(io.BytesIO(data), dtype=string_columns)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
+
+    payload = {}
+    for name in df.columns:
+        if string_columns.get(name) is str:
+            payload[name] = df[name].astype(object).where(df[name].notna(), None).tolist()
+        else:
+            payload[name] = df[name].tolist()
+    return _submit(payload)
+
+
+@router.post("/", response_model=JobStatus, status_code=202)
+async def submit_job(request: Request):
+    """
+    Queue a batch: columnar JSON (see /predict-batch/columnar) or a list of
+    car objects. Poll GET /jobs/{job_id}, then download /jobs/{job_id}/result.
+    """
+    body = await request.body()
+    # Parsing up to MAX_JOB_ROWS rows and writing the input file run off the event loop
+    return await run_in_threadpool(_submit_json, body)
+
+
+@router.post("/file", response_model=JobStatus, status_code=202)
+async def submit_job_file(file: UploadFile = File(..., description="CSV with one column per request field")):
+    """Queue a CSV upload (header = CarPredictionRequest field names)."""
+    return await run_in_threadpool(_submit_csv, await file.read())
+
+
+@router.get("/", response_model=List[JobStatus])
+async def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """Most recent jobs first"""
+    return [JobStatus(**job_view(job)) for job in get_job_store().list(limit)]
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    """Status and progress of a job"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job_view(job))
+
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    """CSV of the input rows with predicted, min_price, max_price and margin"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == STATUS_EXPIRED:
+        raise HTTPException(status_code=410, detail="Job result expired")
+    if job["status"] != STATUS_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+    return FileResponse(job["result_path"], media_type="text/csv", filename=f"predictions_{job_id}.csv")
+
+
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one after its current chunk"""
+    store = get_job_store()
+    if store.cancel(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job_view(store.get(job_id)))
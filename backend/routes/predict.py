@@ -1,7 +1,11 @@
+import time
+
 from fastapi import APIRouter, HTTPException
 from backend.models.schemas import CarPredictionRequest, PricePrediction
+from backend.services.drift import observe_features
 from backend.services.feature_engineer import engineer_features
 from backend.services.predictor import predict_price, price_confidence_interval
+from backend.services.shadow import shadow_submit
 from backend.config import settings
 
 router = APIRouter(prefix="/predict", tags=["predictions"])
@@ -11,7 +15,10 @@ async def predict_price_endpoint(car_data: CarPredictionRequest):
     """Predict car price based on features"""
     try:
         features = engineer_features(car_data)
+        observe_features(features)
+        start = time.perf_counter()
         predicted_price = predict_price(features)
+        shadow_submit(features, predicted_price, (time.perf_counter() - start) * 1000)
         interval = price_confidence_interval(predicted_price, features)
 
         return PricePrediction(
@@ -0,0 +1,428 @@
+"""
+Admission control: bounded concurrency, bounded waiting and fast load
+shedding in front of the prediction routes.
+
+Every POST to a scored route is classified (interactive: /predict/,
+/predict-curve/, /explain/, /comparables/; batch: /predict-batch/ and /jobs/,
+whose inputs are parsed and stored per row) and costed in rows (estimated
+from the body without parsing it). When its class queue is already full a
+request is shed before its body is read. A request
+is admitted when its class is below its concurrency cap and the rows in
+flight stay under settings.admission_max_rows (batch may only use
+admission_batch_rows_share of them, so single predictions always have
+headroom). Otherwise it waits in a bounded queue, interactive requests
+first, until admission_queue_timeout; a full queue or an expired wait is
+answered at once with 503 + Retry-After. A per-client token bucket (rows per
+second, keyed by X-API-Key or client address) answers 429 + Retry-After.
+
+State is per process (one event loop per uvicorn / gunicorn worker), so
+limits apply per worker. stats() backs GET /health/admission.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY = {INTERACTIVE: 0, BATCH: 1}
+
+# Path prefix -> class; other paths (health, docs, GETs) are never limited
+ROUTE_CLASSES = [
+    ("/predict-batch", BATCH),
+    ("/predict-curve", INTERACTIVE),
+    ("/predict", INTERACTIVE),
+    ("/explain", INTERACTIVE),
+    ("/comparables", INTERACTIVE),
+    ("/jobs", BATCH),           # parsing and storing the input is per row; workers do the scoring
+]
+
+MAX_CLIENTS = 10_000        # token buckets kept before idle ones are dropped
+EWMA_ALPHA = 0.2
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    if method != "POST":
+        return None
+    for prefix, cls in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return cls
+    return None
+
+
+def estimate_rows(path: str, body: bytes) -> int:
+    """Rows in a request body, counted on the raw bytes (no JSON parsing)."""
+    if path.startswith("/jobs/file"):
+        # CSV upload: one line per row after the header (multipart framing included)
+        return max(body.count(b"\n") - 1, 1)
+    if not path.startswith(("/predict-batch", "/jobs")):
+        return 1
+    # Row format: one "marca" key per car
+    rows = body.count(b'"marca"')
+    columnar = path.startswith("/predict-batch/columnar") or (
+        path.startswith("/jobs") and body.lstrip().startswith(b"{")
+    )
+    if rows == 1 and columnar:
+        # Columnar: elements of the (numeric, so comma-free) year array
+        start = body.find(b'"an_fabricatie"')
+        start = body.find(b"[", start) if start >= 0 else -1
+        end = body.find(b"]", start) if start >= 0 else -1
+        if end > start:
+            rows = body.count(b",", start, end) + 1
+    return max(rows, 1)
+
+
+class AdmissionRejected(Exception):
+    """Request shed before reaching the route."""
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+# ============================================================================
+# TOKEN BUCKETS
+# ============================================================================
+
+class TokenBuckets:
+    """Per-client token buckets (tokens = rows), refilled at rate per second."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str, cost: float, now: Optional[float] = None) -> float:
+        """Take cost tokens; returns 0 when allowed, else seconds until it would be."""
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.burst)
+        tokens, last = self.buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+        self.buckets[client] = (tokens, now)
+
+        # Least recently seen first; a dropped bucket was (nearly) full anyway
+        while len(self.buckets) > MAX_CLIENTS:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+# ============================================================================
+# CONTROLLER
+# ============================================================================
+
+class _Waiter:
+    __slots__ = ("cls", "rows", "seq", "future", "since")
+
+    def __init__(self, cls: str, rows: int, seq: int, future: asyncio.Future):
+        self.cls = cls
+        self.rows = rows
+        self.seq = seq
+        self.future = future
+        self.since = time.monotonic()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_rows: int,
+        batch_rows_share: float,
+        max_requests: Dict[str, int],
+        max_queue: Dict[str, int],
+        queue_timeout: float,
+        rate_limit: float = 0.0,
+        rate_burst: float = 0.0,
+    ):
+        self.max_rows = max_rows
+        self.max_batch_rows = max(1, int(max_rows * batch_rows_share))
+        self.max_requests = max_requests
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.buckets = TokenBuckets(rate_limit, rate_burst) if rate_limit > 0 else None
+
+        self.in_flight = {cls: 0 for cls in PRIORITY}
+        self.rows_in_flight = {cls: 0 for cls in PRIORITY}
+        self.waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+        self.admitted = {cls: 0 for cls in PRIORITY}
+        self.shed: Dict[str, int] = {}
+        self.max_queue_depth = {cls: 0 for cls in PRIORITY}
+        self.service_seconds = {cls: 0.0 for cls in PRIORITY}   # EWMA
+        self.wait_seconds = {cls: 0.0 for cls in PRIORITY}      # EWMA of queued waits
+
+    # ------------------------------------------------------------------
+    def _fits(self, cls: str, rows: int) -> bool:
+        if self.in_flight[cls] >= self.max_requests[cls]:
+            return False
+        # An oversized request may still run alone
+        total = sum(self.rows_in_flight.values())
+        if total and total + rows > self.max_rows:
+            return False
+        if cls == BATCH and self.rows_in_flight[BATCH] and self.rows_in_flight[BATCH] + rows > self.max_batch_rows:
+            return False
+        return True
+
+    def _grant(self, cls: str, rows: int) -> None:
+        self.in_flight[cls] += 1
+        self.rows_in_flight[cls] += rows
+        self.admitted[cls] += 1
+
+    def _wake(self) -> None:
+        """Admit waiters in priority / arrival order; a blocked class blocks its later waiters."""
+        blocked = set()
+        for waiter in sorted(self.waiters, key=lambda w: (PRIORITY[w.cls], w.seq)):
+            if waiter.cls in blocked:
+                continue
+            if self._fits(waiter.cls, waiter.rows):
+                self.waiters.remove(waiter)
+                self._grant(waiter.cls, waiter.rows)
+                waiter.future.set_result(True)
+            else:
+                blocked.add(waiter.cls)
+
+    def _queue_depth(self, cls: str) -> int:
+        return sum(1 for w in self.waiters if w.cls == cls)
+
+    def _retry_after(self, cls: str) -> float:
+        """Rough time until a queued slot frees: queue ahead x service time / concurrency."""
+        ahead = self._queue_depth(cls) + self.in_flight[cls]
+        return ahead * self.service_seconds[cls] / max(self.max_requests[cls], 1)
+
+    def _reject(self, status_code: int, reason: str, detail: str, retry_after: float) -> AdmissionRejected:
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        return AdmissionRejected(status_code, reason, detail, retry_after)
+
+    # ------------------------------------------------------------------
+    def check_queue(self, cls: str) -> None:
+        """
+        Shed a request of cls before its body is read: with waiters of its
+        class queued it could not be admitted at once, and the queue is full.
+        """
+        depth = self._queue_depth(cls)
+        if depth and depth >= self.max_queue[cls]:
+            raise self._reject(503, f"{cls}_queue_full", "Server busy, try again later", self._retry_after(cls))
+
+    async def acquire(self, cls: str, rows: int, client: str) -> None:
+        """Wait for a slot or raise AdmissionRejected."""
+        rows = min(rows, self.max_rows)
+
+        if self.buckets is not None:
+            wait = self.buckets.take(client, rows)
+            if wait > 0:
+                raise self._reject(429, "rate_limited", "Too many requests for this client", wait)
+
+        has_priority_waiters = any(PRIORITY[w.cls] <= PRIORITY[cls] for w in self.waiters)
+        if not has_priority_waiters and self._fits(cls, rows):
+            self._grant(cls, rows)
+            return
+
+        if self._queue_depth(cls) >= self.max_queue[cls]:
+            raise self._reject(503, f"{cls}_queue_full", "Server busy, try again later", self._retry_after(cls))
+
+        waiter = _Waiter(cls, rows, next(self._seq), asyncio.get_running_loop().create_future())
+        self.waiters.append(waiter)
+        self.max_queue_depth[cls] = max(self.max_queue_depth[cls], self._queue_depth(cls))
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued
+            self._abandon(waiter)
+            raise
+
+        if not waiter.future.done():
+            self._abandon(waiter)
+            raise self._reject(503, f"{cls}_queue_timeout", "Server busy, try again later", self._retry_after(cls))
+
+        waited = time.monotonic() - waiter.since
+        self.wait_seconds[cls] += EWMA_ALPHA * (waited - self.wait_seconds[cls])
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter.future.done():
+            # Granted at the last moment: hand the slot back
+            self.release(waiter.cls, waiter.rows, None)
+        else:
+            self.waiters.remove(waiter)
+            waiter.future.cancel()
+
+    def release(self, cls: str, rows: int, service_seconds: Optional[float]) -> None:
+        rows = min(rows, self.max_rows)
+        self.in_flight[cls] -= 1
+        self.rows_in_flight[cls] -= rows
+        if service_seconds is not None:
+            self.service_seconds[cls] += EWMA_ALPHA * (service_seconds - self.service_seconds[cls])
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limits": {
+                "max_rows_in_flight": self.max_rows,
+                "max_batch_rows_in_flight": self.max_batch_rows,
+                "max_requests": self.max_requests,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout,
+                "rate_limit_rows_per_second": self.buckets.rate if self.buckets else None,
+                "rate_limit_burst_rows": self.buckets.burst if self.buckets else None,
+            },
+            "classes": {
+                cls: {
+                    "in_flight": self.in_flight[cls],
+                    "rows_in_flight": self.rows_in_flight[cls],
+                    "queue_depth": self._queue_depth(cls),
+                    "max_queue_depth": self.max_queue_depth[cls],
+                    "admitted": self.admitted[cls],
+                    "avg_service_ms": round(self.service_seconds[cls] * 1000, 2),
+                    "avg_queued_wait_ms": round(self.wait_seconds[cls] * 1000, 2),
+                }
+                for cls in PRIORITY
+            },
+            "shed": dict(self.shed),
+            "shed_total": sum(self.shed.values()),
+            "tracked_clients": len(self.buckets.buckets) if self.buckets else 0,
+        }
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class AdmissionMiddleware:
+    """ASGI middleware: buffer the body, cost it, admit or shed, then run the route."""
+
+    def __init__(self, app, controller: Optional["AdmissionController"] = None, max_body_bytes: Optional[int] = None):
+        self.app = app
+        self.controller = controller
+        self.max_body_bytes = max_body_bytes
+
+    def _controller(self) -> Optional["AdmissionController"]:
+        if self.controller is None:
+            self.controller = get_admission_controller()
+        return self.controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        cls = route_class(scope["method"], scope["path"])
+        controller = self._controller() if cls is not None else None
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        max_body = self.max_body_bytes
+        if max_body is None:
+            from backend.config import settings
+            max_body = settings.admission_max_body_mb * 1024 * 1024
+
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > max_body:
+            await _respond(send, 413, "body_too_large", f"Request body larger than {max_body} bytes", None)
+            return
+
+        try:
+            controller.check_queue(cls)
+        except AdmissionRejected as e:
+            await _respond(send, e.status_code, e.reason, e.detail, e.retry_after)
+            return
+
+        # Buffer the body (needed anyway by the route) to cost the request
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_body:
+                await _respond(send, 413, "body_too_large", f"Request body larger than {max_body} bytes", None)
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        rows = estimate_rows(scope["path"], body)
+        api_key = headers.get(b"x-api-key")
+        if api_key:
+            client = "key:" + api_key.decode("latin-1")
+        else:
+            client = (scope.get("client") or ("unknown", 0))[0]
+
+        try:
+            await controller.acquire(cls, rows, client)
+        except AdmissionRejected as e:
+            await _respond(send, e.status_code, e.reason, e.detail, e.retry_after)
+            return
+
+        body_sent = False
+
+        async def replay():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            controller.release(cls, rows, time.perf_counter() - start)
+
+
+async def _respond(send, status_code: int, reason: str, detail: str, retry_after: Optional[int]) -> None:
+    body = json.dumps({"detail": detail, "reason": reason}).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Process-wide controller built from settings (None when disabled)."""
+    global _controller
+    from backend.config import settings
+
+    if not settings.admission_enabled:
+        return None
+    if _controller is None:
+        _controller = AdmissionController(
+            max_rows=settings.admission_max_rows,
+            batch_rows_share=settings.admission_batch_rows_share,
+            max_requests={INTERACTIVE: settings.admission_max_interactive, BATCH: settings.admission_max_batch},
+            max_queue={INTERACTIVE: settings.admission_queue_interactive, BATCH: settings.admission_queue_batch},
+            queue_timeout=settings.admission_queue_timeout,
+            rate_limit=settings.rate_limit_rows_per_second,
+            rate_burst=settings.rate_limit_burst_rows,
+        )
+    return _controller
+
+
+def admission_stats() -> Dict[str, Any]:
+    controller = get_admission_controller()
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.stats()}
@@ -0,0 +1,220 @@
+"""
+Columnar batch format: one JSON array per CarPredictionRequest field.
+
+    {"marca": ["Audi", "BMW"], "model": ["A4", "X3"], "an_fabricatie": [2016, 2019], ...}
+
+Instead of validating one pydantic object per car, every column is checked
+at once with numpy against the constraints declared on CarPredictionRequest
+(types, ge/le/gt, max_length), and the response is a set of parallel arrays
+encoded with orjson (plain json when orjson is not installed).
+"""
+
+import json
+import time
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.models.schemas import CarPredictionRequest
+from backend.services.drift import observe_features
+from backend.services.feature_engineer import RAW_LISTING_COLUMNS, engineer_features_frame
+from backend.services.predictor import predict_prices, price_confidence_intervals
+from backend.services.shadow import shadow_submit
+from backend.services.text_features import TEXT_COLUMN
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+MAX_COLUMNAR_ROWS = 100_000
+MAX_JOB_ROWS = 2_000_000    # /jobs/ inputs are scored in chunks by the job workers
+MAX_REPORTED_ROWS = 10      # offending row indices listed per error
+
+
+class ColumnarError(ValueError):
+    """Invalid columnar payload; errors is a list of per-column problems."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid column(s)")
+        self.errors = errors
+
+
+def _field_spec(field) -> Tuple[type, bool, Dict[str, float]]:
+    """(base type, required, bounds) of a CarPredictionRequest field."""
+    annotation = field.annotation
+    if typing.get_origin(annotation) is typing.Union:
+        annotation = next(a for a in typing.get_args(annotation) if a is not type(None))
+
+    bounds: Dict[str, float] = {}
+    for constraint in field.metadata:
+        for name in ("ge", "gt", "le", "lt", "max_length"):
+            if hasattr(constraint, name):
+                bounds[name] = getattr(constraint, name)
+    return annotation, field.is_required(), bounds
+
+
+# Derived once from the request schema, so the two formats can't drift apart
+COLUMN_SPECS = {name: _field_spec(field) for name, field in CarPredictionRequest.model_fields.items()}
+
+
+# ============================================================================
+# REQUEST
+# ============================================================================
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _bad_rows(mask: np.ndarray) -> List[int]:
+    return np.flatnonzero(mask)[:MAX_REPORTED_ROWS].tolist()
+
+
+def _check_numeric(name: str, values: list, kind: type, bounds: Dict[str, float], errors: list) -> Optional[np.ndarray]:
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        bad = [i for i, v in enumerate(values) if isinstance(v, bool) or not isinstance(v, (int, float))]
+        errors.append({"column": name, "error": "must contain only numbers", "rows": bad[:MAX_REPORTED_ROWS]})
+        return None
+
+    if array.ndim != 1:
+        errors.append({"column": name, "error": "must be a flat array", "rows": []})
+        return None
+
+    checks = [(~np.isfinite(array), "must be finite numbers")]
+    if kind is int:
+        checks.append((array != np.floor(array), "must be integers"))
+    if "ge" in bounds:
+        checks.append((array < bounds["ge"], f"must be >= {bounds['ge']}"))
+    if "gt" in bounds:
+        checks.append((array <= bounds["gt"], f"must be > {bounds['gt']}"))
+    if "le" in bounds:
+        checks.append((array > bounds["le"], f"must be <= {bounds['le']}"))
+    if "lt" in bounds:
+        checks.append((array >= bounds["lt"], f"must be < {bounds['lt']}"))
+
+    ok = True
+    for mask, message in checks:
+        if mask.any():
+            errors.append({"column": name, "error": message, "rows": _bad_rows(mask)})
+            ok = False
+    return array if ok else None
+
+
+def _check_strings(name: str, values: list, required: bool, bounds: Dict[str, float], errors: list) -> Optional[list]:
+    allowed = (str,) if required else (str, type(None))
+    bad = [i for i, v in enumerate(values) if not isinstance(v, allowed)]
+    if bad:
+        expected = "strings" if required else "strings or null"
+        errors.append({"column": name, "error": f"must contain only {expected}", "rows": bad[:MAX_REPORTED_ROWS]})
+        return None
+
+    if "max_length" in bounds:
+        lengths = np.fromiter((len(v) if v else 0 for v in values), dtype=np.int64, count=len(values))
+        too_long = lengths > bounds["max_length"]
+        if too_long.any():
+            errors.append({
+                "column": name,
+                "error": f"must be at most {bounds['max_length']} characters",
+                "rows": _bad_rows(too_long),
+            })
+            return None
+    return values
+
+
+def parse_columnar(payload: Any, max_rows: int = MAX_COLUMNAR_ROWS) -> Tuple[Dict[str, Any], int]:
+    """
+    Validate a decoded columnar payload (at most max_rows rows).
+
+    Returns ({field: numpy array or list}, n_rows); raises ColumnarError.
+    """
+    if not isinstance(payload, dict):
+        raise ColumnarError([{"column": None, "error": "body must be a JSON object of arrays", "rows": []}])
+
+    errors: List[Dict[str, Any]] = []
+    unknown = sorted(set(payload) - set(COLUMN_SPECS))
+    if unknown:
+        errors.append({"column": ", ".join(unknown), "error": "unknown column(s)", "rows": []})
+
+    missing = [name for name, (_, required, _) in COLUMN_SPECS.items() if required and name not in payload]
+    if missing:
+        errors.append({"column": ", ".join(missing), "error": "missing column(s)", "rows": []})
+
+    not_lists = [name for name in payload if name in COLUMN_SPECS and not isinstance(payload[name], list)]
+    if not_lists:
+        errors.append({"column": ", ".join(not_lists), "error": "must be arrays", "rows": []})
+    if errors:
+        raise ColumnarError(errors)
+
+    lengths = {name: len(values) for name, values in payload.items()}
+    n_rows = max(lengths.values(), default=0)
+    if len(set(lengths.values())) > 1:
+        raise ColumnarError([{"column": None, "error": f"columns have different lengths: {lengths}", "rows": []}])
+    if n_rows == 0:
+        raise ColumnarError([{"column": None, "error": "no rows", "rows": []}])
+    if n_rows > max_rows:
+        raise ColumnarError([{"column": None, "error": f"at most {max_rows} rows per request", "rows": []}])
+
+    columns: Dict[str, Any] = {}
+    for name, (kind, required, bounds) in COLUMN_SPECS.items():
+        if name not in payload:
+            continue
+        if kind in (int, float):
+            columns[name] = _check_numeric(name, payload[name], kind, bounds, errors)
+        else:
+            columns[name] = _check_strings(name, payload[name], required, bounds, errors)
+
+    if errors:
+        raise ColumnarError(errors)
+    return columns, n_rows
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+# Request fields in the order of RAW_LISTING_COLUMNS / build_features
+COLUMNAR_FIELDS = [
+    "marca", "model", "an_fabricatie", "rulaj", "putere", "capacitate_motor",
+    "combustibil", "caroserie", "culoare", "cutie_viteza",
+]
+
+
+def score_columns(columns: Dict[str, Any], monitor: bool = False) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Predicted prices and their intervals for validated columns, in one model
+    call; with monitor (live traffic) the features also feed the drift
+    monitor and the shadow evaluation.
+    """
+    listings = pd.DataFrame({
+        raw: columns[field] for raw, field in zip(RAW_LISTING_COLUMNS, COLUMNAR_FIELDS)
+    })
+    features = engineer_features_frame(listings)
+    descriere = columns.get("descriere")
+    features[TEXT_COLUMN] = [d or "" for d in descriere] if descriere is not None else ""
+    if monitor:
+        observe_features(features)
+
+    start = time.perf_counter()
+    predicted = predict_prices(features)
+    if monitor:
+        shadow_submit(features, predicted, (time.perf_counter() - start) * 1000)
+    return predicted, price_confidence_intervals(predicted)
+
+
+# ============================================================================
+# RESPONSE
+# ============================================================================
+
+def dumps(payload: Dict[str, Any]) -> bytes:
+    """JSON bytes; numpy arrays are serialized natively by orjson."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in payload.items()},
+        separators=(",", ":"),
+    ).encode("utf-8")
@@ -0,0 +1,208 @@
+"""
+Compact, flat-array representation of a fitted RandomForestRegressor.
+
+Built offline by prediction_models.compress and pickled in place of the
+forest inside the Pipeline, so serving code (Pipeline.predict) is unchanged.
+
+Layout: all trees are stored depth-first in four shared arrays
+    feature    int16/int32  split feature
+    threshold  float32      split threshold (rounded down, see below)
+    right      int32        right child; the left child is always node + 1
+    leaf       uint8/uint16/float32  leaf value (quantized code or float32)
+
+Leaves have threshold -inf and right == self, so every row can be walked for
+max_depth steps through all trees at once without masking.
+
+sklearn compares float32(x) <= float64(threshold); rounding the threshold
+down to the nearest float32 keeps exactly the same decisions.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+LEAF_PRECISIONS = ("float32", "uint16", "uint8")
+
+
+class CompactForest(RegressorMixin, BaseEstimator):
+    """Mean of compact regression trees (prediction-only)."""
+
+    def __init__(self, leaf_precision: str = "uint16"):
+        self.leaf_precision = leaf_precision
+
+    # ========================================================================
+    # CONSTRUCTION
+    # ========================================================================
+    @classmethod
+    def from_forest(cls, forest, leaf_precision: str = "uint16", prune: bool = True) -> "CompactForest":
+        """
+        Convert a fitted RandomForestRegressor (single output).
+
+        Leaf values are quantized to leaf_precision; with prune=True, splits
+        whose leaves all end up with the same stored value are collapsed into
+        a single leaf (identical leaves merge).
+        """
+        if leaf_precision not in LEAF_PRECISIONS:
+            raise ValueError(f"leaf_precision must be one of {LEAF_PRECISIONS}")
+
+        trees = [est.tree_ for est in forest.estimators_]
+        values = [t.value[:, 0, 0].astype(np.float64) for t in trees]
+
+        is_leaf = [t.children_left == -1 for t in trees]
+        lo = float(min(v[leaf].min() for v, leaf in zip(values, is_leaf)))
+        hi = float(max(v[leaf].max() for v, leaf in zip(values, is_leaf)))
+
+        compact = cls(leaf_precision=leaf_precision)
+        if leaf_precision != "float32":
+            compact.leaf_offset_ = lo
+            compact.leaf_scale_ = (hi - lo) / np.iinfo(leaf_precision).max or 1.0
+        else:
+            compact.leaf_offset_ = 0.0
+            compact.leaf_scale_ = 1.0
+
+        parts = [compact._flatten_tree(t, v, prune) for t, v in zip(trees, values)]
+        compact._pack(parts)
+        compact.n_features_in_ = int(forest.n_features_in_)
+        compact.n_nodes_original_ = int(sum(t.node_count for t in trees))
+        return compact
+
+    def _encode_leaf(self, value: np.ndarray) -> np.ndarray:
+        if self.leaf_precision != "float32":
+            codes = np.rint((value - self.leaf_offset_) / self.leaf_scale_)
+            return np.clip(codes, 0, np.iinfo(self.leaf_precision).max).astype(self.leaf_precision)
+        return value.astype(np.float32)
+
+    def _flatten_tree(self, tree, values: np.ndarray, prune: bool):
+        """Depth-first re-indexing of one tree -> (feature, threshold, right, leaf, depth)."""
+        left, right = tree.children_left, tree.children_right
+        leaf_values = self._encode_leaf(values)
+
+        # sklearn numbers children after their parent, so a reverse sweep is bottom-up
+        collapsed = left == -1
+        if prune:
+            for node in range(tree.node_count - 1, -1, -1):
+                l, r = left[node], right[node]
+                if l != -1 and collapsed[l] and collapsed[r] and leaf_values[l] == leaf_values[r]:
+                    collapsed[node] = True
+                    leaf_values[node] = leaf_values[l]
+
+        thresholds = tree.threshold.astype(np.float32)
+        too_high = thresholds.astype(np.float64) > tree.threshold
+        thresholds[too_high] = np.nextafter(thresholds[too_high], np.float32(-np.inf))
+
+        feature: List[int] = []
+        threshold: List[float] = []
+        right_out: List[int] = []
+        leaf_out: List = []
+        max_depth = 0
+
+        # Explicit stack: (original node, depth, slot in parent's right[] to patch)
+        stack = [(0, 0, -1)]
+        while stack:
+            node, depth, parent_slot = stack.pop()
+            new_id = len(feature)
+            if parent_slot >= 0:
+                right_out[parent_slot] = new_id
+            max_depth = max(max_depth, depth)
+
+            if collapsed[node]:
+                feature.append(0)
+                threshold.append(-np.inf)
+                right_out.append(new_id)
+                leaf_out.append(leaf_values[node])
+            else:
+                feature.append(int(tree.feature[node]))
+                threshold.append(thresholds[node])
+                right_out.append(-1)  # patched when the right child is emitted
+                leaf_out.append(0)
+                # Right is pushed first so the left child comes next (node + 1)
+                stack.append((right[node], depth + 1, new_id))
+                stack.append((left[node], depth + 1, -1))
+
+        return (
+            np.asarray(feature, dtype=np.int32),
+            np.asarray(threshold, dtype=np.float32),
+            np.asarray(right_out, dtype=np.int32),
+            np.asarray(leaf_out, dtype=leaf_values.dtype),
+            max_depth,
+        )
+
+    def _pack(self, parts) -> None:
+        sizes = [len(p[0]) for p in parts]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+
+        feature = np.concatenate([p[0] for p in parts])
+        feature_dtype = np.int16 if feature.max(initial=0) < np.iinfo(np.int16).max else np.int32
+
+        self.feature_ = feature.astype(feature_dtype)
+        self.threshold_ = np.concatenate([p[1] for p in parts])
+        self.right_ = np.concatenate([p[2] + off for p, off in zip(parts, offsets[:-1])]).astype(np.int32)
+        self.leaf_ = np.concatenate([p[3] for p in parts])
+        self.tree_depths_ = np.asarray([p[4] for p in parts], dtype=np.int32)
+        self.tree_offsets_ = offsets
+
+    def _tree_parts(self, t: int):
+        start, end = self.tree_offsets_[t], self.tree_offsets_[t + 1]
+        return (
+            self.feature_[start:end],
+            self.threshold_[start:end],
+            self.right_[start:end] - start,
+            self.leaf_[start:end],
+            int(self.tree_depths_[t]),
+        )
+
+    def subset(self, trees: Sequence[int]) -> "CompactForest":
+        """New forest with only the given trees (used by greedy tree dropping)."""
+        out = CompactForest(leaf_precision=self.leaf_precision)
+        out.leaf_offset_ = self.leaf_offset_
+        out.leaf_scale_ = self.leaf_scale_
+        out.n_features_in_ = self.n_features_in_
+        out.n_nodes_original_ = self.n_nodes_original_
+        out._pack([self._tree_parts(int(t)) for t in trees])
+        return out
+
+    # ========================================================================
+    # PREDICTION
+    # ========================================================================
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_depths_)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature_)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature_, self.threshold_, self.right_, self.leaf_))
+
+    def _decode_leaf(self, codes: np.ndarray) -> np.ndarray:
+        if self.leaf_precision != "float32":
+            return self.leaf_offset_ + codes.astype(np.float64) * self.leaf_scale_
+        return codes.astype(np.float64)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node id reached in every tree, shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        nodes = np.broadcast_to(self.tree_offsets_[:-1], (X.shape[0], self.n_trees)).copy()
+        rows = np.arange(X.shape[0])[:, None]
+
+        for _ in range(int(self.tree_depths_.max(initial=0))):
+            go_left = X[rows, self.feature_[nodes]] <= self.threshold_[nodes]
+            nodes = np.where(go_left, nodes + 1, self.right_[nodes])
+        return nodes
+
+    def predict_trees(self, X) -> np.ndarray:
+        """Per-tree predictions, shape (n_samples, n_trees)."""
+        return self._decode_leaf(self.leaf_[self.apply(X)])
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_trees(X).mean(axis=1)
+
+    def fit(self, X, y=None):
+        # Kept because a Pipeline's last step must have fit()
+        raise TypeError(
+            "CompactForest is a prediction-only export and cannot be fitted; "
+            "build it from a fitted forest with CompactForest.from_forest()"
+        )
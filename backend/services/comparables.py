@@ -0,0 +1,174 @@
+"""
+Comparable listings: the k real listings closest to a car, with their prices.
+
+The index is built offline (prediction_models.comparables) from the training
+matrix. Rows are sorted by (marca, model_simplified) so every partition is a
+contiguous slice; the arrays are memory-mapped at startup and a query only
+reads the slice of its partition, never the whole dataset.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "manifest.json"
+INDEX_FORMAT = 1
+
+# Distance = sum(((x - q) / scale)^2) over the numeric features
+# + CATEGORY_PENALTY for every categorical mismatch
+NUMERIC_FEATURES = ["an fabricatie", "rulaj", "putere", "capacitate motor"]
+FEATURE_SCALES = {"an fabricatie": 2.0, "rulaj": 0.35, "putere": 25.0, "capacitate motor": 300.0}
+LOG_FEATURES = {"rulaj"}
+CATEGORICAL_FEATURES = ["combustibil", "caroserie", "cutie viteza"]
+CATEGORY_PENALTY = 1.0
+
+
+def partition_key(marca: Any, model: Any) -> str:
+    return f"{str(marca or '').strip().lower()}|{str(model or '').strip().lower()}"
+
+
+def scale_points(numeric: np.ndarray) -> np.ndarray:
+    """Raw numeric features (n x 4) -> scaled distance space (float32)."""
+    points = np.asarray(numeric, dtype=np.float64).copy()
+    for i, col in enumerate(NUMERIC_FEATURES):
+        if col in LOG_FEATURES:
+            points[:, i] = np.log1p(np.clip(points[:, i], 0, None))
+        points[:, i] /= FEATURE_SCALES[col]
+    return points.astype(np.float32)
+
+
+class ComparablesIndex:
+    """Memory-mapped, partitioned nearest-neighbour index."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.points = load("points")        # scaled numeric features
+        self.numeric = load("numeric")      # raw numeric features, for the response
+        self.codes = load("codes")          # categorical codes
+        self.labels = load("labels")        # marca / model codes, for the response
+        self.prices = load("prices")
+
+        self.partitions: Dict[str, Tuple[int, int]] = {
+            k: tuple(v) for k, v in self.manifest["partitions"].items()
+        }
+        self.brands: Dict[str, Tuple[int, int]] = {
+            k: tuple(v) for k, v in self.manifest["brands"].items()
+        }
+        self.vocabularies: Dict[str, List[str]] = self.manifest["vocabularies"]
+        self._code_of = {
+            col: {v.lower(): i for i, v in enumerate(self.vocabularies[col])}
+            for col in CATEGORICAL_FEATURES
+        }
+        self.version = self.manifest.get("version", "unknown")
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def _slice_for(self, marca: str, model_simplified: str, k: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+        """Partition of the car: its model when known and large enough, else its brand."""
+        key = partition_key(marca, model_simplified)
+        span = self.partitions.get(key)
+        if span and str(model_simplified).upper() != "UNKNOWN" and span[1] - span[0] >= k:
+            return key, span
+        brand = str(marca or "").strip().lower()
+        return brand, self.brands.get(brand)
+
+    def query(self, features: Dict[str, Any], k: int = 5) -> Dict[str, Any]:
+        """k nearest listings to an engineered feature dict (see build_features)."""
+        partition, span = self._slice_for(features.get("marca"), features.get("model_simplified"), k)
+        if span is None:
+            return {"partition": partition, "comparables": []}
+
+        start, end = span
+        q_numeric = np.array([[float(features[c]) for c in NUMERIC_FEATURES]])
+        q_point = scale_points(q_numeric)[0]
+
+        diff = self.points[start:end] - q_point
+        dist = np.einsum("ij,ij->i", diff, diff)
+
+        codes = self.codes[start:end]
+        for j, col in enumerate(CATEGORICAL_FEATURES):
+            q_code = self._code_of[col].get(str(features.get(col) or "").strip().lower(), -1)
+            dist = dist + CATEGORY_PENALTY * (codes[:, j] != q_code)
+
+        k = min(k, end - start)
+        nearest = np.argpartition(dist, k - 1)[:k] if k < len(dist) else np.arange(len(dist))
+        nearest = nearest[np.argsort(dist[nearest], kind="stable")]
+
+        return {
+            "partition": partition,
+            "comparables": [self._listing(start + int(i), float(np.sqrt(dist[i]))) for i in nearest],
+        }
+
+    def _listing(self, row: int, distance: float) -> Dict[str, Any]:
+        marca_code, model_code = (int(v) for v in self.labels[row])
+        year, rulaj, putere, capacitate = (float(v) for v in self.numeric[row])
+        listing = {
+            "marca": self.vocabularies["marca"][marca_code],
+            "model": self.vocabularies["model"][model_code],
+            "an_fabricatie": int(year),
+            "rulaj": int(rulaj),
+            "putere": int(putere),
+            "capacitate_motor": int(capacitate),
+            "pret": float(self.prices[row]),
+            "distance": round(distance, 4),
+        }
+        for j, col in enumerate(CATEGORICAL_FEATURES):
+            code = int(self.codes[row, j])
+            listing[col.replace(" ", "_")] = self.vocabularies[col][code] if code >= 0 else None
+        return listing
+
+
+# ============================================================================
+# PROCESS-WIDE INDEX
+# ============================================================================
+
+_index: Optional[ComparablesIndex] = None
+_status: Dict[str, Any] = {"status": "not_loaded"}
+
+
+def init_comparables_index(index_dir: Optional[str] = None) -> Optional[ComparablesIndex]:
+    """Memory-map the index; a missing index only disables the endpoint."""
+    global _index, _status
+
+    if index_dir is None:
+        from backend.config import settings
+        index_dir = settings.comparables_index_dir
+
+    if not os.path.exists(os.path.join(index_dir, MANIFEST_NAME)):
+        logger.warning(f"Comparables index not found: {index_dir}")
+        _index = None
+        _status = {"status": "missing", "path": index_dir}
+        return None
+
+    try:
+        _index = ComparablesIndex(index_dir)
+        _status = {"status": "ok", "version": _index.version, "listings": len(_index)}
+        logger.info(f"✓ Comparables index {_index.version} mapped ({len(_index)} listings)")
+    except Exception as e:
+        logger.error(f"Error loading comparables index: {str(e)}")
+        _index = None
+        _status = {"status": "error", "error": str(e)}
+
+    return _index
+
+
+def get_comparables_index() -> Optional[ComparablesIndex]:
+    if _index is None and _status.get("status") == "not_loaded":
+        return init_comparables_index()
+    return _index
+
+
+def comparables_status() -> Dict[str, Any]:
+    return dict(_status)
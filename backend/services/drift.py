@@ -0,0 +1,512 @@
+"""
+Streaming input-drift monitor.
+
+Every scored request queues its engineered features (O(1) on the request
+path); a daemon thread folds them every second into constant-memory sketches:
+    numeric      fixed-bin histograms (bins = deciles of the training data)
+    categorical  a count-min sketch (frequencies) and a Space-Saving top-k
+                 (heavy hitters, so new values show up by name)
+    UNKNOWN      rows whose model maps to model_simplified="UNKNOWN"
+
+A reference profile with the same bins is written at training time
+(models_storage/drift_reference.json, see prediction_models.drift_reference).
+report() compares the sketches of the last two windows with it: PSI per
+feature, a binned KS distance for numeric features and the UNKNOWN rate.
+The same thread runs the comparison every settings.drift_check_interval
+seconds and logs features that drifted. State is per process.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+REFERENCE_FORMAT = 1
+
+NUMERIC_MONITORED = ["rulaj", "an fabricatie", "putere", "capacitate motor"]
+CATEGORICAL_MONITORED = ["marca", "model_simplified", "combustibil", "caroserie", "cutie viteza"]
+MONITORED_COLUMNS = NUMERIC_MONITORED + CATEGORICAL_MONITORED
+UNKNOWN_MODEL = "UNKNOWN"
+
+REFERENCE_QUANTILES = [i / 10 for i in range(1, 10)]
+REFERENCE_TOP_VALUES = 50   # categories kept by name in the reference; the rest is "other"
+OTHER = "__other__"
+
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+CMS_CACHE_SIZE = 4096       # distinct values whose counter positions are memoized
+TOP_K = 20
+SLICE_ROWS = 1000           # frames this large are trimmed to the monitored columns when queued
+DRAIN_INTERVAL = 1.0        # seconds between folds of queued frames into the sketches
+
+PSI_EPSILON = 1e-4
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def psi_status(psi: float) -> str:
+    if psi >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def psi(current: np.ndarray, reference: np.ndarray) -> float:
+    """Population stability index of two proportion vectors over the same buckets."""
+    current = np.clip(np.asarray(current, dtype=np.float64), PSI_EPSILON, None)
+    reference = np.clip(np.asarray(reference, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+# ============================================================================
+# SKETCHES
+# ============================================================================
+
+class FixedBinHistogram:
+    """Counts per bin; bin i holds values in [edges[i-1], edges[i])."""
+
+    def __init__(self, edges: List[float]):
+        self.edges = [float(e) for e in edges]
+        self._edges_array = np.asarray(self.edges, dtype=np.float64)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.missing = 0
+
+    def add_many(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        finite = ~np.isnan(values)
+        self.missing += int((~finite).sum())
+        bins = np.searchsorted(self._edges_array, values[finite], side="right")
+        for i, n in enumerate(np.bincount(bins, minlength=len(self.counts)).tolist()):
+            self.counts[i] += n
+
+    def merge(self, other: "FixedBinHistogram") -> "FixedBinHistogram":
+        merged = FixedBinHistogram(self.edges)
+        merged.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        merged.missing = self.missing + other.missing
+        return merged
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+class CountMinSketch:
+    """Frequency estimates (never below the true count) in depth x width counters."""
+
+    def __init__(self, width: int = CMS_WIDTH, depth: int = CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, value: str) -> Tuple[int, ...]:
+        return _cms_columns(value, self.width, self.depth)
+
+    def add(self, value: str, count: int = 1) -> None:
+        self.table[self._rows, self._columns(value)] += count
+
+    def estimate(self, value: str) -> int:
+        return int(self.table[self._rows, self._columns(value)].min())
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        merged = CountMinSketch(self.width, self.depth)
+        merged.table = self.table + other.table
+        return merged
+
+
+@lru_cache(maxsize=CMS_CACHE_SIZE)
+def _cms_columns(value: str, width: int, depth: int) -> Tuple[int, ...]:
+    """
+    One counter per row from independent 32-bit slices of a blake2b digest.
+
+    Rows must hash independently: with hash((row, value)) two values that
+    collide in one row collided in every row, and the extra rows added nothing.
+    """
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=4 * depth).digest()
+    return tuple(int.from_bytes(digest[4 * row:4 * row + 4], "little") % width for row in range(depth))
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in k counters (Metwally et al.); counts may overestimate."""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+
+    def add(self, value: str, count: int = 1) -> None:
+        if value in self.counts or len(self.counts) < self.k:
+            self.counts[value] = self.counts.get(value, 0) + count
+            return
+        # Replace the smallest counter; the newcomer inherits its count
+        victim = min(self.counts, key=self.counts.__getitem__)
+        self.counts[value] = self.counts.pop(victim) + count
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        merged = SpaceSaving(self.k)
+        combined = Counter(self.counts) + Counter(other.counts)
+        merged.counts = dict(combined.most_common(self.k))
+        return merged
+
+    def top(self, n: Optional[int] = None) -> List[tuple]:
+        return sorted(self.counts.items(), key=lambda kv: -kv[1])[: n or self.k]
+
+
+class CategoricalSketch:
+    def __init__(self):
+        self.cms = CountMinSketch()
+        self.top = SpaceSaving()
+        self.total = 0
+
+    def add(self, value: Any, count: int = 1) -> None:
+        # Case-insensitive: serving may spell models like the encoder, training like the listing
+        value = OTHER if value is None or value is pd.NA or value != value else str(value).lower()
+        self.cms.add(value, count)
+        self.top.add(value, count)
+        self.total += count
+
+    def merge(self, other: "CategoricalSketch") -> "CategoricalSketch":
+        merged = CategoricalSketch()
+        merged.cms = self.cms.merge(other.cms)
+        merged.top = self.top.merge(other.top)
+        merged.total = self.total + other.total
+        return merged
+
+
+class SketchWindow:
+    """All sketches of one window of requests."""
+
+    def __init__(self, numeric_edges: Dict[str, List[float]]):
+        self.numeric = {col: FixedBinHistogram(numeric_edges.get(col, [])) for col in NUMERIC_MONITORED}
+        self.categorical = {col: CategoricalSketch() for col in CATEGORICAL_MONITORED}
+        self.rows = 0
+        self.unknown = 0
+        self.started_at = time.time()
+
+    def add_frame(self, df: pd.DataFrame) -> None:
+        for col, hist in self.numeric.items():
+            if col in df.columns:
+                hist.add_many(pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64))
+        for col, sketch in self.categorical.items():
+            if col in df.columns:
+                for value, count in Counter(df[col].tolist()).items():
+                    sketch.add(value, count)
+        if "model_simplified" in df.columns:
+            self.unknown += int((df["model_simplified"] == UNKNOWN_MODEL).sum())
+        self.rows += len(df)
+
+    def merge(self, other: "SketchWindow") -> "SketchWindow":
+        merged = SketchWindow({})
+        merged.numeric = {col: h.merge(other.numeric[col]) for col, h in self.numeric.items()}
+        merged.categorical = {col: s.merge(other.categorical[col]) for col, s in self.categorical.items()}
+        merged.rows = self.rows + other.rows
+        merged.unknown = self.unknown + other.unknown
+        merged.started_at = min(self.started_at, other.started_at)
+        return merged
+
+
+# ============================================================================
+# REFERENCE PROFILE
+# ============================================================================
+
+def build_reference_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """Reference bins and proportions of a training matrix (engineered columns)."""
+    numeric = {}
+    for col in NUMERIC_MONITORED:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").dropna().to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, REFERENCE_QUANTILES)).tolist() if len(values) else []
+        hist = FixedBinHistogram(edges)
+        hist.add_many(values)
+        numeric[col] = {"edges": edges, "proportions": (np.asarray(hist.counts) / max(hist.total, 1)).tolist()}
+
+    categorical = {}
+    for col in CATEGORICAL_MONITORED:
+        if col not in df.columns:
+            continue
+        shares = df[col].astype(str).str.lower().value_counts(normalize=True)
+        top = shares.head(REFERENCE_TOP_VALUES)
+        categorical[col] = {
+            "proportions": {str(k): float(v) for k, v in top.items()},
+            "other": float(max(0.0, 1.0 - top.sum())),
+        }
+
+    unknown_rate = (
+        float((df["model_simplified"].astype(str) == UNKNOWN_MODEL).mean())
+        if "model_simplified" in df.columns and len(df) else None
+    )
+    return {
+        "format": REFERENCE_FORMAT,
+        "rows": int(len(df)),
+        "created_at": datetime.now().isoformat(),
+        "numeric": numeric,
+        "categorical": categorical,
+        "unknown_rate": unknown_rate,
+    }
+
+
+def write_reference_profile(profile: Dict[str, Any], path: os.PathLike) -> None:
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    logger.info("✓ Drift reference profile written to %s", path)
+
+
+# ============================================================================
+# MONITOR
+# ============================================================================
+
+class DriftMonitor:
+    """Current and previous window of sketches, compared with the reference."""
+
+    def __init__(
+        self,
+        reference: Optional[Dict[str, Any]],
+        window_rows: int = 5000,
+        min_rows: int = 200,
+        max_pending_rows: int = 100_000,
+    ):
+        self.reference = reference
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+        self.max_pending_rows = max_pending_rows
+        self.edges = {
+            col: spec["edges"] for col, spec in ((reference or {}).get("numeric") or {}).items()
+        }
+        self.current = SketchWindow(self.edges)
+        self.previous: Optional[SketchWindow] = None
+        self.total_rows = 0
+        self.dropped_rows = 0
+
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._pending_lock = threading.Lock()
+        self._sketch_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+    def observe(self, features: pd.DataFrame) -> None:
+        """
+        Queue an engineered feature frame (O(1)); drain() adds it to the
+        sketches. Reading a few cells of a one-row frame costs more than the
+        vectorized update of a whole batch, so requests never touch the sketches.
+        """
+        n = len(features)
+        if n >= SLICE_ROWS:
+            # Don't keep every engineered column of a big batch alive until the drain
+            features = features[[c for c in MONITORED_COLUMNS if c in features.columns]]
+        with self._pending_lock:
+            if self._pending_rows + n > self.max_pending_rows:
+                self.dropped_rows += n
+                return
+            self._pending.append(features)
+            self._pending_rows += n
+
+    def drain(self) -> int:
+        """Fold the queued frames into the current window; returns the rows added."""
+        with self._pending_lock:
+            frames, self._pending, self._pending_rows = self._pending, [], 0
+        if not frames:
+            return 0
+
+        # One concat, then one column selection: far cheaper than per-frame access
+        batch = pd.concat(frames, ignore_index=True)
+        batch = batch[[c for c in MONITORED_COLUMNS if c in batch.columns]]
+        with self._sketch_lock:
+            self.current.add_frame(batch)
+            self.total_rows += len(batch)
+            if self.current.rows >= self.window_rows:
+                self.previous, self.current = self.current, SketchWindow(self.edges)
+        return len(batch)
+
+    # ------------------------------------------------------------------
+    # Comparison
+    # ------------------------------------------------------------------
+    def _window(self) -> SketchWindow:
+        self.drain()
+        with self._sketch_lock:
+            if self.previous is None:
+                return self.current.merge(SketchWindow(self.edges))
+            return self.previous.merge(self.current)
+
+    def report(self) -> Dict[str, Any]:
+        window = self._window()
+        result: Dict[str, Any] = {
+            "reference": None,
+            "window_rows": window.rows,
+            "window_started_at": window.started_at,
+            "total_rows": self.total_rows,
+            "dropped_rows": self.dropped_rows,
+            "unknown_rate": window.unknown / window.rows if window.rows else None,
+        }
+        if self.reference is None:
+            result["status"] = "no_reference"
+            return result
+
+        result["reference"] = {
+            "rows": self.reference.get("rows"),
+            "created_at": self.reference.get("created_at"),
+            "unknown_rate": self.reference.get("unknown_rate"),
+        }
+        if window.rows < self.min_rows:
+            result["status"] = "insufficient_data"
+            result["min_rows"] = self.min_rows
+            return result
+
+        features: Dict[str, Any] = {}
+        for col, spec in self.reference.get("numeric", {}).items():
+            hist = window.numeric[col]
+            current = np.asarray(hist.counts, dtype=np.float64) / max(hist.total, 1)
+            reference = np.asarray(spec["proportions"], dtype=np.float64)
+            score = psi(current, reference)
+            features[col] = {
+                "type": "numeric",
+                "psi": round(score, 4),
+                "ks": round(float(np.max(np.abs(np.cumsum(current) - np.cumsum(reference)))), 4),
+                "status": psi_status(score),
+                "bin_edges": spec["edges"],
+                "current_proportions": np.round(current, 4).tolist(),
+                "missing": hist.missing,
+            }
+
+        for col, spec in self.reference.get("categorical", {}).items():
+            sketch = window.categorical[col]
+            total = max(sketch.total, 1)
+            names = list(spec["proportions"])
+            current = [min(sketch.cms.estimate(name) / total, 1.0) for name in names]
+            current.append(max(0.0, 1.0 - sum(current)))
+            reference = list(spec["proportions"].values()) + [spec["other"]]
+            score = psi(np.asarray(current), np.asarray(reference))
+            features[col] = {
+                "type": "categorical",
+                "psi": round(score, 4),
+                "status": psi_status(score),
+                "top_values": [
+                    {"value": value, "share": round(count / total, 4),
+                     "reference_share": round(spec["proportions"].get(value, 0.0), 4)}
+                    for value, count in sketch.top.top(10)
+                ],
+            }
+
+        reference_unknown = self.reference.get("unknown_rate")
+        if reference_unknown is not None and result["unknown_rate"] is not None:
+            result["unknown_rate_delta"] = round(result["unknown_rate"] - reference_unknown, 4)
+
+        result["features"] = features
+        result["drifted"] = sorted(col for col, f in features.items() if f["status"] == "significant")
+        result["status"] = "drift" if result["drifted"] else "ok"
+        return result
+
+
+# ============================================================================
+# PROCESS-WIDE MONITOR
+# ============================================================================
+
+_monitor: Optional[DriftMonitor] = None
+_monitor_lock = threading.Lock()
+_last_report: Optional[Dict[str, Any]] = None
+_checker: Optional[threading.Thread] = None
+
+
+def load_reference_profile(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    from backend.config import settings
+
+    path = path or settings.drift_reference_path
+    if not os.path.exists(path):
+        logger.warning(f"Drift reference profile not found at {path} (python -m prediction_models.drift_reference)")
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_drift_monitor() -> Optional[DriftMonitor]:
+    """The process-wide monitor (None when disabled)."""
+    global _monitor
+    from backend.config import settings
+
+    if not settings.drift_enabled:
+        return None
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = DriftMonitor(
+                    load_reference_profile(),
+                    window_rows=settings.drift_window_rows,
+                    min_rows=settings.drift_min_rows,
+                    max_pending_rows=settings.drift_max_pending_rows,
+                )
+    return _monitor
+
+
+def observe_features(features: pd.DataFrame) -> None:
+    """Hot-path hook for the scoring routes; never raises."""
+    monitor = get_drift_monitor()
+    if monitor is None:
+        return
+    try:
+        monitor.observe(features)
+    except Exception as e:
+        logger.debug(f"Drift monitor update failed: {str(e)}")
+
+
+def _drain_and_check(interval: float) -> None:
+    global _last_report
+    last_check = time.monotonic()
+    while True:
+        time.sleep(DRAIN_INTERVAL)
+        monitor = get_drift_monitor()
+        if monitor is None:
+            continue
+        try:
+            monitor.drain()
+            if time.monotonic() - last_check < interval:
+                continue
+            last_check = time.monotonic()
+            _last_report = {**monitor.report(), "checked_at": time.time()}
+        except Exception as e:
+            logger.error(f"Drift check failed: {str(e)}", exc_info=True)
+            continue
+        if _last_report.get("drifted"):
+            logger.warning(
+                "Input drift (PSI >= %s) in: %s", PSI_SIGNIFICANT, ", ".join(_last_report["drifted"])
+            )
+
+
+def start_drift_checks() -> None:
+    """Start the thread that drains queued frames and compares periodically (once per process)."""
+    global _checker
+    from backend.config import settings
+
+    if _checker is not None or get_drift_monitor() is None:
+        return
+    _checker = threading.Thread(
+        target=_drain_and_check, args=(settings.drift_check_interval,), name="drift-check", daemon=True,
+    )
+    _checker.start()
+
+
+def drift_report() -> Dict[str, Any]:
+    monitor = get_drift_monitor()
+    if monitor is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **monitor.report(),
+        "checked_at": time.time(),
+        # Periodic checks only log; this one is computed on demand
+        "last_periodic_check": _last_report.get("checked_at") if _last_report else None,
+    }
@@ -1,8 +1,13 @@
+from bisect import bisect_left
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from backend.models.schemas import CarPredictionRequest
+from backend.services.lookup_tables import LookupTables, get_lookup_tables
+from backend.services.text_features import TEXT_COLUMN
 
 # ============================================================
 # CONSTANTS
@@ -21,6 +26,13 @@ STANDARD_BRANDS = [
     "nissan", "peugeot", "toyota", "volkswagen"
 ]
 
+# brand -> category (premium wins over budget, anything else is standard)
+BRAND_CATEGORIES: Dict[str, str] = {
+    **{b: "standard" for b in STANDARD_BRANDS},
+    **{b: "budget" for b in BUDGET_BRANDS},
+    **{b: "premium" for b in PREMIUM_BRANDS},
+}
+
 POPULAR_COLORS = [
     "Alb",
     "Verde",
@@ -37,11 +49,76 @@ MODEL_COUNTS: Dict[str, int] = {}  # Populate from training notebook
 RARE_MODEL_THRESHOLD = 50
 RARE_MODEL_MEAN_FREQ = 50.0
 
+# (bin edges, labels) as used with pd.cut(..., include_lowest=True) in training
+ENGINE_SIZE_BINS = (
+    [0, 1500, 1800, 2000, 3000, 6000],
+    ["<1500", "1500–1800", "1800–2000", "2000–3000", ">3000"],
+)
+HP_BINS = (
+    [0, 100, 150, 200, 300, 1000],
+    ["<100", "100–150", "150–200", "200–300", ">300"],
+)
+MILEAGE_BINS = (
+    [0, 100000, 200000, 300000, 800000],
+    ["<100k", "100–200k", "200–300k", ">300k"],
+)
+AGE_BINS = (
+    [1950, 2000, 2005, 2010, 2015, 2018, 2020, 2025],
+    [
+        "1950–2000", "2000–2005", "2005–2010",
+        "2010–2015", "2015–2018", "2018–2020", "2020–2025"
+    ],
+)
+
+# Exact one-hot feature names of POPULAR_COLORS in the training metadata
+COLOR_FEATURES = {
+    "Negru": "color_negru",
+    "Gri": "color_gri",
+    "Alb": "color_alb",
+    "Albastru": "color_albastru",
+    "Rosu": "color_rosu",
+    "Argintiu": "color_argintiu",
+    "Maro / Bej": "color_maro_/_bej",
+    "Alta culoare": "color_alta_culoare",
+    "Verde": "color_verde",
+}
+
+# Distinct values remembered per categorical block (see the *_block helpers)
+BLOCK_CACHE_SIZE = 1024
+
+CATEGORICAL_FEATURES = [
+    "marca",
+    "brand_category",
+    "model_simplified",
+    "caroserie",
+    "combustibil",
+    "cutie viteza",
+    "car_era",
+    "engine_size_bin",
+    "hp_bin",
+    "mileage_bin",
+    "age_bin",
+    "brand_category.1",
+]
+
 
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+def _cut(value: float, bins: List[float], labels: List[str]) -> str:
+    """
+    Scalar equivalent of str(pd.cut([value], bins, labels, include_lowest=True)[0]):
+    right-closed bins, first bin closed on the left, "nan" outside the edges.
+    """
+    idx = bisect_left(bins, value)
+    if value == bins[0]:
+        idx = 1
+    if idx == 0 or idx == len(bins):
+        return "nan"
+    return labels[idx - 1]
+
+
 def _assign_era(year: int) -> str:
     """Assign car era based on manufacturing year."""
     if year < 1995:
@@ -78,6 +155,21 @@ def _age_category_from_age(age: float) -> str:
     return "very_old"
 
 
+def normalize_model(model: Optional[str]) -> str:
+    """Key used for model frequency lookups."""
+    return (model or "").strip().lower()
+
+
+def builtin_lookup_tables(model_counts: Optional[Dict[str, int]] = None) -> LookupTables:
+    """Lookup tables from the constants in this module (no training artifact)."""
+    return LookupTables(
+        model_counts=MODEL_COUNTS if model_counts is None else model_counts,
+        brand_categories=BRAND_CATEGORIES,
+        rare_model_threshold=RARE_MODEL_THRESHOLD,
+        unknown_model_frequency=RARE_MODEL_MEAN_FREQ,
+    )
+
+
 def _engine_type_from_fuel(fuel: str) -> str:
     """Determine engine type from fuel."""
     f = (fuel or "").lower()
@@ -88,31 +180,118 @@ def _engine_type_from_fuel(fuel: str) -> str:
     return "ice"
 
 
+# ============================================================
+# MEMOIZED CATEGORICAL BLOCKS
+# ============================================================
+# Features that only depend on one low-cardinality input, computed once per
+# distinct (stripped) value and reused for every row that repeats it.
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _year_block(an_fabricatie: int) -> tuple:
+    """(age_bin, car_era, era_vintage .. era_modern_recent, new_car_flag, vintage_flag)."""
+    car_era = _assign_era(an_fabricatie)
+    return (
+        _cut(an_fabricatie, *AGE_BINS),
+        car_era,
+        int(car_era == "vintage"),
+        int(car_era == "older_standard"),
+        int(car_era == "mid_standard"),
+        int(car_era == "modern_early"),
+        int(car_era == "modern_recent"),
+        int(an_fabricatie >= 2018),
+        int(an_fabricatie < 1995),
+    )
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _brand_block(brand_category: str) -> tuple:
+    """(brand_premium, brand_budget, brand_standard, brand_category.1)."""
+    return (
+        int(brand_category == "premium"),
+        int(brand_category == "budget"),
+        int(brand_category == "standard"),
+        # Numeric encoding for brand_category (for model training consistency)
+        str({"standard": 0, "budget": 1, "premium": 2}[brand_category]),
+    )
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _body_block(caroserie: str) -> tuple:
+    """(is_suv, is_sport_body, is_large_body, is_sedan)."""
+    body = caroserie.lower()
+    return (
+        int(body == "suv"),
+        int(body in ["coupe", "cabrio"]),
+        int(body in ["suv", "pickup", "minibus", "monovolum"]),
+        int(body in ["sedan", "berlina"]),
+    )
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _fuel_block(combustibil: str) -> tuple:
+    """(is_electric, is_hybrid, is_diesel, is_petrol, engine_type)."""
+    fuel = combustibil.lower()
+    return (
+        int("electric" in fuel),
+        int(any(h in fuel for h in ["hybrid", "hibrid"])),
+        int("diesel" in fuel),
+        int("benzina" in fuel),
+        _engine_type_from_fuel(combustibil),
+    )
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _transmission_block(cutie_viteza: str) -> tuple:
+    """(is_automatic, is_manual)."""
+    gearbox = cutie_viteza.lower()
+    return int(gearbox in ["automata", "automatic"]), int(gearbox == "manuala")
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _color_block(culoare: str) -> tuple:
+    """(feature name, 0/1) pairs of the color one-hot columns."""
+    return tuple((feature, int(culoare == color)) for color, feature in COLOR_FEATURES.items())
+
+
 # ============================================================
 # MAIN FEATURE ENGINEERING FUNCTION
 # ============================================================
 
-def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
+def build_features(
+    marca: Optional[str],
+    model: Optional[str],
+    an_fabricatie: int,
+    rulaj: float,
+    putere: float,
+    capacitate_motor: float,
+    combustibil: Optional[str],
+    caroserie: Optional[str],
+    culoare: Optional[str],
+    cutie_viteza: Optional[str],
+    tables: Optional[LookupTables] = None,
+) -> Dict[str, Any]:
     """
-    Reproduce all feature engineering from training notebook.
-    Returns a DataFrame with categorical and numeric features.
-    The model's ColumnTransformer will handle OneHotEncoding automatically.
+    Reproduce all feature engineering from training notebook for one car.
+    Returns the raw feature dict (categorical values as plain strings).
+    Uses the serving lookup tables unless explicit tables are passed.
     """
+    if tables is None:
+        tables = get_lookup_tables()
 
     # --------------------------------------------------------
     # 0. PARSE & FILL NA
     # --------------------------------------------------------
-    marca_raw = (data.marca or "").strip()
-    model_raw = (data.model or "").strip()
-    combustibil = (data.combustibil or "Unknown").strip()
-    caroserie = (data.caroserie or "").strip()
-    culoare = (data.culoare or "").strip()
-    cutie_viteza = (data.cutie_viteza or "").strip()
+    marca_raw = (marca or "").strip()
+    model_raw = (model or "").strip()
+    combustibil = (combustibil or "Unknown").strip()
+    caroserie = (caroserie or "").strip()
+    culoare = (culoare or "").strip()
+    cutie_viteza = (cutie_viteza or "").strip()
     
-    rulaj = float(data.rulaj)
-    an_fabricatie = int(data.an_fabricatie)
-    putere = float(data.putere)
-    capacitate_motor = float(data.capacitate_motor)
+    rulaj = float(rulaj)
+    an_fabricatie = int(an_fabricatie)
+    putere = float(putere)
+    capacitate_motor = float(capacitate_motor)
 
     # Fill missing with defaults
     if not cutie_viteza:
@@ -128,41 +307,16 @@ def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
     age = max(0, current_year - an_fabricatie)
     
     disp_liters = capacitate_motor / 1000.0 if capacitate_motor > 0 else 1.0
-    mileage_per_year = rulaj / (age_years + 1.0)
+    # age is clamped at 0 so 2025 cars don't divide by zero
+    mileage_per_year = rulaj / (age + 1.0)
 
     # --------------------------------------------------------
     # 2. BINNING (converts to string for categorical treatment)
     # --------------------------------------------------------
-    engine_size_bin = str(pd.cut(
-        [capacitate_motor],
-        bins=[0, 1500, 1800, 2000, 3000, 6000],
-        labels=["<1500", "1500–1800", "1800–2000", "2000–3000", ">3000"],
-        include_lowest=True,
-    )[0])
-
-    hp_bin = str(pd.cut(
-        [putere],
-        bins=[0, 100, 150, 200, 300, 1000],
-        labels=["<100", "100–150", "150–200", "200–300", ">300"],
-        include_lowest=True,
-    )[0])
-
-    mileage_bin = str(pd.cut(
-        [rulaj],
-        bins=[0, 100000, 200000, 300000, 800000],
-        labels=["<100k", "100–200k", "200–300k", ">300k"],
-        include_lowest=True,
-    )[0])
-
-    age_bin = str(pd.cut(
-        [an_fabricatie],
-        bins=[1950, 2000, 2005, 2010, 2015, 2018, 2020, 2025],
-        labels=[
-            "1950–2000", "2000–2005", "2005–2010",
-            "2010–2015", "2015–2018", "2018–2020", "2020–2025"
-        ],
-        include_lowest=True,
-    )[0])
+    engine_size_bin = _cut(capacitate_motor, *ENGINE_SIZE_BINS)
+    hp_bin = _cut(putere, *HP_BINS)
+    mileage_bin = _cut(rulaj, *MILEAGE_BINS)
+    # age_bin comes with the year block (section 4)
 
     # --------------------------------------------------------
     # 3. OUTLIER FLAGS
@@ -173,89 +327,44 @@ def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
     low_hp_flag = int(putere < 50)
     high_mileage_flag = int(rulaj > 350000)
     low_mileage_flag = int(rulaj < 5000)
-    new_car_flag = int(an_fabricatie >= 2018)
-    vintage_flag = int(an_fabricatie < 1995)
 
     # --------------------------------------------------------
-    # 4. ERA & ERA DUMMIES
+    # 4. YEAR BLOCK: AGE BIN, ERA & ERA DUMMIES, YEAR FLAGS
     # --------------------------------------------------------
-    car_era = _assign_era(an_fabricatie)
-    era_vintage = int(car_era == "vintage")
-    era_older_standard = int(car_era == "older_standard")
-    era_mid_standard = int(car_era == "mid_standard")
-    era_modern_early = int(car_era == "modern_early")
-    era_modern_recent = int(car_era == "modern_recent")
+    (
+        age_bin, car_era,
+        era_vintage, era_older_standard, era_mid_standard, era_modern_early, era_modern_recent,
+        new_car_flag, vintage_flag,
+    ) = _year_block(an_fabricatie)
 
     # --------------------------------------------------------
     # 5. BRAND CATEGORY & DUMMIES
     # --------------------------------------------------------
     marca_lower = marca_raw.lower()
-    if marca_lower in PREMIUM_BRANDS:
-        brand_category = "premium"
-    elif marca_lower in BUDGET_BRANDS:
-        brand_category = "budget"
-    else:
-        brand_category = "standard"
+    brand_category = tables.brand_category(marca_lower)
 
-    brand_premium = int(brand_category == "premium")
-    brand_budget = int(brand_category == "budget")
-    brand_standard = int(brand_category == "standard")
+    brand_premium, brand_budget, brand_standard, brand_category_num = _brand_block(brand_category)
     is_premium_brand = brand_premium
     is_budget_brand = brand_budget
 
-    # Numeric encoding for brand_category (for model training consistency)
-    brand_category_num = {"standard": 0, "budget": 1, "premium": 2}[brand_category]
-
     # --------------------------------------------------------
     # 6. MODEL SIMPLIFICATION & FREQUENCY
     # --------------------------------------------------------
-    model_lower = model_raw.lower()
-    count = MODEL_COUNTS.get(model_lower, None)
-    if count is None:
-        model_simplified = "UNKNOWN"
-        model_frequency = RARE_MODEL_MEAN_FREQ
-    else:
-        model_simplified = model_lower if count >= RARE_MODEL_THRESHOLD else "UNKNOWN"
-        model_frequency = float(count)
+    model_simplified, model_frequency = tables.resolve_model(normalize_model(model_raw))
 
     # --------------------------------------------------------
     # 7. CAROSERIE, FUEL, TRANSMISSION FLAGS
     # --------------------------------------------------------
-    is_suv = int(caroserie.lower() == "suv")
-    is_sport_body = int(caroserie.lower() in ["coupe", "cabrio"])
-    is_large_body = int(caroserie.lower() in ["suv", "pickup", "minibus", "monovolum"])
-    is_sedan = int(caroserie.lower() in ["sedan", "berlina"])
-
-    is_electric = int("electric" in combustibil.lower())
-    is_hybrid = int(any(h in combustibil.lower() for h in ["hybrid", "hibrid"]))
-    is_diesel = int("diesel" in combustibil.lower())
-    is_petrol = int("benzina" in combustibil.lower())
-
-    is_automatic = int(cutie_viteza.lower() in ["automata", "automatic"])
-    is_manual = int(cutie_viteza.lower() == "manuala")
+    is_suv, is_sport_body, is_large_body, is_sedan = _body_block(caroserie)
+    is_electric, is_hybrid, is_diesel, is_petrol, engine_type = _fuel_block(combustibil)
+    is_automatic, is_manual = _transmission_block(cutie_viteza)
 
     # --------------------------------------------------------
     # 8. COLOR ENCODING (as numeric one-hot, not categorical)
     # --------------------------------------------------------
-    # Colors were already one-hot encoded in training as numeric features
-    # Build color dummies using exact naming from training metadata
-    color_features = {}
-    
-    # Map POPULAR_COLORS to their exact feature names from metadata
-    color_name_map = {
-        "Negru": "color_negru",
-        "Gri": "color_gri",
-        "Alb": "color_alb",
-        "Albastru": "color_albastru",
-        "Rosu": "color_rosu",
-        "Argintiu": "color_argintiu",
-        "Maro / Bej": "color_maro_/_bej",  # Exact naming from metadata
-        "Alta culoare": "color_alta_culoare",
-        "Verde": "color_verde",
-    }
-    
-    for original_color, feature_name in color_name_map.items():
-        color_features[feature_name] = int(culoare == original_color)
+    # Colors were already one-hot encoded in training as numeric features,
+    # named as in the training metadata (COLOR_FEATURES)
+    color_features = _color_block(culoare)
 
     # --------------------------------------------------------
     # 9. RATIO & DERIVED FEATURES
@@ -286,7 +395,6 @@ def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
     # --------------------------------------------------------
     rulaj_cat = _rulaj_cat_from_km(rulaj)
     age_category = _age_category_from_age(age)
-    engine_type = _engine_type_from_fuel(combustibil)
     segment = "unknown"
 
     # --------------------------------------------------------
@@ -305,7 +413,7 @@ def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
         "hp_bin": hp_bin,
         "mileage_bin": mileage_bin,
         "age_bin": age_bin,
-        "brand_category.1": str({"standard": 0, "budget": 1, "premium": 2}[brand_category]),
+        "brand_category.1": brand_category_num,
 
         # NUMERICAL
         "capacitate motor": capacitate_motor,
@@ -360,26 +468,81 @@ def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
     # Add color features (0/1 numerice)
     features_dict.update(color_features)
 
+    return features_dict
+
+
+def _to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Feature dicts -> DataFrame with the categorical columns typed as strings."""
+    # Every row has build_features' keys in the same order: build the frame
+    # column by column, with the string columns typed up front (much cheaper
+    # than inferring from records and converting afterwards)
+    columns: Dict[str, Any] = {key: [row[key] for row in rows] for key in rows[0]}
+
+    for col in CATEGORICAL_FEATURES:
+        columns[col] = pd.array(columns[col], dtype="string")
+
+    return pd.DataFrame(columns)
+
+
+def _request_features(data: CarPredictionRequest) -> Dict[str, Any]:
+    """Feature dict for one request (see build_features)."""
+    features_dict = build_features(
+        data.marca,
+        data.model,
+        data.an_fabricatie,
+        data.rulaj,
+        data.putere,
+        data.capacitate_motor,
+        data.combustibil,
+        data.caroserie,
+        data.culoare,
+        data.cutie_viteza,
+    )
+
+    # Raw text; hashed by the model's ColumnTransformer (ignored by models without text)
+    features_dict[TEXT_COLUMN] = getattr(data, "descriere", None) or ""
+    return features_dict
+
+
+def engineer_features(data: CarPredictionRequest) -> pd.DataFrame:
+    """
+    Reproduce all feature engineering from training notebook.
+    Returns a DataFrame with categorical and numeric features.
+    The model's ColumnTransformer will handle OneHotEncoding automatically.
+    """
     # --------------------------------------------------------
     # 14. RETURN AS DATAFRAME (single row)
     # --------------------------------------------------------
-    df = pd.DataFrame([features_dict])
-
-    categorical_cols = [
-        "marca",
-        "brand_category",
-        "model_simplified",
-        "caroserie",
-        "combustibil",
-        "cutie viteza",
-        "car_era",
-        "engine_size_bin",
-        "hp_bin",
-        "mileage_bin",
-        "age_bin",
-        "brand_category.1",
-    ]
-    for col in categorical_cols:
-        df[col] = df[col].astype("string")
+    return _to_frame([_request_features(data)])
+
+
+def engineer_features_grid(data: CarPredictionRequest, points: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    One feature row per grid point: each point overrides request fields
+    (e.g. {"rulaj": 120000, "an_fabricatie": 2015}) of the base car.
+    """
+    return _to_frame([_request_features(data.model_copy(update=point)) for point in points])
+
+
+RAW_LISTING_COLUMNS = [
+    "marca", "model", "an fabricatie", "rulaj", "putere", "capacitate motor",
+    "combustibil", "caroserie", "culoare", "cutie viteza",
+]
+
+
+def engineer_features_frame(
+    listings: pd.DataFrame,
+    tables: Optional[LookupTables] = None,
+) -> pd.DataFrame:
+    """
+    Apply the serving feature engineering to a table of cleaned listings
+    (raw column names, as produced by prediction_models.ingest).
+    """
+    rows = []
+    for values in zip(*(listings[col].tolist() for col in RAW_LISTING_COLUMNS)):
+        values = [None if pd.isna(v) else v for v in values]
+        rows.append(build_features(*values, tables=tables))
 
+    df = _to_frame(rows) if rows else pd.DataFrame(columns=CATEGORICAL_FEATURES)
+    df.index = listings.index
     return df
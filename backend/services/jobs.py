@@ -0,0 +1,452 @@
+"""
+Asynchronous batch scoring jobs with a local, durable queue.
+
+Jobs live in a SQLite database (WAL mode, one short-lived connection per
+call, so the API and any number of worker processes can share it); the
+validated input is stored as a columnar JSON file and the result as a CSV.
+Worker processes load the model once, claim queued jobs atomically, score
+them in chunks (updating progress and checking for cancellation between
+chunks) and expire old results. No broker is needed.
+
+A running job is leased to its worker: every chunk renews heartbeat_at, and
+a job whose heartbeat is older than settings.job_lease_seconds is put back in
+the queue with a new attempt number (the worker may have died, possibly in
+another container sharing jobs_dir). A worker that finds its attempt
+superseded drops its partial result instead of finishing the job.
+
+Job states:
+    queued -> running -> done | failed | cancelled
+    done -> expired (result file deleted after settings.job_result_ttl_hours)
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from backend.services.columnar import COLUMN_SPECS, COLUMNAR_FIELDS, dumps, loads, score_columns
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = 5000
+POLL_INTERVAL = 1.0         # seconds between queue polls when idle
+EXPIRE_INTERVAL = 60.0      # seconds between expiry / lease sweeps per worker
+LEASE_SECONDS = 120.0       # running jobs without a heartbeat for this long are requeued
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_EXPIRED = "expired"
+FINAL_STATUSES = {STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED, STATUS_EXPIRED}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL,
+    worker_pid INTEGER,
+    attempt INTEGER NOT NULL DEFAULT 0,
+    heartbeat_at REAL,
+    error TEXT,
+    input_path TEXT NOT NULL,
+    result_path TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# Added after the first release; ALTERed into existing databases
+_LEASE_COLUMNS = {
+    "attempt": "INTEGER NOT NULL DEFAULT 0",
+    "heartbeat_at": "REAL",
+}
+
+
+class LeaseLost(Exception):
+    """The job was requeued (heartbeat too old) while this worker was scoring it."""
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class JobStore:
+    """SQLite job table plus the input / result files of every job."""
+
+    def __init__(self, jobs_dir: str):
+        self.jobs_dir = jobs_dir
+        self.db_path = os.path.join(jobs_dir, "jobs.sqlite3")
+        self.inputs_dir = os.path.join(jobs_dir, "inputs")
+        self.results_dir = os.path.join(jobs_dir, "results")
+        os.makedirs(self.inputs_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _LEASE_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # API side
+    # ------------------------------------------------------------------
+    def submit(self, columns: Dict[str, Any], n_rows: int) -> str:
+        """Store validated columns (see parse_columnar) and queue the job."""
+        job_id = uuid.uuid4().hex
+        input_path = os.path.join(self.inputs_dir, f"{job_id}.json")
+        tmp_path = input_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dumps(columns))
+        os.replace(tmp_path, input_path)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, n_rows, created_at, input_path) VALUES (?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, n_rows, time.time(), input_path),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job now, or ask its worker to stop; returns the new status."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            status = row["status"]
+            if status == STATUS_QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?",
+                    (STATUS_CANCELLED, time.time(), job_id),
+                )
+                status = STATUS_CANCELLED
+            elif status == STATUS_RUNNING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+
+        if status == STATUS_CANCELLED:
+            _remove(os.path.join(self.inputs_dir, f"{job_id}.json"))
+        return status
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def claim(self, worker_pid: int) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running, under a new attempt number."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, worker_pid = ?, "
+                "attempt = attempt + 1 WHERE id = ?",
+                (STATUS_RUNNING, now, now, worker_pid, row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = dict(row)
+        job.update(status=STATUS_RUNNING, started_at=now, heartbeat_at=now,
+                   worker_pid=worker_pid, attempt=row["attempt"] + 1)
+        return job
+
+    def progress(self, job_id: str, attempt: int, processed: int) -> bool:
+        """Record progress and renew the lease; returns False when cancellation was requested.
+
+        Raises LeaseLost when the job no longer runs under this attempt.
+        """
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET processed = ?, heartbeat_at = ? WHERE id = ? AND attempt = ? AND status = ?",
+                (processed, time.time(), job_id, attempt, STATUS_RUNNING),
+            ).rowcount
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not updated:
+            raise LeaseLost(job_id)
+        return not (row and row["cancel_requested"])
+
+    def finish(self, job_id: str, status: str, result_path: Optional[str] = None,
+               error: Optional[str] = None, ttl_seconds: float = 0,
+               attempt: Optional[int] = None) -> bool:
+        """Record the outcome; with attempt, only if the job still runs under it."""
+        now = time.time()
+        query = "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ?, result_path = ?, error = ? WHERE id = ?"
+        params = [status, now, now + ttl_seconds if result_path else None, result_path, error, job_id]
+        if attempt is not None:
+            query += " AND attempt = ? AND status = ?"
+            params += [attempt, STATUS_RUNNING]
+        with self._connect() as conn:
+            updated = conn.execute(query, params).rowcount
+        if updated:
+            _remove(os.path.join(self.inputs_dir, f"{job_id}.json"))
+        return bool(updated)
+
+    def requeue_orphans(self, lease_seconds: float = LEASE_SECONDS) -> int:
+        """Put back running jobs whose lease expired (worker crashed, hung or was restarted)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, attempt FROM jobs WHERE status = ? AND COALESCE(heartbeat_at, 0) < ?",
+                (STATUS_RUNNING, time.time() - lease_seconds),
+            ).fetchall()
+            for row in rows:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, processed = 0, worker_pid = NULL, started_at = NULL, "
+                    "heartbeat_at = NULL WHERE id = ?",
+                    (STATUS_QUEUED, row["id"]),
+                )
+            conn.execute("COMMIT")
+        for row in rows:
+            _remove(self.tmp_result_path(row["id"], row["attempt"]))
+        return len(rows)
+
+    def tmp_result_path(self, job_id: str, attempt: int) -> str:
+        # Per attempt, so a requeued job never appends to a dead worker's partial file
+        return os.path.join(self.results_dir, f"{job_id}.{attempt}.csv.tmp")
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Delete result files past their expiry time."""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, result_path FROM jobs WHERE status = ? AND expires_at <= ?", (STATUS_DONE, now)
+            ).fetchall()
+            for row in rows:
+                if row["result_path"]:
+                    _remove(row["result_path"])
+                conn.execute("UPDATE jobs SET status = ?, result_path = NULL WHERE id = ?", (STATUS_EXPIRED, row["id"]))
+        return len(rows)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def score_chunk(columns: Dict[str, Any], start: int, end: int) -> pd.DataFrame:
+    """Input rows [start, end) with their predictions and intervals."""
+    chunk = {name: values[start:end] for name, values in columns.items()}
+    predicted, intervals = score_columns(chunk)
+
+    out = pd.DataFrame({field: chunk[field] for field in COLUMNAR_FIELDS})
+    for field in COLUMNAR_FIELDS:
+        if COLUMN_SPECS[field][0] is int:
+            out[field] = out[field].astype("int64")
+    out["predicted"] = predicted
+    for col in ("min_price", "max_price", "margin"):
+        out[col] = intervals[col]
+    return out
+
+
+def run_job(store: JobStore, job: Dict[str, Any], ttl_seconds: float, chunk_size: int = CHUNK_SIZE) -> str:
+    """Score one claimed job chunk by chunk; returns its final status."""
+    job_id, attempt = job["id"], job["attempt"]
+    result_path = os.path.join(store.results_dir, f"{job_id}.csv")
+    tmp_path = store.tmp_result_path(job_id, attempt)
+
+    try:
+        with open(job["input_path"], "rb") as f:
+            columns = loads(f.read())
+        n_rows = job["n_rows"]
+
+        for start in range(0, n_rows, chunk_size):
+            end = min(start + chunk_size, n_rows)
+            score_chunk(columns, start, end).to_csv(
+                tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False,
+            )
+            if not store.progress(job_id, attempt, end):
+                _remove(tmp_path)
+                store.finish(job_id, STATUS_CANCELLED, attempt=attempt)
+                logger.info(f"Job {job_id} cancelled after {end}/{n_rows} rows")
+                return STATUS_CANCELLED
+
+        os.replace(tmp_path, result_path)
+        if not store.finish(job_id, STATUS_DONE, result_path=result_path, ttl_seconds=ttl_seconds, attempt=attempt):
+            raise LeaseLost(job_id)
+        logger.info(f"✓ Job {job_id}: {n_rows} rows scored")
+        return STATUS_DONE
+
+    except LeaseLost:
+        logger.warning(f"Job {job_id} attempt {attempt} lost its lease; leaving it to the next attempt")
+        _remove(tmp_path)
+        return STATUS_QUEUED
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+        _remove(tmp_path)
+        store.finish(job_id, STATUS_FAILED, error=str(e), attempt=attempt)
+        return STATUS_FAILED
+
+
+def worker_loop(jobs_dir: str, ttl_seconds: float, lease_seconds: float = LEASE_SECONDS,
+                poll_interval: float = POLL_INTERVAL) -> None:
+    """Process entry point: load the model once, then serve the queue until SIGTERM."""
+    from backend.model_loader import ModelLoader
+    from backend.services.lookup_tables import init_lookup_tables
+
+    logging.basicConfig(level=logging.INFO)
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    ModelLoader.load_model()
+    init_lookup_tables()
+    store = JobStore(jobs_dir)
+    pid = os.getpid()
+    logger.info(f"✓ Job worker {pid} ready")
+
+    last_expiry = 0.0
+    while not stopping:
+        if time.time() - last_expiry > EXPIRE_INTERVAL:
+            store.expire()
+            requeued = store.requeue_orphans(lease_seconds)
+            if requeued:
+                logger.warning(f"Requeued {requeued} job(s) whose lease expired")
+            last_expiry = time.time()
+
+        job = store.claim(pid)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(store, job, ttl_seconds)
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class JobWorkerPool:
+    """N worker processes (spawned, so they never inherit server threads)."""
+
+    def __init__(self, jobs_dir: str, workers: int, ttl_seconds: float, lease_seconds: float = LEASE_SECONDS):
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.processes: List[multiprocessing.Process] = []
+
+    def spawn(self) -> multiprocessing.Process:
+        """Start one worker, first requeueing jobs whose lease expired."""
+        requeued = JobStore(self.jobs_dir).requeue_orphans(self.lease_seconds)
+        if requeued:
+            logger.warning(f"Requeued {requeued} job(s) whose lease expired")
+
+        process = multiprocessing.get_context("spawn").Process(
+            target=worker_loop, args=(self.jobs_dir, self.ttl_seconds, self.lease_seconds), daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self) -> None:
+        self.processes = [self.spawn() for _ in range(self.workers)]
+        logger.info(f"✓ Started {self.workers} job worker(s)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        self.processes = []
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public fields of a job row."""
+    n_rows = job["n_rows"] or 0
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "n_rows": n_rows,
+        "processed": job["processed"],
+        "progress_percent": round(100.0 * job["processed"] / n_rows, 1) if n_rows else 0.0,
+        "cancel_requested": bool(job["cancel_requested"]),
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+        "error": job["error"],
+    }
+
+
+_store: Optional[JobStore] = None
+_pool: Optional[JobWorkerPool] = None
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        from backend.config import settings
+        _store = JobStore(settings.jobs_dir)
+    return _store
+
+
+def start_job_workers() -> Optional[JobWorkerPool]:
+    """Embedded worker pool (settings.job_workers > 0); see backend.job_worker for standalone workers."""
+    global _pool
+    from backend.config import settings
+
+    if settings.job_workers <= 0 or _pool is not None:
+        return _pool
+    _pool = JobWorkerPool(
+        settings.jobs_dir, settings.job_workers, settings.job_result_ttl_hours * 3600, settings.job_lease_seconds,
+    )
+    _pool.start()
+    return _pool
+
+
+def stop_job_workers() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
@@ -0,0 +1,181 @@
+"""
+Lookup tables used by feature engineering (model frequencies, brand categories,
+categorical vocabularies).
+
+The tables are generated at training time (prediction_models.lookup_tables)
+and shipped next to the model as models_storage/lookup_tables.json. They are
+loaded once into dicts/frozensets and checked against the categories of the
+model's OneHotEncoder at startup, so a stale or missing artifact is reported
+instead of silently producing UNKNOWN models.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.model_loader import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+
+class LookupTables:
+    """Hashed lookup structures for one artifact version."""
+
+    def __init__(
+        self,
+        model_counts: Dict[str, int],
+        brand_categories: Dict[str, str],
+        vocabularies: Optional[Dict[str, Iterable[str]]] = None,
+        rare_model_threshold: int = 50,
+        unknown_model_frequency: float = 50.0,
+        version: str = "builtin",
+    ):
+        self.model_counts = {str(k): int(v) for k, v in model_counts.items()}
+        self.brand_categories = dict(brand_categories)
+        self.vocabularies = {
+            col: frozenset(values) for col, values in (vocabularies or {}).items()
+        }
+        self.rare_model_threshold = int(rare_model_threshold)
+        self.unknown_model_frequency = float(unknown_model_frequency)
+        self.version = version
+
+        # normalized model -> spelling used by the model's encoder (set by validate())
+        self.model_categories: Dict[str, str] = {}
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict[str, Any]) -> "LookupTables":
+        return cls(
+            model_counts=artifact.get("model_counts", {}),
+            brand_categories=artifact.get("brand_categories", {}),
+            vocabularies=artifact.get("vocabularies", {}),
+            rare_model_threshold=artifact.get("rare_model_threshold", 50),
+            unknown_model_frequency=artifact.get("unknown_model_frequency", 50.0),
+            version=str(artifact.get("version", "unknown")),
+        )
+
+    # ========================================================================
+    # LOOKUPS
+    # ========================================================================
+    def brand_category(self, marca_lower: str) -> str:
+        return self.brand_categories.get(marca_lower, "standard")
+
+    def resolve_model(self, model_lower: str) -> Tuple[str, float]:
+        """Return (model_simplified, model_frequency) for a normalized model name."""
+        count = self.model_counts.get(model_lower)
+        if count is None:
+            return "UNKNOWN", self.unknown_model_frequency
+        if count < self.rare_model_threshold:
+            return "UNKNOWN", float(count)
+        return self.model_categories.get(model_lower, model_lower), float(count)
+
+    # ========================================================================
+    # VALIDATION
+    # ========================================================================
+    def validate(self, encoder_categories: Dict[str, List[str]]) -> List[str]:
+        """
+        Compare the tables with the encoder's categories_.
+
+        Returns a list of problems (empty when consistent). Frequent models are
+        matched case-insensitively and mapped to the encoder's spelling.
+        """
+        problems: List[str] = []
+
+        if not self.model_counts:
+            problems.append("model_counts is empty: every model resolves to UNKNOWN")
+
+        model_cats = encoder_categories.get("model_simplified")
+        if model_cats is not None:
+            by_lower = {str(c).lower(): str(c) for c in model_cats}
+            frequent = [
+                m for m, n in self.model_counts.items() if n >= self.rare_model_threshold
+            ]
+            missing = sorted(m for m in frequent if m not in by_lower)
+            self.model_categories = {m: by_lower[m] for m in frequent if m in by_lower}
+            if missing:
+                problems.append(
+                    f"model_simplified: {len(missing)} frequent model(s) unknown to the encoder "
+                    f"(e.g. {missing[:5]})"
+                )
+
+        for col, vocab in self.vocabularies.items():
+            if col == "model_simplified" or col not in encoder_categories:
+                continue
+            known = {str(c) for c in encoder_categories[col]}
+            unknown = sorted(vocab - known)
+            if unknown:
+                problems.append(
+                    f"{col}: {len(unknown)} value(s) not in encoder categories (e.g. {unknown[:5]})"
+                )
+
+        return problems
+
+
+# ============================================================================
+# PROCESS-WIDE TABLES
+# ============================================================================
+
+_tables: Optional[LookupTables] = None
+_status: Dict[str, Any] = {"status": "not_loaded"}
+
+
+def _builtin_tables() -> LookupTables:
+    # Imported lazily: feature_engineer imports this module
+    from backend.services.feature_engineer import builtin_lookup_tables
+    return builtin_lookup_tables()
+
+
+def init_lookup_tables(path: Optional[str] = None, strict: Optional[bool] = None) -> LookupTables:
+    """
+    Load the artifact and validate it against the model's encoder.
+
+    Falls back to the built-in tables (with a warning) when no artifact is
+    found. With strict=True any validation problem raises RuntimeError.
+    """
+    global _tables, _status
+
+    from backend.config import settings
+    if strict is None:
+        strict = settings.lookup_tables_strict
+
+    artifact = ModelLoader.load_lookup_tables(path)
+    if artifact is None:
+        tables = _builtin_tables()
+        status = "missing"
+    else:
+        tables = LookupTables.from_artifact(artifact)
+        status = "ok"
+
+    encoder_categories = ModelLoader.get_encoder_categories()
+    problems = tables.validate(encoder_categories) if encoder_categories else []
+    if encoder_categories is None:
+        problems.append("model not loaded: lookup tables not validated")
+    if problems and status == "ok":
+        status = "mismatch"
+
+    _tables = tables
+    _status = {
+        "status": status,
+        "version": tables.version,
+        "models": len(tables.model_counts),
+        "problems": problems,
+    }
+
+    for problem in problems:
+        logger.warning("Lookup tables (%s): %s", tables.version, problem)
+    if status == "ok":
+        logger.info("✓ Lookup tables %s loaded (%d models)", tables.version, len(tables.model_counts))
+
+    if strict and (problems or status != "ok"):
+        raise RuntimeError(f"Lookup tables failed validation: {problems}")
+
+    return tables
+
+
+def get_lookup_tables() -> LookupTables:
+    """Tables used by the request path (loaded on first use if startup did not)."""
+    if _tables is None:
+        return init_lookup_tables(strict=False)
+    return _tables
+
+
+def lookup_status() -> Dict[str, Any]:
+    return dict(_status)
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from typing import Dict, Any, Optional
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
 
 from backend.model_loader import ModelLoader
 from backend.config import settings
@@ -51,18 +56,202 @@ def _get_error_stats() -> tuple[float, float]:
 
 
 # =====================================================================
-# PREDICTION
+# EXECUTION POLICY
 # =====================================================================
 
-def predict_price(features_df: pd.DataFrame) -> float:
+def available_cpus() -> int:
+    """CPUs this process may run on (affinity / cgroup cpusets included)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ExecutionPolicy:
     """
-    Predict car price from engineered features.
+    Per-call parallelism of the sklearn backend.
+
+    Each serving process gets a thread budget (settings.predict_threads, or
+    the available CPUs shared by the uvicorn workers). Forests predict on one
+    thread below parallel_min_rows rows, where joblib dispatch costs more than
+    it saves, and on the whole budget from there on; measure the crossover
+    with prediction_models.parallel_bench. BLAS / OpenMP pools (used by
+    HistGradientBoosting and linear models) are capped at the same budget.
+    """
+
+    def __init__(self, threads: int, parallel_min_rows: int):
+        self.threads = max(1, threads)
+        self.parallel_min_rows = parallel_min_rows
+
+    @classmethod
+    def from_settings(cls) -> "ExecutionPolicy":
+        threads = settings.predict_threads or available_cpus() // max(1, settings.workers)
+        return cls(threads, settings.predict_parallel_min_rows)
+
+    def n_jobs(self, rows: int) -> int:
+        return self.threads if rows >= self.parallel_min_rows else 1
+
+    def pin_thread_pools(self) -> None:
+        """Cap the native thread pools of this process (kept for its lifetime)."""
+        threadpool_limits(limits=self.threads)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "threads": self.threads,
+            "parallel_min_rows": self.parallel_min_rows,
+            "available_cpus": available_cpus(),
+        }
+
+
+# =====================================================================
+# INFERENCE BACKENDS
+# =====================================================================
+
+class InferenceBackend(ABC):
+    """Turns an engineered feature frame into log(price + 1) predictions."""
+
+    name = "base"
+
+    @abstractmethod
+    def predict_log(self, features_df: pd.DataFrame) -> np.ndarray:
+        """log(price + 1) per row of features_df."""
+
+
+class SklearnBackend(InferenceBackend):
+    """The fitted sklearn Pipeline (ColumnTransformer + estimator)."""
+
+    name = "sklearn"
+
+    def __init__(self, model, policy: Optional[ExecutionPolicy] = None):
+        self.model = model
+        self.policy = policy
+        self.forest = False
+
+        estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+        if policy is not None and hasattr(estimator, "estimators_") and "n_jobs" in estimator.get_params():
+            # n_jobs=None defers to the per-call joblib config below instead
+            # of whatever was used at training time
+            estimator.n_jobs = None
+            self.forest = True
+
+    def predict_log(self, features_df: pd.DataFrame) -> np.ndarray:
+        if not self.forest:
+            return np.asarray(self.model.predict(features_df), dtype=np.float64)
+        # joblib's config is thread-local: concurrent requests don't interfere
+        with parallel_config(backend="threading", n_jobs=self.policy.n_jobs(len(features_df))):
+            return np.asarray(self.model.predict(features_df), dtype=np.float64)
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX export of the whole Pipeline (prediction_models.export_onnx) run by
+    onnxruntime on CPU. Every engineered column is a separate graph input.
+    """
+
+    name = "onnx"
+
+    def __init__(self, onnx_path: str, intra_op_threads: int = 1):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The onnx inference backend needs onnxruntime: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.path = onnx_path
+        self.intra_op_threads = intra_op_threads
+
+        # Graph input names are sanitized by the converter; the exporter stores
+        # the original column names, in input order
+        meta = self.session.get_modelmeta().custom_metadata_map
+        columns = json.loads(meta["columns"])
+        self.inputs: List[Tuple[str, str, bool]] = [
+            (column, node.name, node.type == "tensor(string)")
+            for column, node in zip(columns, self.session.get_inputs())
+        ]
+
+    def feeds(self, features_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        feeds = {}
+        for column, name, is_string in self.inputs:
+            values = features_df[column]
+            if is_string:
+                feeds[name] = values.to_numpy(dtype=object).reshape(-1, 1)
+            else:
+                feeds[name] = values.to_numpy(dtype=np.float32).reshape(-1, 1)
+        return feeds
+
+    def predict_log(self, features_df: pd.DataFrame) -> np.ndarray:
+        output = self.session.run(None, self.feeds(features_df))[0]
+        return np.asarray(output, dtype=np.float64).ravel()
+
+
+_backend: Optional[InferenceBackend] = None
+_backend_status: Dict[str, Any] = {"status": "not_loaded"}
+
 
+def _onnx_path() -> str:
+    return settings.onnx_model_path or os.path.splitext(settings.model_path)[0] + ".onnx"
+
+
+def get_inference_backend() -> InferenceBackend:
+    """
+    Backend selected by settings.inference_backend ("sklearn" or "onnx").
+    The onnx backend falls back to sklearn if its artifact can't be loaded.
     """
+    global _backend, _backend_status
+
+    if _backend is not None:
+        return _backend
+
+    choice = settings.inference_backend.lower()
+    if choice == "onnx":
+        path = _onnx_path()
+        try:
+            _backend = OnnxBackend(path, settings.onnx_intra_op_threads)
+            _backend_status = {
+                "status": "ok",
+                "backend": "onnx",
+                "path": path,
+                "intra_op_threads": settings.onnx_intra_op_threads,
+            }
+            logger.info("✓ ONNX inference backend loaded from %s", path)
+            return _backend
+        except Exception as e:
+            logger.error("ONNX backend unavailable (%s); falling back to sklearn", e)
+            _backend_status = {"status": "fallback", "backend": "sklearn", "error": str(e)}
+    elif choice != "sklearn":
+        logger.warning("Unknown inference_backend %r; using sklearn", choice)
+
     model = ModelLoader.load_model()
     if model is None:
         raise RuntimeError("Model not available (ModelLoader.load_model() returned None)")
 
+    policy = ExecutionPolicy.from_settings()
+    policy.pin_thread_pools()
+    _backend = SklearnBackend(model, policy)
+    if _backend_status.get("status") != "fallback":
+        _backend_status = {"status": "ok", "backend": "sklearn"}
+    _backend_status["execution"] = policy.status()
+    return _backend
+
+
+def inference_backend_status() -> Dict[str, Any]:
+    return dict(_backend_status)
+
+
+# =====================================================================
+# PREDICTION
+# =====================================================================
+
+def predict_price(features_df: pd.DataFrame) -> float:
+    """
+    Predict car price from engineered features.
+
+    """
+    backend = get_inference_backend()
+
     if features_df is None or features_df.empty:
         raise RuntimeError("Empty features DataFrame passed to predict_price()")
 
@@ -73,8 +262,8 @@ def predict_price(features_df: pd.DataFrame) -> float:
             list(features_df.columns),
         )
 
-        # model.predict -> log(pret + 1)
-        y_pred_log = model.predict(features_df)[0]
+        # backend -> log(pret + 1)
+        y_pred_log = backend.predict_log(features_df)[0]
         y_pred_price = np.expm1(y_pred_log)
 
         price = int(y_pred_price)
@@ -86,6 +275,28 @@ def predict_price(features_df: pd.DataFrame) -> float:
         raise RuntimeError(f"Prediction failed: {str(e)}")
 
 
+def predict_prices(features_df: pd.DataFrame) -> np.ndarray:
+    """
+    Predict prices (EUR, rounded down like predict_price) for every row
+    of an engineered feature frame in one model call.
+    """
+    backend = get_inference_backend()
+
+    if features_df is None or features_df.empty:
+        raise RuntimeError("Empty features DataFrame passed to predict_prices()")
+
+    try:
+        # backend -> log(pret + 1)
+        y_pred_log = backend.predict_log(features_df)
+        prices = np.floor(np.expm1(y_pred_log))
+        logger.info("Batched prediction: %d rows", len(prices))
+        return prices
+
+    except Exception as e:
+        logger.error("Batched prediction failed: %s", e, exc_info=True)
+        raise RuntimeError(f"Prediction failed: {str(e)}")
+
+
 # =====================================================================
 # INTERVAL DE ÎNCREDERE (PERCENTAGE-BASED)
 # =====================================================================
@@ -122,6 +333,24 @@ def price_confidence_interval(
     }
 
 
+def price_confidence_intervals(predicted_prices: np.ndarray) -> Dict[str, Any]:
+    """
+    Vectorized price_confidence_interval for an array of predictions
+    (same margins and rounding).
+    """
+    mae, mape = _get_error_stats()
+    prices = np.asarray(predicted_prices, dtype=np.float64)
+
+    margin = np.maximum(prices * (mape / 100.0), mae * 0.10)
+
+    return {
+        "min_price": np.round(np.maximum(0.0, prices - margin)),
+        "max_price": np.round(prices + margin),
+        "margin": np.round(margin),
+        "confidence": float(getattr(settings, "model_confidence", 77.13)),
+    }
+
+
 # =====================================================================
 # METADATA FOR UI / HEALTH
 # =====================================================================
@@ -0,0 +1,137 @@
+"""
+Pre-fork serving: load every shared artifact once in the gunicorn master and
+freeze the GC before the workers are forked.
+
+Workers then share the model's pages copy-on-write. gc.freeze() moves every
+object loaded so far into a permanent generation the collector never visits,
+so collections in the workers don't write to (and privately copy) the
+pages holding the forest. Used by backend/gunicorn.conf.py:
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+memory_report() reads /proc/<pid>/smaps_rollup (Linux) for the master and
+every worker: shared vs. private (unique) RSS and PSS.
+"""
+
+import gc
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Set in the master before forking, inherited by the workers
+MASTER_PID_ENV = "CARPRICE_PREFORK_MASTER_PID"
+
+
+def preload() -> Dict[str, Any]:
+    """Load the shared artifacts, then freeze everything allocated so far."""
+    from backend.config import settings
+    from backend.model_loader import ModelLoader
+    from backend.services.comparables import get_comparables_index
+    from backend.services.lookup_tables import init_lookup_tables
+    from backend.services.predictor import get_inference_backend
+    from backend.services.warmup import include_routers
+    from backend.main import app
+
+    # The scoring routers (and numpy / pandas / sklearn) are shared too; the
+    # workers' warm-up then only starts their background services
+    include_routers(app)
+    ModelLoader.load_model()
+    ModelLoader.load_metadata()
+    init_lookup_tables()
+    get_comparables_index()
+
+    # onnxruntime sessions own thread pools that don't survive fork; each
+    # worker creates its own on first use
+    if settings.inference_backend.lower() == "sklearn" and ModelLoader.load_model() is not None:
+        get_inference_backend()
+
+    gc.freeze()
+    gc.enable()
+
+    logger.info(f"✓ Pre-fork artifacts loaded; {gc.get_freeze_count()} objects frozen")
+    return {"frozen_objects": gc.get_freeze_count()}
+
+
+# ============================================================================
+# MEMORY REPORT
+# ============================================================================
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """RSS / PSS / shared / private (MB) of one process, None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    kb: Dict[str, int] = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            kb[key] = int(parts[0])
+
+    def mb(*keys: str) -> float:
+        return round(sum(kb.get(k, 0) for k in keys) / 1024, 2)
+
+    return {
+        "pid": pid,
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+    }
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after the last ")"
+        fields = stat[stat.rfind(")") + 2:].split()
+        if len(fields) > 1 and int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_report() -> Dict[str, Any]:
+    """Memory of the master and all workers (or of this process alone)."""
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        return {"error": "memory report needs Linux /proc/<pid>/smaps_rollup"}
+
+    master = os.environ.get(MASTER_PID_ENV)
+    if master is None:
+        processes = [process_memory(os.getpid())]
+        mode = "single"
+    else:
+        master_pid = int(master)
+        processes = [process_memory(pid) for pid in [master_pid] + _children(master_pid)]
+        mode = "gunicorn"
+
+    processes = [p for p in processes if p is not None]
+    workers = processes[1:] if mode == "gunicorn" else processes
+
+    return {
+        "mode": mode,
+        # Frozen objects are inherited from the master only when it preloaded
+        "preloaded": gc.get_freeze_count() > 0,
+        "pid": os.getpid(),
+        "master": processes[0] if mode == "gunicorn" and processes else None,
+        "workers": workers,
+        "totals": {
+            "processes": len(processes),
+            # PSS splits shared pages between their users, so it adds up
+            "pss_mb": round(sum(p["pss_mb"] for p in processes), 2),
+            "rss_mb": round(sum(p["rss_mb"] for p in processes), 2),
+            "worker_private_mb": round(sum(p["private_mb"] for p in workers), 2),
+        },
+    }
@@ -0,0 +1,312 @@
+"""
+Shadow evaluation: score a sample of live requests with alternate models off
+the request path and aggregate how they compare with the serving model.
+
+The scoring routes call submit() after answering the primary prediction. A
+settings.shadow_sample_rate share of requests is put on a queue bounded by
+the rows it holds (settings.shadow_max_pending_rows: a sample that does not
+fit is dropped, the request never waits); one
+daemon thread loads the shadow pipelines (settings.shadow_models) and scores
+each sample with every one of them. Per model it keeps constant-memory
+statistics of the latency and of the difference to the primary price, served
+by GET /health/shadow. State is per process.
+"""
+
+import logging
+import math
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Fixed bins, so quantiles cost constant memory whatever the traffic
+LATENCY_EDGES_MS = np.logspace(-2, 5, 141)          # 0.01 ms .. 100 s, 20 bins per decade
+PCT_DIFF_EDGES = np.linspace(0, 100, 201)            # |price difference| in %, 0.5 % bins
+
+
+class RunningStats:
+    """Count, mean and standard deviation (streaming) plus quantiles over fixed bins."""
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = edges
+        self.bins = np.zeros(len(edges) + 1, dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        # Chan et al. parallel update of mean / M2 with the batch's own moments
+        n_b = values.size
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        np.add.at(self.bins, np.searchsorted(self.edges, values, side="right"), 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper edge of the bin holding the q-quantile (None without data)."""
+        if self.n == 0:
+            return None
+        i = int(np.searchsorted(np.cumsum(self.bins), q * self.n))
+        return float(self.edges[min(i, len(self.edges) - 1)])
+
+    def summary(self, digits: int = 3) -> Dict[str, Any]:
+        std = math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else None
+        return {
+            "n": self.n,
+            "mean": round(self.mean, digits) if self.n else None,
+            "std": round(std, digits) if std is not None else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class ModelStats:
+    """Aggregates of one model over the shadowed samples."""
+
+    def __init__(self):
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.latency_ms = RunningStats(LATENCY_EDGES_MS)          # per request
+        self.diff_eur = RunningStats(np.linspace(-50_000, 50_000, 201))
+        self.abs_pct_diff = RunningStats(PCT_DIFF_EDGES)
+        self.within_5pct = 0
+        self.within_10pct = 0
+
+    def add(self, latency_ms: float, diff_eur: np.ndarray, abs_pct: np.ndarray) -> None:
+        self.requests += 1
+        self.rows += len(diff_eur)
+        self.latency_ms.add([latency_ms])
+        self.diff_eur.add(diff_eur)
+        self.abs_pct_diff.add(abs_pct)
+        self.within_5pct += int((abs_pct <= 5).sum())
+        self.within_10pct += int((abs_pct <= 10).sum())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "latency_ms": self.latency_ms.summary(),
+            "diff_eur": self.diff_eur.summary(digits=1),
+            "abs_pct_diff": self.abs_pct_diff.summary(),
+            "share_within_5pct": round(self.within_5pct / self.rows, 4) if self.rows else None,
+            "share_within_10pct": round(self.within_10pct / self.rows, 4) if self.rows else None,
+        }
+
+
+# ============================================================================
+# EVALUATOR
+# ============================================================================
+
+def resolve_model(entry: str, models_dir: str) -> tuple:
+    """(name, path) of a model name (models_dir/<name>.pkl) or a path to a pickle."""
+    if entry.endswith(".pkl") or os.sep in entry:
+        return os.path.splitext(os.path.basename(entry))[0], entry
+    return entry, os.path.join(models_dir, f"{entry}.pkl")
+
+
+class ShadowEvaluator:
+    def __init__(self, model_paths: Dict[str, str], sample_rate: float, max_pending_rows: int):
+        self.model_paths = model_paths
+        self.sample_rate = sample_rate
+        self.max_pending_rows = max_pending_rows
+        self.queue: "queue.Queue" = queue.Queue()
+        self.pending_rows = 0
+        self.models: Dict[str, Any] = {}
+        self.load_errors: Dict[str, str] = {}
+        self.primary_requests = 0
+        self.primary_rows = 0
+        self.primary_latency_ms = RunningStats(LATENCY_EDGES_MS)
+        self.stats = {name: ModelStats() for name in model_paths}
+        self.sampled = 0
+        self.dropped = 0
+        self.dropped_rows = 0
+        self.processed = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+    def submit(self, features: pd.DataFrame, primary_prices: np.ndarray, primary_ms: float) -> bool:
+        """Maybe enqueue a sample; never blocks. Returns whether it was queued."""
+        if random.random() >= self.sample_rate:
+            return False
+        # Bounded by rows, not samples: one columnar batch can be 100k rows
+        n = len(features)
+        with self._pending_lock:
+            if self.pending_rows + n > self.max_pending_rows:
+                self.dropped += 1
+                self.dropped_rows += n
+                return False
+            self.pending_rows += n
+        self.queue.put_nowait((features, np.asarray(primary_prices, dtype=np.float64), primary_ms))
+        self.sampled += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+            self._thread.start()
+
+    def _load_models(self) -> None:
+        from backend.model_loader import ModelLoader
+
+        for name, path in self.model_paths.items():
+            try:
+                model = joblib.load(path)
+                if hasattr(model, "named_steps") and "preprocessor" in model.named_steps:
+                    ModelLoader.normalize_encoder_categories(model.named_steps["preprocessor"])
+                self.models[name] = model
+                logger.info(f"✓ Shadow model {name} loaded from {path}")
+            except Exception as e:
+                self.load_errors[name] = str(e)
+                logger.error(f"Shadow model {name} not loaded from {path}: {str(e)}")
+
+    def _run(self) -> None:
+        try:
+            # Linux nices threads individually: let request threads win the CPU
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        self._load_models()
+        while True:
+            features, primary_prices, primary_ms = self.queue.get()
+            try:
+                self.evaluate(features, primary_prices, primary_ms)
+            finally:
+                with self._pending_lock:
+                    self.pending_rows -= len(features)
+                self.queue.task_done()
+
+    def evaluate(self, features: pd.DataFrame, primary_prices: np.ndarray, primary_ms: float) -> None:
+        """Score one sample with every shadow model and update the aggregates."""
+        results = []
+        for name, model in self.models.items():
+            start = time.perf_counter()
+            try:
+                prices = np.floor(np.expm1(np.asarray(model.predict(features), dtype=np.float64)))
+            except Exception as e:
+                results.append((name, None, str(e)))
+                continue
+            results.append((name, (time.perf_counter() - start) * 1000, prices))
+
+        with self._lock:
+            self.primary_requests += 1
+            self.primary_rows += len(primary_prices)
+            self.primary_latency_ms.add([primary_ms])
+            for name, latency_ms, prices in results:
+                stats = self.stats[name]
+                if latency_ms is None:
+                    stats.errors += 1
+                    stats.last_error = prices
+                    continue
+                diff = prices - primary_prices
+                abs_pct = np.abs(diff) / np.maximum(primary_prices, 1.0) * 100
+                stats.add(latency_ms, diff, abs_pct)
+            self.processed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "queue": {
+                    "samples": self.queue.qsize(),
+                    "rows": self.pending_rows,
+                    "max_rows": self.max_pending_rows,
+                },
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "dropped_rows": self.dropped_rows,
+                "processed": self.processed,
+                "since": self.started_at,
+                "primary": {
+                    "requests": self.primary_requests,
+                    "rows": self.primary_rows,
+                    "latency_ms": self.primary_latency_ms.summary(),
+                },
+                "shadow_models": {
+                    name: {
+                        "path": self.model_paths[name],
+                        "loaded": name in self.models,
+                        "load_error": self.load_errors.get(name),
+                        **self.stats[name].summary(),
+                    }
+                    for name in self.model_paths
+                },
+            }
+
+
+# ============================================================================
+# PROCESS-WIDE EVALUATOR
+# ============================================================================
+
+_evaluator: Optional[ShadowEvaluator] = None
+
+
+def get_shadow_evaluator() -> Optional[ShadowEvaluator]:
+    """The process-wide evaluator (None when no shadow model is configured)."""
+    global _evaluator
+    from backend.config import settings
+
+    entries = [e.strip() for e in settings.shadow_models.split(",") if e.strip()]
+    if not entries or settings.shadow_sample_rate <= 0:
+        return None
+    if _evaluator is None:
+        models_dir = os.path.dirname(settings.model_path)
+        _evaluator = ShadowEvaluator(
+            dict(resolve_model(e, models_dir) for e in entries),
+            sample_rate=settings.shadow_sample_rate,
+            max_pending_rows=settings.shadow_max_pending_rows,
+        )
+    return _evaluator
+
+
+def start_shadow_evaluation() -> None:
+    evaluator = get_shadow_evaluator()
+    if evaluator is not None:
+        evaluator.start()
+
+
+def shadow_submit(features: pd.DataFrame, primary_prices: Any, primary_ms: float) -> None:
+    """Request-path hook; a no-op unless shadow mode is on and started."""
+    evaluator = _evaluator
+    if evaluator is None or not evaluator.running:
+        return
+    evaluator.submit(features, np.atleast_1d(primary_prices), primary_ms)
+
+
+def shadow_summary() -> Dict[str, Any]:
+    evaluator = get_shadow_evaluator()
+    if evaluator is None:
+        return {"enabled": False}
+    return {"enabled": True, "running": evaluator.running, **evaluator.summary()}
@@ -0,0 +1,108 @@
+"""
+Hashed bag-of-words features from the listing description (descriere).
+
+Uses the hashing trick: every unigram/bigram of the normalized text is mapped
+by crc32 to one of N_TEXT_FEATURES columns, so no vocabulary is stored and
+memory is constant whatever the text. The same transformer runs inside the
+model's ColumnTransformer at training and serving time. Its output is sparse;
+for estimators that need dense input, max_features keeps only the hashed
+columns present in the most training descriptions.
+"""
+
+import re
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+TEXT_COLUMN = "descriere"
+N_TEXT_FEATURES = 1024
+MAX_TEXT_CHARS = 5000       # longer descriptions are truncated before hashing
+CHUNK_SIZE = 2000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Romanian diacritics (both comma and cedilla forms) -> ASCII
+_DIACRITICS = str.maketrans("ăâîșşțţ", "aaisstt")
+
+
+def text_tokens(text: Optional[str]) -> List[str]:
+    """Unigrams and bigrams of the lowercased, diacritic-free text."""
+    if not text:
+        return []
+    words = _TOKEN_RE.findall(text[:MAX_TEXT_CHARS].lower().translate(_DIACRITICS))
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_text(text: Optional[str], n_features: int = N_TEXT_FEATURES) -> np.ndarray:
+    """Sorted column indices present in the text (binary features)."""
+    indices = {zlib.crc32(token.encode("utf-8")) % n_features for token in text_tokens(text)}
+    return np.fromiter(sorted(indices), dtype=np.int32, count=len(indices))
+
+
+def hash_texts(texts: Iterable[Optional[str]], n_features: int = N_TEXT_FEATURES) -> sparse.csr_matrix:
+    """CSR matrix (n_texts x n_features, float32) of hashed texts."""
+    indptr = [0]
+    indices: List[np.ndarray] = []
+    for text in texts:
+        cols = hash_text(text if isinstance(text, str) else None, n_features)
+        indices.append(cols)
+        indptr.append(indptr[-1] + len(cols))
+
+    cols = np.concatenate(indices) if indices else np.empty(0, dtype=np.int32)
+    data = np.ones(len(cols), dtype=np.float32)
+    return sparse.csr_matrix((data, cols, np.asarray(indptr)), shape=(len(indptr) - 1, n_features))
+
+
+class HashedTextFeatures(TransformerMixin, BaseEstimator):
+    """Stateless text -> fixed-width sparse vector transformer (unless max_features is set)."""
+
+    def __init__(
+        self,
+        n_features: int = N_TEXT_FEATURES,
+        chunk_size: int = CHUNK_SIZE,
+        max_features: Optional[int] = None,
+    ):
+        self.n_features = n_features
+        self.chunk_size = chunk_size
+        self.max_features = max_features
+
+    def _hashed_chunks(self, X) -> Iterator[sparse.csr_matrix]:
+        """Hashed CSR blocks of chunk_size texts, without listing every text up front."""
+        if isinstance(X, pd.DataFrame):
+            X = X.iloc[:, 0]
+        if not isinstance(X, pd.Series):
+            X = pd.Series(np.asarray(X, dtype=object).ravel())
+        for i in range(0, len(X), self.chunk_size):
+            yield hash_texts(X.iloc[i:i + self.chunk_size].tolist(), self.n_features)
+
+    def fit(self, X, y=None):
+        self.columns_ = None
+        if self.max_features is not None and self.max_features < self.n_features:
+            doc_freq = np.zeros(self.n_features, dtype=np.int64)
+            for block in self._hashed_chunks(X):
+                doc_freq += np.bincount(block.indices, minlength=self.n_features)
+            # Most frequent columns first, ties by index so the choice is deterministic
+            order = np.lexsort((np.arange(self.n_features), -doc_freq))
+            self.columns_ = np.sort(order[:self.max_features])
+        self.n_features_out_ = self.n_features if self.columns_ is None else len(self.columns_)
+        return self
+
+    def transform(self, X) -> sparse.csr_matrix:
+        # Chunked so training on many listings never holds the per-token lists for all of them
+        columns = getattr(self, "columns_", None)
+        blocks = [
+            block if columns is None else block[:, columns]
+            for block in self._hashed_chunks(X)
+        ]
+        if not blocks:
+            return sparse.csr_matrix((0, getattr(self, "n_features_out_", self.n_features)), dtype=np.float32)
+        return sparse.vstack(blocks, format="csr")
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        columns = getattr(self, "columns_", None)
+        indices = range(self.n_features) if columns is None else columns
+        return np.asarray([f"text_{i}" for i in indices], dtype=object)
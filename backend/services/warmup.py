@@ -0,0 +1,231 @@
+"""
+Two-phase startup: answer health checks first, load everything heavy after.
+
+backend.main only imports light modules (FastAPI, settings, the health and
+admission code); numpy, pandas and sklearn come in with the scoring routers.
+On startup a background thread (settings.startup_warmup_background) imports
+those routers and includes them in the app, loads the artifacts (model,
+lookup tables, comparables index, inference backend), scores one sample
+request so the first real one doesn't pay for lazy initialization, and
+starts the background services (drift checks, shadow evaluation, job
+workers).
+
+Until it has finished, WarmupGate answers every path but the health,
+readiness and docs endpoints with 503 + Retry-After, and GET /health/ready
+reports "warming_up". GET /health/live is 200 as soon as the process serves.
+
+Steps are required (routers, model and inference backend, the sample
+request, lookup tables; the latter only fail with LOOKUP_TABLES_STRICT) or
+optional (comparables index, drift, shadow, jobs). A failed required step
+leaves the process "failed": never ready, scoring answered with 503.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.admission import _respond
+
+logger = logging.getLogger(__name__)
+
+
+# backend.routes.<module>.router, in the order they are included
+ROUTER_MODULES = ["predict", "batch", "curve", "explain", "comparables", "jobs"]
+
+# Served while warming up or after it failed (exact paths, and prefixes);
+# /model-status/ reports why no model could be loaded
+OPEN_PATHS = {"/", "/model-status/", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+OPEN_PREFIXES = ("/health/",)
+
+WARMUP_RETRY_AFTER = 1
+
+# Scored once by the "sample_request" step
+SAMPLE_REQUEST = {
+    "marca": "Dacia",
+    "model": "Logan",
+    "an_fabricatie": 2015,
+    "rulaj": 120000,
+    "putere": 90,
+    "capacitate_motor": 1461,
+    "combustibil": "Diesel",
+    "caroserie": "Berlina",
+    "culoare": "Alb",
+    "cutie_viteza": "Manuala",
+}
+
+
+# ============================================================================
+# STEPS
+# ============================================================================
+
+_routers_included = False
+_routers_lock = threading.Lock()
+
+
+def include_routers(app) -> None:
+    """Import the scoring routers and add them to the app (once per process)."""
+    global _routers_included
+    with _routers_lock:
+        if _routers_included:
+            return
+        for name in ROUTER_MODULES:
+            module = importlib.import_module(f"backend.routes.{name}")
+            app.include_router(module.router)
+        # Rebuilt with the new routes on the next /openapi.json
+        app.openapi_schema = None
+        _routers_included = True
+
+
+def _load_lookup_tables() -> None:
+    from backend.services.lookup_tables import init_lookup_tables
+    init_lookup_tables()
+
+
+def _load_comparables_index() -> None:
+    from backend.services.comparables import get_comparables_index
+    get_comparables_index()
+
+
+def _load_inference_backend() -> None:
+    from backend.config import settings
+    from backend.model_loader import ModelLoader
+    from backend.services.predictor import get_inference_backend
+
+    if ModelLoader.load_model() is None:
+        raise RuntimeError(f"model not loaded from {settings.model_path}")
+    get_inference_backend()
+
+
+def _score_sample_request() -> None:
+    from backend.model_loader import ModelLoader
+    from backend.models.schemas import CarPredictionRequest
+    from backend.services.feature_engineer import engineer_features
+    from backend.services.predictor import predict_price
+
+    if ModelLoader.load_model() is None:
+        raise RuntimeError("model not loaded")
+    predict_price(engineer_features(CarPredictionRequest(**SAMPLE_REQUEST)))
+
+
+def _start_drift_checks() -> None:
+    from backend.services.drift import start_drift_checks
+    start_drift_checks()
+
+
+def _start_shadow_evaluation() -> None:
+    from backend.services.shadow import start_shadow_evaluation
+    start_shadow_evaluation()
+
+
+def _start_job_workers() -> None:
+    from backend.services.jobs import start_job_workers
+    start_job_workers()
+
+
+# ============================================================================
+# WARM-UP
+# ============================================================================
+
+class Warmup:
+    """Runs the startup steps once and records how long each one took."""
+
+    def __init__(self):
+        self.state = "pending"          # pending -> warming_up -> ready | failed
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def step_list(self, app) -> List[tuple]:
+        """(name, function, required) in the order they run."""
+        return [
+            ("routers", lambda: include_routers(app), True),
+            ("lookup_tables", _load_lookup_tables, True),
+            ("comparables", _load_comparables_index, False),
+            ("inference_backend", _load_inference_backend, True),
+            ("sample_request", _score_sample_request, True),
+            ("drift", _start_drift_checks, False),
+            ("shadow", _start_shadow_evaluation, False),
+            ("jobs", _start_job_workers, False),
+        ]
+
+    def _run_step(self, name: str, fn: Callable[[], None], required: bool) -> bool:
+        start = time.perf_counter()
+        try:
+            fn()
+            self.steps[name] = {"status": "ok", "required": required}
+        except Exception as e:
+            logger.error(f"Warm-up step {name} failed: {str(e)}", exc_info=True)
+            self.steps[name] = {"status": "error", "required": required, "error": str(e)}
+        self.steps[name]["seconds"] = round(time.perf_counter() - start, 3)
+        return self.steps[name]["status"] == "ok"
+
+    def run(self, app) -> None:
+        self.state = "warming_up"
+        self.started_at = time.time()
+        failed = []
+        for name, fn, required in self.step_list(app):
+            # Optional steps run (and report) even after a required one failed
+            if not self._run_step(name, fn, required) and required:
+                failed.append(name)
+        self.finished_at = time.time()
+        elapsed = self.finished_at - self.started_at
+        if failed:
+            self.state = "failed"
+            logger.error(f"✗ Warm-up failed after {elapsed:.2f}s (required: {', '.join(failed)}); not ready")
+        else:
+            self.state = "ready"
+            logger.info(f"✓ Warm-up finished in {elapsed:.2f}s")
+
+    def start(self, app, background: bool = True) -> None:
+        if self.state != "pending":
+            return
+        if not background:
+            self.run(app)
+            return
+        self.state = "warming_up"
+        self._thread = threading.Thread(target=self.run, args=(app,), name="warmup", daemon=True)
+        self._thread.start()
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {"status": self.state, "seconds": elapsed, "steps": dict(self.steps)}
+
+
+_warmup = Warmup()
+
+
+def get_warmup() -> Warmup:
+    return _warmup
+
+
+# ============================================================================
+# GATE (pure ASGI)
+# ============================================================================
+
+class WarmupGate:
+    """503 + Retry-After for everything but health / docs until warm-up is done."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _warmup.ready:
+            return await self.app(scope, receive, send)
+
+        path = scope.get("path", "")
+        if path in OPEN_PATHS or path.startswith(OPEN_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        if _warmup.state == "failed":
+            await _respond(send, 503, "warmup_failed", "Warm-up failed, see /health/ready", None)
+            return
+        await _respond(send, 503, "warming_up", "Warming up, retry shortly", WARMUP_RETRY_AFTER)
@@ -0,0 +1,179 @@
+"""
+Cold-start profile of the API process, with a pass / fail budget.
+
+Imports backend.main in fresh interpreters (python -X importtime), reports
+the slowest modules and the import time per top-level package, and fails
+(exit status 1) when the median import time exceeds the budget
+(settings.startup_budget_seconds) or when numpy / pandas / sklearn / scipy /
+joblib are imported before the app can answer health checks; those belong
+in the background warm-up (backend/services/warmup.py). With --serve it
+also starts uvicorn and times /health/live and /health/ready; the budget
+then applies to the time until /health/live answers.
+
+Usage (from the repository root):
+    python -m backend.startup_profile
+    python -m backend.startup_profile --serve --budget 2
+"""
+
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+APP_MODULE = "backend.main"
+HEAVY_MODULES = ("numpy", "pandas", "sklearn", "scipy", "joblib")
+RUNS = 3
+TOP_MODULES = 15
+SERVE_TIMEOUT = 60.0
+
+
+# ============================================================
+# IMPORT TIME
+# ============================================================
+
+def profile_import(module: str = APP_MODULE) -> Dict[str, Any]:
+    """Wall time of `import module` in a new interpreter, and its -X importtime lines."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return {"seconds": float(proc.stdout.strip().splitlines()[-1]), "modules": modules}
+
+
+def by_package(modules: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Self import time (ms) per top-level package, slowest first."""
+    totals: Dict[str, float] = defaultdict(float)
+    for m in modules:
+        totals[m["module"].split(".")[0]] += m["self_ms"]
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+# ============================================================
+# TIME TO HEALTHY
+# ============================================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def time_to_healthy(timeout: float = SERVE_TIMEOUT) -> Dict[str, Optional[float]]:
+    """Seconds from spawning uvicorn until /health/live, then /health/ready, answer 200."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result: Dict[str, Optional[float]] = {"live": None, "ready": None}
+    try:
+        while time.perf_counter() - start < timeout and server.poll() is None:
+            if result["live"] is None and _status(f"{base}/health/live") == 200:
+                result["live"] = time.perf_counter() - start
+            if result["live"] is not None and _status(f"{base}/health/ready") == 200:
+                result["ready"] = time.perf_counter() - start
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return result
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Profile the API cold start against a time budget.")
+    parser.add_argument("--budget", type=float, default=settings.startup_budget_seconds,
+                        help="max seconds to import the app (or, with --serve, to answer /health/live)")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--top", type=int, default=TOP_MODULES)
+    parser.add_argument("--serve", action="store_true", help="also time uvicorn until /health/live and /health/ready")
+    parser.add_argument("--allow-heavy", action="store_true",
+                        help=f"don't fail when {', '.join(HEAVY_MODULES)} are imported with the app")
+    args = parser.parse_args(argv)
+
+    runs = [profile_import() for _ in range(max(1, args.runs))]
+    seconds = statistics.median(r["seconds"] for r in runs)
+    modules = min(runs, key=lambda r: r["seconds"])["modules"]
+
+    timings = ", ".join(f"{r['seconds']:.3f}" for r in runs)
+    print(f"import {APP_MODULE}: median {seconds:.3f}s over {len(runs)} run(s) ({timings})")
+    print(f"\n{'cumulative ms':>14}{'self ms':>10}  module")
+    for m in sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{m['cumulative_ms']:>14.1f}{m['self_ms']:>10.1f}  {'  ' * m['depth']}{m['module']}")
+    print(f"\n{'self ms':>10}  package")
+    for package, ms in list(by_package(modules).items())[:args.top]:
+        print(f"{ms:>10.1f}  {package}")
+    print()
+
+    failures = []
+    imported = {m["module"].split(".")[0] for m in modules}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    if heavy and not args.allow_heavy:
+        failures.append(f"{', '.join(heavy)} imported with {APP_MODULE} (move them to the warm-up)")
+
+    measured, what = seconds, "import"
+    if args.serve:
+        healthy = time_to_healthy()
+        live, ready = healthy["live"], healthy["ready"]
+        print(f"uvicorn: /health/live after {live:.2f}s" if live is not None else "uvicorn: /health/live never answered")
+        print(f"         /health/ready after {ready:.2f}s" if ready is not None else "         /health/ready never answered")
+        measured, what = (live if live is not None else float("inf")), "/health/live"
+
+    if measured > args.budget:
+        failures.append(f"{what} took {measured:.2f}s, budget {args.budget:.2f}s")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✓ {what} in {measured:.2f}s (budget {args.budget:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
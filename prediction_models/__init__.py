@@ -0,0 +1 @@
+"""Offline data and training tooling for the car price models"""
@@ -0,0 +1,196 @@
+"""
+Bytes and CPU of the row vs. columnar batch formats (/predict-batch/ vs.
+/predict-batch/columnar), without the model.
+
+Requests are built from real cleaned listings; the listed prices stand in
+for predictions, so only decoding + validation and response building +
+encoding are measured, each the way the API does it:
+    rows      json -> List[CarPredictionRequest] (pydantic), per-car dicts,
+              FastAPI's jsonable_encoder + JSONResponse
+    columnar  orjson -> parse_columnar (vectorized checks), parallel numpy
+              arrays, orjson
+
+Usage (from the repository root):
+    python -m prediction_models.batch_formats --rows 1000 10000
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from backend.config import settings
+from backend.models.schemas import CarPredictionRequest
+from backend.services.columnar import dumps, loads, parse_columnar
+from backend.services.predictor import price_confidence_interval, price_confidence_intervals
+from prediction_models.config import CAR_DATA_DIR, PROCESSED_DIR
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_FORMATS_PATH = PROCESSED_DIR / "batch_formats.json"
+REPEATS = 5
+SEED = 42
+
+# Request field -> cleaned listing column
+FIELD_COLUMNS = {
+    "marca": "marca",
+    "model": "model",
+    "an_fabricatie": "an fabricatie",
+    "rulaj": "rulaj",
+    "putere": "putere",
+    "capacitate_motor": "capacitate motor",
+    "combustibil": "combustibil",
+    "caroserie": "caroserie",
+    "culoare": "culoare",
+    "cutie_viteza": "cutie viteza",
+}
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def sample_cars(listings: pd.DataFrame, n_rows: int) -> tuple:
+    """n_rows request dicts (valid for CarPredictionRequest) and their prices."""
+    df = listings.dropna(subset=list(FIELD_COLUMNS.values()) + ["pret"])
+    df = df[df["an fabricatie"].between(2000, 2025) & (df["putere"] > 0) & (df["rulaj"] >= 0)]
+    df = df.sample(n=n_rows, replace=n_rows > len(df), random_state=SEED)
+
+    cars = [
+        {
+            "marca": str(r[0]), "model": str(r[1]), "an_fabricatie": int(r[2]), "rulaj": int(r[3]),
+            "putere": float(r[4]), "capacitate_motor": float(r[5]), "combustibil": str(r[6]),
+            "caroserie": str(r[7]), "culoare": str(r[8]), "cutie_viteza": str(r[9]),
+        }
+        for r in zip(*(df[c].tolist() for c in FIELD_COLUMNS.values()))
+    ]
+    return cars, df["pret"].to_numpy(dtype=np.float64).round()
+
+
+# ============================================================
+# THE TWO FORMATS
+# ============================================================
+
+_cars_adapter = TypeAdapter(List[CarPredictionRequest])
+
+
+def rows_decode(body: bytes) -> list:
+    return _cars_adapter.validate_python(json.loads(body))
+
+
+def rows_encode(cars: List[CarPredictionRequest], prices: np.ndarray) -> bytes:
+    # Mirrors backend/routes/batch.py:predict_batch
+    predictions = []
+    for car, price in zip(cars, prices.tolist()):
+        interval = price_confidence_interval(price)
+        predictions.append({
+            "car": {"marca": car.marca, "model": car.model, "an_fabricatie": car.an_fabricatie, "rulaj": car.rulaj},
+            "prediction": {
+                "predicted": price,
+                "min_price": interval["min_price"],
+                "max_price": interval["max_price"],
+                "margin": interval["margin"],
+                "confidence": interval.get("confidence"),
+                "residual_std": settings.model_mae,
+            },
+        })
+    return JSONResponse(jsonable_encoder({"count": len(predictions), "predictions": predictions})).body
+
+
+def columnar_decode(body: bytes) -> dict:
+    return parse_columnar(loads(body))[0]
+
+
+def columnar_encode(prices: np.ndarray) -> bytes:
+    intervals = price_confidence_intervals(prices)
+    return dumps({
+        "count": len(prices),
+        "predicted": prices,
+        "min_price": intervals["min_price"],
+        "max_price": intervals["max_price"],
+        "margin": intervals["margin"],
+        "confidence": intervals["confidence"],
+        "residual_std": settings.model_mae,
+    })
+
+
+def _cpu_ms(fn: Callable[[], Any], repeats: int = REPEATS) -> float:
+    """Best-of CPU time (process_time) of fn, in ms."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def measure(cars: List[Dict[str, Any]], prices: np.ndarray, repeats: int = REPEATS) -> List[Dict[str, Any]]:
+    rows_body = json.dumps(cars).encode("utf-8")
+    columnar_body = json.dumps({k: [c[k] for c in cars] for k in FIELD_COLUMNS}).encode("utf-8")
+    parsed = rows_decode(rows_body)
+
+    results = []
+    for name, body, decode, encode in (
+        ("rows", rows_body, lambda: rows_decode(rows_body), lambda: rows_encode(parsed, prices)),
+        ("columnar", columnar_body, lambda: columnar_decode(columnar_body), lambda: columnar_encode(prices)),
+    ):
+        decode_ms = _cpu_ms(decode, repeats)
+        encode_ms = _cpu_ms(encode, repeats)
+        results.append({
+            "format": name,
+            "rows": len(cars),
+            "request_kb": len(body) / 1024,
+            "response_kb": len(encode()) / 1024,
+            "decode_validate_ms": decode_ms,
+            "build_encode_ms": encode_ms,
+            "cpu_ms": decode_ms + encode_ms,
+        })
+    return results
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from prediction_models.ingest import load_clean_dataset
+
+    parser = argparse.ArgumentParser(description="Compare the row and columnar batch formats.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--data-dir", default=str(CAR_DATA_DIR))
+    parser.add_argument("--out", default=str(BATCH_FORMATS_PATH))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    listings, _ = load_clean_dataset(args.data_dir, include_description=False)
+    results = []
+    for n_rows in args.rows:
+        cars, prices = sample_cars(listings, n_rows)
+        results.extend(measure(cars, prices, args.repeats))
+
+    print(f"{'rows':>7}  {'format':<10}{'req KB':>9}{'resp KB':>9}{'decode ms':>11}{'encode ms':>11}{'CPU ms':>9}")
+    for r in results:
+        print(
+            f"{r['rows']:>7}  {r['format']:<10}{r['request_kb']:>9.0f}{r['response_kb']:>9.0f}"
+            f"{r['decode_validate_ms']:>11.1f}{r['build_encode_ms']:>11.1f}{r['cpu_ms']:>9.1f}"
+        )
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Report -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
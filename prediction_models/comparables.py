@@ -0,0 +1,157 @@
+"""
+Build the comparable-listings index served by /comparables/.
+
+Rows of the training matrix are sorted by (marca, model_simplified) so every
+partition is one contiguous slice of fixed-width numpy arrays, written as
+.npy files next to a JSON manifest of partition boundaries and category
+vocabularies. The API memory-maps the arrays (backend/services/comparables.py)
+and a query only touches the rows of its own partition.
+
+Usage (from the repository root):
+    python -m prediction_models.comparables
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.comparables import (
+    CATEGORICAL_FEATURES,
+    INDEX_FORMAT,
+    MANIFEST_NAME,
+    NUMERIC_FEATURES,
+    partition_key,
+    scale_points,
+)
+from prediction_models.config import COMPARABLES_DIR
+from prediction_models.feature_store import MODEL_KEY, build
+
+logger = logging.getLogger(__name__)
+
+
+TARGET_COLUMN = "pret_log"
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def load_listings(data_path: Optional[str] = None) -> pd.DataFrame:
+    """Training matrix from the feature store, or from a train_ready CSV/Parquet."""
+    if data_path is None:
+        df, _ = build(with_meta=True)
+    elif str(data_path).endswith(".parquet"):
+        df = pd.read_parquet(data_path)
+    else:
+        df = pd.read_csv(data_path)
+
+    # train_ready files have no raw model name; fall back to the simplified one
+    if MODEL_KEY not in df.columns:
+        df[MODEL_KEY] = df["model_simplified"]
+    return df
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes (-1 for missing) and the vocabulary they index."""
+    codes, vocabulary = pd.factorize(values.astype("string").str.strip(), sort=True)
+    return codes, [str(v) for v in vocabulary]
+
+
+def _spans(keys: np.ndarray) -> Dict[str, List[int]]:
+    """{key: [start, end)} for a sorted key array."""
+    change = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [len(keys)]])
+    return {str(keys[s]): [int(s), int(e)] for s, e in zip(starts, ends)}
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+def build_index(df: pd.DataFrame, output_dir: Path) -> Dict[str, Any]:
+    """Write the arrays and manifest to output_dir; returns the manifest."""
+    df = df.dropna(subset=NUMERIC_FEATURES + [TARGET_COLUMN]).reset_index(drop=True)
+
+    brands = df["marca"].astype(str).str.strip().str.lower().to_numpy()
+    keys = np.asarray([partition_key(m, s) for m, s in zip(brands, df["model_simplified"].astype(str))])
+
+    # Stable sort: brands stay contiguous and so do their models
+    order = np.lexsort((keys, brands))
+    df = df.iloc[order].reset_index(drop=True)
+    brands, keys = brands[order], keys[order]
+
+    numeric = df[NUMERIC_FEATURES].to_numpy(dtype=np.float32)
+    prices = np.expm1(df[TARGET_COLUMN].to_numpy(dtype=np.float64)).astype(np.float32)
+
+    vocabularies: Dict[str, List[str]] = {}
+    codes = np.empty((len(df), len(CATEGORICAL_FEATURES)), dtype=np.int16)
+    for j, col in enumerate(CATEGORICAL_FEATURES):
+        codes[:, j], vocabularies[col] = _codes(df[col])
+
+    labels = np.empty((len(df), 2), dtype=np.int32)
+    labels[:, 0], vocabularies["marca"] = _codes(pd.Series(brands))
+    labels[:, 1], vocabularies["model"] = _codes(df[MODEL_KEY])
+
+    manifest = {
+        "format": INDEX_FORMAT,
+        "version": datetime.now().strftime("%Y%m%d-%H%M%S"),
+        "listings": int(len(df)),
+        "numeric_features": NUMERIC_FEATURES,
+        "categorical_features": CATEGORICAL_FEATURES,
+        "partitions": _spans(keys),
+        "brands": _spans(brands),
+        "vocabularies": vocabularies,
+    }
+
+    # Written to a sibling directory and swapped in, so a running API never
+    # maps a half-written index
+    output_dir = Path(output_dir)
+    os.makedirs(output_dir.parent, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".comparables-", dir=output_dir.parent))
+    os.chmod(tmp_dir, 0o755)
+    arrays = {"points": scale_points(numeric), "numeric": numeric, "codes": codes, "labels": labels, "prices": prices}
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+    with open(tmp_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    os.replace(tmp_dir, output_dir)
+    return manifest
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the comparable-listings index.")
+    parser.add_argument("--data", default=None,
+                        help="train_ready CSV/Parquet (default: the feature store)")
+    parser.add_argument("--output-dir", default=str(COMPARABLES_DIR))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    manifest = build_index(load_listings(args.data), Path(args.output_dir))
+    sizes = [end - start for start, end in manifest["partitions"].values()]
+    size_mb = sum(p.stat().st_size for p in Path(args.output_dir).glob("*.npy")) / (1024 * 1024)
+
+    print(f"✓ Comparables index {manifest['version']}: {manifest['listings']} listings, "
+          f"{len(sizes)} partitions (largest {max(sizes)}), {size_mb:.2f} MB")
+    print(f"  Index -> {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Compress a fitted forest pipeline into a CompactForest artifact.
+
+Variants are evaluated on the rows train.py held out for the model (its
+saved test listing_keys, looked up in the matrix it was trained on):
+    float32 thresholds/leaves, uint16 and uint8 quantized leaves (with
+    identical-leaf pruning), then greedy tree dropping on the smallest
+    variant until accuracy_percent falls outside the tolerance.
+
+Tree dropping selects trees on one half of the test split and every metric
+in the report is measured on the other half, so the report is not biased by
+the selection. The smallest variant within the tolerance is saved as
+<name>_compact.pkl with its metadata.
+
+Usage (from the repository root):
+    python -m prediction_models.compress random_forest_light --tolerance 0.5
+"""
+
+import argparse
+import copy
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from backend.services.compact_forest import CompactForest
+from prediction_models.config import METADATA_DIR, MODELS_STORAGE_DIR, REPO_ROOT
+from backend.services.text_features import TEXT_COLUMN
+from prediction_models.feature_store import META_COLUMNS
+from prediction_models.train import (
+    FEATURE_STORE_SOURCE,
+    RANDOM_STATE,
+    TARGET_COLUMN,
+    evaluate,
+    held_out_frame,
+    load_training_data,
+)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TOLERANCE = 0.5     # accuracy_percent points
+MIN_TREES = 10
+LATENCY_RUNS = 30
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def evaluation_split(
+    df: pd.DataFrame,
+    metadata_path: Optional[os.PathLike] = None,
+) -> Tuple[pd.DataFrame, np.ndarray, pd.DataFrame, np.ndarray]:
+    """
+    The model's held-out rows (train.held_out_frame), halved into (selection, report).
+
+    Trees are chosen on the selection half; metrics come from the report half.
+    """
+    test = held_out_frame(df, metadata_path)
+    X_test = test.drop(columns=[TARGET_COLUMN] + [c for c in META_COLUMNS if c in test.columns])
+    y_test = test[TARGET_COLUMN].to_numpy(dtype="float64")
+
+    X_sel, X_rep, y_sel, y_rep = train_test_split(X_test, y_test, test_size=0.5, random_state=RANDOM_STATE)
+    return X_sel, y_sel, X_rep, y_rep
+
+
+# ============================================================
+# MEASUREMENTS
+# ============================================================
+
+def pickled_size(obj: Any, compress: int = 0) -> int:
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer, compress=compress)
+    return buffer.getbuffer().nbytes
+
+
+def latency_ms(pipeline: Pipeline, X: pd.DataFrame, runs: int = LATENCY_RUNS) -> Dict[str, float]:
+    """Median single-row latency and per-row latency of one batch, in ms."""
+    row = X.iloc[:1]
+    pipeline.predict(row)  # warm-up
+
+    single = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pipeline.predict(row)
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pipeline.predict(X)
+    batch = time.perf_counter() - start
+
+    return {
+        "latency_single_ms": float(np.median(single) * 1000),
+        "latency_batch_per_row_ms": float(batch / len(X) * 1000),
+    }
+
+
+def measure(name: str, pipeline: Pipeline, X: pd.DataFrame, y: np.ndarray) -> Dict[str, Any]:
+    estimator = pipeline.steps[-1][1]
+    metrics = evaluate(y, pipeline.predict(X))
+    row = {
+        "variant": name,
+        "n_trees": len(estimator.estimators_) if hasattr(estimator, "estimators_") else estimator.n_trees,
+        "size_mb": pickled_size(pipeline) / (1024 * 1024),
+        "size_compressed_mb": pickled_size(pipeline, compress=3) / (1024 * 1024),
+        "rmse_price_eur": metrics["rmse_price_eur"],
+        "mae_price_eur": metrics["mae_price_eur"],
+        "mape_percent": metrics["mape_percent"],
+        "accuracy_percent": metrics["accuracy_percent"],
+        "metrics": metrics,
+    }
+    row.update(latency_ms(pipeline, X))
+    return row
+
+
+# ============================================================
+# TREE DROPPING
+# ============================================================
+
+def greedy_drop(
+    forest: CompactForest,
+    Xt_sel: np.ndarray,
+    y_sel: np.ndarray,
+    min_accuracy: float,
+    min_trees: int = MIN_TREES,
+) -> List[int]:
+    """
+    Backward elimination: repeatedly drop the tree whose removal hurts the
+    selection-half accuracy least; stop before accuracy drops below min_accuracy.
+
+    Returns the indices of the kept trees.
+    """
+    per_tree = forest.predict_trees(Xt_sel).T          # (n_trees, n_rows)
+    y_true = np.expm1(y_sel)
+    kept = list(range(forest.n_trees))
+    total = per_tree.sum(axis=0)
+
+    while len(kept) > min_trees:
+        k = len(kept)
+        # Prediction of the forest without each kept tree, all at once
+        without = (total[None, :] - per_tree[kept]) / (k - 1)
+        mape = np.mean(np.abs(y_true - np.expm1(without)) / np.abs(y_true), axis=1) * 100
+        best = int(np.argmin(mape))
+        if 100 - mape[best] < min_accuracy:
+            break
+        total -= per_tree[kept[best]]
+        kept.pop(best)
+
+    logger.info("Greedy dropping kept %d of %d trees", len(kept), forest.n_trees)
+    return kept
+
+
+# ============================================================
+# COMPRESSION
+# ============================================================
+
+def compress(
+    pipeline: Pipeline,
+    df: pd.DataFrame,
+    tolerance: float = DEFAULT_TOLERANCE,
+    drop_trees: bool = True,
+    metadata_path: Optional[os.PathLike] = None,
+) -> Tuple[Pipeline, List[Dict[str, Any]]]:
+    """Return the smallest pipeline within the tolerance and the full report."""
+    step, forest = pipeline.steps[-1]
+    if not isinstance(forest, RandomForestRegressor):
+        raise ValueError(f"Only RandomForestRegressor pipelines can be compressed, got {type(forest).__name__}")
+
+    preprocessor = pipeline.named_steps["preprocessor"]
+    X_sel, y_sel, X_rep, y_rep = evaluation_split(df, metadata_path)
+
+    def with_estimator(estimator) -> Pipeline:
+        return Pipeline(steps=[("preprocessor", preprocessor), (step, estimator)])
+
+    base = measure("sklearn", pipeline, X_rep, y_rep)
+    min_accuracy = base["accuracy_percent"] - tolerance
+    report = [base]
+    candidates = []
+
+    for precision in ("float32", "uint16", "uint8"):
+        compact = CompactForest.from_forest(forest, leaf_precision=precision, prune=True)
+        candidate = with_estimator(compact)
+        row = measure(f"compact-{precision}", candidate, X_rep, y_rep)
+        row["nodes"] = f"{compact.n_nodes}/{compact.n_nodes_original_}"
+        report.append(row)
+        candidates.append((row, candidate))
+
+    if drop_trees:
+        # Drop trees from the smallest quantized variant that is still within tolerance
+        within = [(r, c) for r, c in candidates if r["accuracy_percent"] >= min_accuracy]
+        if within:
+            row, candidate = min(within, key=lambda rc: rc[0]["size_mb"])
+            compact = candidate.steps[-1][1]
+            Xt_sel = preprocessor.transform(X_sel)
+            base_sel = evaluate(y_sel, forest.predict(Xt_sel))["accuracy_percent"]
+            kept = greedy_drop(compact, Xt_sel, y_sel, base_sel - tolerance)
+            dropped = with_estimator(compact.subset(kept))
+            drop_row = measure(f"{row['variant']}-drop{compact.n_trees - len(kept)}", dropped, X_rep, y_rep)
+            report.append(drop_row)
+            candidates.append((drop_row, dropped))
+
+    within = [(r, c) for r, c in candidates if r["accuracy_percent"] >= min_accuracy]
+    if not within:
+        logger.warning("No compressed variant within %.2f accuracy points; keeping the forest", tolerance)
+        return pipeline, report
+
+    chosen_row, chosen = min(within, key=lambda rc: rc[0]["size_mb"])
+    chosen_row["selected"] = True
+    return chosen, report
+
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    header = f"{'variant':<26}{'trees':>6}{'MB':>9}{'MB (z)':>9}{'RMSE €':>9}{'MAE €':>8}{'acc %':>8}{'1 row ms':>10}{'batch µs/row':>14}"
+    print(header)
+    print("-" * len(header))
+    for r in report:
+        mark = " *" if r.get("selected") else ""
+        print(
+            f"{r['variant']:<26}{r['n_trees']:>6}{r['size_mb']:>9.2f}{r['size_compressed_mb']:>9.2f}"
+            f"{r['rmse_price_eur']:>9.0f}{r['mae_price_eur']:>8.0f}{r['accuracy_percent']:>8.2f}"
+            f"{r['latency_single_ms']:>10.2f}{r['latency_batch_per_row_ms'] * 1000:>14.1f}{mark}"
+        )
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compress a forest model into a CompactForest artifact.")
+    parser.add_argument("model", nargs="?", default="random_forest_light")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--metadata-path", default=None)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed drop of accuracy_percent (points)")
+    parser.add_argument("--no-drop", action="store_true", help="skip greedy tree dropping")
+    parser.add_argument("--output-dir", default=str(MODELS_STORAGE_DIR))
+    parser.add_argument("--data", default=None,
+                        help="training matrix (CSV/Parquet); default: the data_source in the model's metadata")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    model_path = Path(args.model_path or MODELS_STORAGE_DIR / f"{args.model}.pkl")
+    metadata_path = Path(args.metadata_path or METADATA_DIR / f"{args.model}_metadata.json")
+
+    pipeline = joblib.load(model_path)
+    metadata: Dict[str, Any] = {}
+    if metadata_path.exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+    # The held-out rows are looked up in the matrix the model was trained on
+    trained_on = metadata.get("training_info", {}).get("data_source", FEATURE_STORE_SOURCE)
+    data_source = args.data or trained_on
+    if data_source != trained_on:
+        logger.warning("Evaluating on %s, not the training matrix of %s (%s)", data_source, args.model, trained_on)
+    with_text = TEXT_COLUMN in getattr(pipeline.named_steps["preprocessor"], "feature_names_in_", [])
+    df, _ = load_training_data(data_source, with_text=with_text)
+
+    chosen, report = compress(
+        pipeline, df, tolerance=args.tolerance, drop_trees=not args.no_drop, metadata_path=metadata_path
+    )
+    print_report(report)
+
+    if chosen is pipeline:
+        print("✗ No variant within tolerance; nothing written")
+        return
+
+    name = f"{args.model}_compact"
+    out_path = Path(args.output_dir) / f"{name}.pkl"
+    os.makedirs(out_path.parent, exist_ok=True)
+    joblib.dump(chosen, out_path, compress=3)
+
+    metadata = copy.deepcopy(metadata)
+    # The source model's test keys are not saved next to the compact metadata
+    metadata.get("training_info", {}).pop("test_keys", None)
+
+    selected = next(r for r in report if r.get("selected"))
+    metadata.update({
+        "saved_at": datetime.now().isoformat(),
+        "model_type": f"CompactForest ({metadata.get('model_type', 'RandomForestRegressor')})",
+        # Same keys as train.py, measured on the report half of the test split
+        "performance_metrics": selected["metrics"],
+        "compression": {
+            "source_model": os.path.relpath(model_path, REPO_ROOT),
+            "tolerance_accuracy_points": args.tolerance,
+            "report": [{k: v for k, v in r.items() if k != "metrics"} for r in report],
+        },
+    })
+    metadata.setdefault("paths", {})["model_path"] = os.path.relpath(out_path, REPO_ROOT)
+
+    meta_out = Path(args.output_dir) / "metadata" / f"{name}_metadata.json"
+    os.makedirs(meta_out.parent, exist_ok=True)
+    with open(meta_out, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"✓ {selected['variant']}: {os.path.getsize(out_path) / (1024 * 1024):.2f} MB -> {out_path}")
+    print(f"  Metadata -> {meta_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BASE_DIR.parent
+
+# Raw scraped listings, one CSV per brand (written by scraper.py)
+CAR_DATA_DIR = REPO_ROOT / "carData"
+
+DATA_DIR = BASE_DIR / "data"
+PROCESSED_DIR = DATA_DIR / "processed"
+
+CLEANED_PATH = PROCESSED_DIR / "cleaned.csv"
+INGEST_REPORT_PATH = PROCESSED_DIR / "ingest_report.json"
+TRAIN_READY_PATH = PROCESSED_DIR / "train_ready.csv"
+
+# Columnar store (see dataset_store.py)
+DATASET_DIR = PROCESSED_DIR / "dataset"
+TRAIN_READY_PARQUET_PATH = PROCESSED_DIR / "train_ready.parquet"
+
+# Incremental per-brand feature partitions (see feature_store.py)
+FEATURE_STORE_DIR = DATA_DIR / "feature_store"
+
+# Serving artifacts live next to the API
+MODELS_STORAGE_DIR = REPO_ROOT / "backend" / "models_storage"
+METADATA_DIR = MODELS_STORAGE_DIR / "metadata"
+LOOKUP_TABLES_PATH = MODELS_STORAGE_DIR / "lookup_tables.json"
+DRIFT_REFERENCE_PATH = MODELS_STORAGE_DIR / "drift_reference.json"
+
+# Cached preprocessing output reused across training runs (see train.py)
+CACHE_DIR = DATA_DIR / "cache"
+
+# Versioned artifacts published by retrain.py
+VERSIONS_DIR = MODELS_STORAGE_DIR / "versions"
+
+# Memory-mapped comparable-listings index (see comparables.py)
+COMPARABLES_DIR = MODELS_STORAGE_DIR / "comparables"
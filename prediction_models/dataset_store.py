@@ -0,0 +1,275 @@
+"""
+Columnar Parquet store for the cleaned listings and the training matrix.
+
+Layout under data/processed/dataset/:
+    specs/marca=<brand>/*.parquet         structured fields, partitioned by brand
+    descriptions/marca=<brand>/*.parquet  row_id + free-text descriere
+
+Categorical columns are written as dictionary-encoded columns and numerics are
+downcast, so readers can pull only the columns (and brands) they need straight
+from memory-mapped files instead of re-parsing the CSVs. Integers are downcast
+losslessly; floats become float32 in the listings store only. The training
+matrix keeps float64 unless write_train_ready(downcast_floats=True) is asked
+for, so a model trained from Parquet sees the same feature values (and split
+thresholds) as one trained from the CSV or the feature store.
+
+Usage (from the repository root):
+    python -m prediction_models.dataset_store --workers 4
+    python -m prediction_models.dataset_store --out /tmp/dataset --train-ready-out /tmp/train_ready.parquet
+"""
+
+import argparse
+import logging
+import os
+import shutil
+from typing import Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from prediction_models.config import (
+    CAR_DATA_DIR,
+    DATASET_DIR,
+    TRAIN_READY_PARQUET_PATH,
+    TRAIN_READY_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+SPECS_DIR = "specs"
+DESCRIPTIONS_DIR = "descriptions"
+PARTITION_COLUMN = "marca"
+ROW_ID = "row_id"
+DESCRIPTION_COLUMN = "descriere"
+
+# Targets keep full precision even when the other floats are stored as float32
+FULL_PRECISION_COLUMNS = {"pret", "pret_log"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "The dataset store needs pyarrow: pip install -r prediction_models/requirements.txt"
+        ) from e
+    return pq
+
+
+# ============================================================
+# DTYPES
+# ============================================================
+
+def compact_frame(
+    df: pd.DataFrame,
+    text_columns: Iterable[str] = (DESCRIPTION_COLUMN,),
+    downcast_floats: bool = True,
+) -> pd.DataFrame:
+    """Categoricals -> category, ints (and floats, if downcast_floats) downcast; free text is left alone."""
+    out = df.copy()
+    text_columns = set(text_columns)
+
+    for col in out.columns:
+        series = out[col]
+        if col in text_columns:
+            continue
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            out[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            if downcast_floats and col not in FULL_PRECISION_COLUMNS:
+                out[col] = series.astype("float32")
+        elif not isinstance(series.dtype, pd.CategoricalDtype):
+            out[col] = series.astype("category")
+
+    return out
+
+
+def _dictionary_columns(pq, path: str) -> List[str]:
+    """String columns stored in the files, to be read back as dictionaries."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = ds.dataset(path, format="parquet", partitioning="hive").schema
+    return [
+        field.name for field in schema
+        if field.name != DESCRIPTION_COLUMN
+        and (pa.types.is_dictionary(field.type) or pa.types.is_string(field.type))
+    ]
+
+
+# ============================================================
+# CLEANED LISTINGS
+# ============================================================
+
+def write_dataset(df: pd.DataFrame, root: os.PathLike = DATASET_DIR) -> None:
+    """Write the cleaned listings as brand-partitioned Parquet (replaces the store)."""
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    root = str(root)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    df = df.reset_index(drop=True)
+    df.insert(0, ROW_ID, pd.RangeIndex(len(df), dtype="int32"))
+
+    specs = compact_frame(df.drop(columns=[DESCRIPTION_COLUMN], errors="ignore"))
+    pq.write_to_dataset(
+        pa.Table.from_pandas(specs, preserve_index=False),
+        root_path=os.path.join(root, SPECS_DIR),
+        partition_cols=[PARTITION_COLUMN],
+        use_dictionary=True,
+        compression="zstd",
+    )
+
+    if DESCRIPTION_COLUMN in df.columns:
+        descriptions = df[[ROW_ID, PARTITION_COLUMN, DESCRIPTION_COLUMN]]
+        pq.write_to_dataset(
+            pa.Table.from_pandas(descriptions, preserve_index=False),
+            root_path=os.path.join(root, DESCRIPTIONS_DIR),
+            partition_cols=[PARTITION_COLUMN],
+            use_dictionary=False,
+            compression="zstd",
+        )
+
+    logger.info("✓ Dataset store written to %s (%d rows)", root, len(df))
+
+
+def _read_group(
+    path: str,
+    columns: Optional[Sequence[str]],
+    brands: Optional[Sequence[str]],
+) -> pd.DataFrame:
+    pq = _require_pyarrow()
+
+    filters = [(PARTITION_COLUMN, "in", list(brands))] if brands else None
+    table = pq.read_table(
+        path,
+        columns=list(columns) if columns is not None else None,
+        filters=filters,
+        memory_map=True,
+        read_dictionary=_dictionary_columns(pq, path),
+    )
+    return table.to_pandas()
+
+
+def read_dataset(
+    columns: Optional[Sequence[str]] = None,
+    brands: Optional[Sequence[str]] = None,
+    with_description: bool = False,
+    root: os.PathLike = DATASET_DIR,
+) -> pd.DataFrame:
+    """
+    Load cleaned listings from the store.
+
+    Only the requested columns and brand partitions are read; the description
+    column group is joined on row_id only when with_description is set.
+    """
+    root = str(root)
+    if columns is not None:
+        columns = [c for c in columns if c != DESCRIPTION_COLUMN]
+        if ROW_ID not in columns:
+            columns = [ROW_ID] + columns
+
+    df = _read_group(os.path.join(root, SPECS_DIR), columns, brands)
+
+    if with_description:
+        texts = _read_group(
+            os.path.join(root, DESCRIPTIONS_DIR), [ROW_ID, DESCRIPTION_COLUMN], brands
+        )
+        df = df.merge(texts, on=ROW_ID, how="left")
+
+    return df.sort_values(ROW_ID, kind="stable").reset_index(drop=True)
+
+
+def read_descriptions(
+    brands: Optional[Sequence[str]] = None,
+    root: os.PathLike = DATASET_DIR,
+) -> pd.DataFrame:
+    """Load only the row_id/descriere column group."""
+    path = os.path.join(str(root), DESCRIPTIONS_DIR)
+    return _read_group(path, [ROW_ID, PARTITION_COLUMN, DESCRIPTION_COLUMN], brands)
+
+
+# ============================================================
+# TRAINING MATRIX
+# ============================================================
+
+def write_train_ready(
+    df: pd.DataFrame,
+    path: os.PathLike = TRAIN_READY_PARQUET_PATH,
+    downcast_floats: bool = False,
+) -> None:
+    """
+    Write the training matrix as a single compact Parquet file.
+
+    Float features stay float64 by default: float32 values move the split
+    thresholds a model learns. downcast_floats=True trades that for size.
+    """
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    table = pa.Table.from_pandas(compact_frame(df, downcast_floats=downcast_floats), preserve_index=False)
+    pq.write_table(table, str(path), use_dictionary=True, compression="zstd")
+    logger.info("✓ Training matrix written to %s (%d rows)", path, len(df))
+
+
+def train_ready_columns(path: os.PathLike = TRAIN_READY_PARQUET_PATH) -> List[str]:
+    """Column names of a training-matrix file (schema only, no data read)."""
+    pq = _require_pyarrow()
+    return list(pq.read_schema(str(path)).names)
+
+
+def read_train_ready(
+    columns: Optional[Sequence[str]] = None,
+    path: os.PathLike = TRAIN_READY_PARQUET_PATH,
+) -> pd.DataFrame:
+    """Load (a column subset of) the training matrix, memory-mapped."""
+    pq = _require_pyarrow()
+
+    table = pq.read_table(
+        str(path),
+        columns=list(columns) if columns is not None else None,
+        memory_map=True,
+    )
+    return table.to_pandas()
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from prediction_models.ingest import load_clean_dataset
+
+    parser = argparse.ArgumentParser(description="Build the Parquet dataset store.")
+    parser.add_argument("--data-dir", default=str(CAR_DATA_DIR))
+    parser.add_argument("--out", default=str(DATASET_DIR))
+    parser.add_argument("--train-ready", default=str(TRAIN_READY_PATH),
+                        help="CSV training matrix to convert ('' to skip)")
+    parser.add_argument("--train-ready-out", default=str(TRAIN_READY_PARQUET_PATH),
+                        help="Parquet file for the converted training matrix")
+    parser.add_argument("--downcast-floats", action="store_true",
+                        help="store the training matrix's float features as float32 (smaller, not bit-identical)")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    df, report = load_clean_dataset(args.data_dir, workers=args.workers)
+    write_dataset(df, args.out)
+    print(f"✓ Stored {len(df)} cleaned listings in {args.out}")
+    print(f"  Parse failures: {report['totals'].get('parse_failures', {})}")
+
+    if args.train_ready and os.path.exists(args.train_ready):
+        train = pd.read_csv(args.train_ready)
+        write_train_ready(train, args.train_ready_out, downcast_floats=args.downcast_floats)
+        print(f"✓ Converted {args.train_ready} -> {args.train_ready_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Near-duplicate listing detection with MinHash + locality-sensitive hashing.
+
+Dealers repost the same car and the same ad shows up under several brand
+pages. Each listing is turned into a set of shingles (character 5-grams of
+the normalized descriere plus tokens for model / an fabricatie / rulaj /
+putere / pret), summarized by a MinHash signature, and bucketed by LSH
+bands, so only listings that share a band are compared. Candidate pairs
+are confirmed on the estimated Jaccard similarity and on compatible specs,
+and clusters are the connected components of the confirmed pairs.
+
+Everything is vectorized with numpy and processed in chunks, so the cost is
+near-linear in the number of listings.
+
+Usage (from the repository root):
+    python -m prediction_models.dedup --workers 4
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from prediction_models.config import CAR_DATA_DIR, PROCESSED_DIR
+
+logger = logging.getLogger(__name__)
+
+
+DEDUPLICATED_PATH = PROCESSED_DIR / "deduplicated.csv"
+CLUSTERS_PATH = PROCESSED_DIR / "duplicate_clusters.csv"
+DEDUP_REPORT_PATH = PROCESSED_DIR / "dedup_report.json"
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16                  # 16 bands x 8 rows: ~0.7 similarity threshold
+SIMILARITY_THRESHOLD = 0.8
+MAX_BUCKET_PAIRS = 50       # larger buckets are chained instead of all-pairs
+CHUNK_SIZE = 5000
+SEED = 42
+
+# Universal hashing (a * x + b) mod p with p < 2**32 stays inside uint64
+_PRIME = np.uint64(4294967291)
+
+# Spec tolerances for a confirmed duplicate (reposts often change the price)
+PRICE_TOLERANCE = 0.15
+MILEAGE_TOLERANCE = 0.05
+MILEAGE_SLACK_KM = 1000
+
+DESCRIPTION_COLUMN = "descriere"
+
+
+# ============================================================
+# SHINGLES
+# ============================================================
+
+def normalize_text(texts: pd.Series) -> pd.Series:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return (
+        texts.fillna("").astype(str).str.lower()
+        .str.replace(r"[^\w]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def spec_tokens(df: pd.DataFrame) -> List[pd.Series]:
+    """One token column per key spec; price and mileage are coarsely bucketed."""
+    return [
+        "model=" + df["model"].fillna("").astype(str).str.lower().str.strip(),
+        "an=" + df["an fabricatie"].astype("Int64").astype(str),
+        "rulaj=" + (df["rulaj"] // 5000).astype("Int64").astype(str),
+        "putere=" + df["putere"].astype("Int64").astype(str),
+        "pret=" + np.round(np.log(df["pret"].astype(float).clip(lower=1)) / 0.1).astype("Int64").astype(str),
+    ]
+
+
+def _mix32(x: np.ndarray) -> np.ndarray:
+    """Cheap avalanche of uint64 values down to 32 bits."""
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(0xFF51AFD7ED558CCD)
+    x = x ^ (x >> np.uint64(33))
+    return (x & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def shingle_hashes(texts: pd.Series, k: int = SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    32-bit hashes of the character k-grams of every text.
+
+    Returns (hashes, doc) where doc[i] is the position of the text that
+    hashes[i] came from. All texts are hashed in one pass over their
+    concatenated bytes; windows that cross a text boundary are dropped.
+    """
+    encoded = [t.encode("utf-8") for t in texts.tolist()]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    if len(buffer) < k:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+
+    # Polynomial hash of every window, sum(byte_j * 257**(k-1-j)), one shifted pass per position
+    m = len(buffer) - k + 1
+    rolling = np.zeros(m, dtype=np.uint64)
+    for j in range(k):
+        rolling = rolling * np.uint64(257) + buffer[j:j + m]
+    hashes = _mix32(rolling)
+
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    doc_of_byte = np.repeat(np.arange(len(lengths)), lengths)[: len(hashes)]
+    valid = np.arange(len(hashes)) + k <= (starts + lengths)[doc_of_byte]
+    return hashes[valid], doc_of_byte[valid]
+
+
+def token_hashes(tokens: List[pd.Series]) -> Tuple[np.ndarray, np.ndarray]:
+    """32-bit hashes of per-row tokens (one per row per token column)."""
+    hashes, docs = [], []
+    for column in tokens:
+        h = pd.util.hash_pandas_object(column, index=False).to_numpy()
+        hashes.append(_mix32(h))
+        docs.append(np.arange(len(column)))
+    return np.concatenate(hashes), np.concatenate(docs)
+
+
+# ============================================================
+# MINHASH
+# ============================================================
+
+def _permutations(num_perm: int, seed: int = SEED) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_chunk(chunk: pd.DataFrame, num_perm: int = NUM_PERM, k: int = SHINGLE_SIZE, seed: int = SEED) -> np.ndarray:
+    """MinHash signatures (n_rows x num_perm, uint32) of one chunk of listings."""
+    text_h, text_doc = shingle_hashes(normalize_text(chunk[DESCRIPTION_COLUMN]), k)
+    spec_h, spec_doc = token_hashes(spec_tokens(chunk))
+
+    # Unique (doc, shingle) pairs, sorted by doc; every row has spec tokens,
+    # so no document is empty
+    keys = np.unique(
+        (np.concatenate([text_doc, spec_doc]).astype(np.uint64) << np.uint64(32))
+        | np.concatenate([text_h, spec_h]).astype(np.uint64)
+    )
+    docs = (keys >> np.uint64(32)).astype(np.int64)
+    hashes = keys & np.uint64(0xFFFFFFFF)
+    starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(chunk), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        permuted = (a[i] * hashes + b[i]) % _PRIME
+        signatures[:, i] = np.minimum.reduceat(permuted, starts)
+    return signatures
+
+
+def minhash_signatures(
+    df: pd.DataFrame,
+    num_perm: int = NUM_PERM,
+    k: int = SHINGLE_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = 1,
+) -> np.ndarray:
+    """Signatures of all listings, computed chunk by chunk (optionally in processes)."""
+    chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(minhash_chunk, chunks, [num_perm] * len(chunks), [k] * len(chunks)))
+    else:
+        parts = [minhash_chunk(c, num_perm, k) for c in chunks]
+    return np.concatenate(parts) if parts else np.empty((0, num_perm), dtype=np.uint32)
+
+
+# ============================================================
+# LSH
+# ============================================================
+
+def lsh_candidate_pairs(
+    signatures: np.ndarray,
+    bands: int = BANDS,
+    max_bucket_pairs: int = MAX_BUCKET_PAIRS,
+) -> np.ndarray:
+    """
+    Pairs (i < j) of rows that share at least one band, shape (n_pairs, 2).
+
+    Buckets up to max_bucket_pairs rows contribute all pairs; larger ones
+    (templated dealer text) are chained, which is enough for clustering.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    found = []
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        boundaries = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1], True])
+        sizes = np.diff(boundaries)
+        for start, size in zip(boundaries[:-1][sizes > 1], sizes[sizes > 1]):
+            members = np.sort(order[start:start + size])
+            if size <= max_bucket_pairs:
+                i, j = np.triu_indices(size, k=1)
+                found.append(np.column_stack([members[i], members[j]]))
+            else:
+                found.append(np.column_stack([members[:-1], members[1:]]))
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+
+    pairs = np.concatenate(found).astype(np.int64)
+    codes = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.column_stack([codes // n, codes % n])
+
+
+def confirm_pairs(
+    df: pd.DataFrame,
+    signatures: np.ndarray,
+    pairs: np.ndarray,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep candidate pairs with similar signatures and compatible specs."""
+    if len(pairs) == 0:
+        return pairs, np.empty(0)
+
+    i, j = pairs[:, 0], pairs[:, 1]
+    similarity = (signatures[i] == signatures[j]).mean(axis=1)
+
+    model = df["model"].fillna("").astype(str).str.lower().str.strip().to_numpy()
+    year = df["an fabricatie"].to_numpy(dtype="float64")
+    power = df["putere"].to_numpy(dtype="float64")
+    mileage = df["rulaj"].to_numpy(dtype="float64")
+    price = df["pret"].to_numpy(dtype="float64")
+
+    compatible = (
+        (model[i] == model[j])
+        & (year[i] == year[j])
+        & (np.abs(power[i] - power[j]) <= 1)
+        & (np.abs(mileage[i] - mileage[j]) <= np.maximum(MILEAGE_SLACK_KM, MILEAGE_TOLERANCE * np.maximum(mileage[i], mileage[j])))
+        & (np.abs(price[i] - price[j]) <= PRICE_TOLERANCE * np.maximum(price[i], price[j]))
+    )
+    keep = (similarity >= threshold) & compatible
+    return pairs[keep], similarity[keep]
+
+
+def cluster_labels(n: int, pairs: np.ndarray) -> np.ndarray:
+    """Connected components of the confirmed duplicate pairs."""
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+# ============================================================
+# DEDUPLICATION
+# ============================================================
+
+def canonical_rows(df: pd.DataFrame, labels: np.ndarray) -> np.ndarray:
+    """Per cluster, the listing with the longest description (first one on ties)."""
+    order = pd.DataFrame({
+        "cluster": labels,
+        "length": df[DESCRIPTION_COLUMN].fillna("").astype(str).str.len().to_numpy(),
+        "position": np.arange(len(df)),
+    }).sort_values(["cluster", "length", "position"], ascending=[True, False, True], kind="stable")
+    return np.sort(order.drop_duplicates("cluster")["position"].to_numpy())
+
+
+def find_duplicates(
+    df: pd.DataFrame,
+    threshold: float = SIMILARITY_THRESHOLD,
+    num_perm: int = NUM_PERM,
+    bands: int = BANDS,
+    workers: int = 1,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Cluster near-duplicate listings.
+
+    Returns a frame with one row per listing (position, cluster, canonical,
+    cluster_size, marca, model, pret) and a summary report.
+    """
+    df = df.reset_index(drop=True)
+    signatures = minhash_signatures(df, num_perm=num_perm, workers=workers)
+    candidates = lsh_candidate_pairs(signatures, bands=bands)
+    pairs, similarity = confirm_pairs(df, signatures, candidates, threshold)
+    labels = cluster_labels(len(df), pairs)
+
+    canonical = np.zeros(len(df), dtype=bool)
+    canonical[canonical_rows(df, labels)] = True
+
+    clusters = pd.DataFrame({
+        "position": np.arange(len(df)),
+        "cluster": labels,
+        "canonical": canonical,
+        "marca": df["marca"].to_numpy(),
+        "model": df["model"].to_numpy(),
+        "pret": df["pret"].to_numpy(),
+    })
+    sizes = clusters["cluster"].map(clusters["cluster"].value_counts())
+    clusters["cluster_size"] = sizes.to_numpy()
+
+    duplicated = clusters[clusters["cluster_size"] > 1]
+    largest = (
+        duplicated.groupby("cluster")
+        .agg(size=("position", "size"), brands=("marca", lambda s: sorted(set(map(str, s)))),
+             model=("model", "first"), min_price=("pret", "min"), max_price=("pret", "max"))
+        .sort_values("size", ascending=False)
+        .head(20)
+    )
+
+    report = {
+        "listings": int(len(df)),
+        "candidate_pairs": int(len(candidates)),
+        "confirmed_pairs": int(len(pairs)),
+        "mean_pair_similarity": float(similarity.mean()) if len(similarity) else None,
+        "duplicate_clusters": int(duplicated["cluster"].nunique()),
+        "listings_in_clusters": int(len(duplicated)),
+        "duplicates_removed": int(len(df) - canonical.sum()),
+        "cross_brand_clusters": int((duplicated.groupby("cluster")["marca"].nunique() > 1).sum()),
+        "params": {
+            "shingle_size": SHINGLE_SIZE,
+            "num_perm": num_perm,
+            "bands": bands,
+            "similarity_threshold": threshold,
+        },
+        "largest_clusters": [
+            {"cluster": int(c), **{k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}}
+            for c, row in largest.iterrows()
+        ],
+    }
+    logger.info(
+        "Dedup: %d listings, %d candidate pairs, %d confirmed, %d duplicates removed",
+        report["listings"], report["candidate_pairs"], report["confirmed_pairs"], report["duplicates_removed"],
+    )
+    return clusters, report
+
+
+def drop_duplicates(df: pd.DataFrame, **kwargs) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Canonical listings only, plus the dedup report."""
+    df = df.reset_index(drop=True)
+    clusters, report = find_duplicates(df, **kwargs)
+    return df[clusters["canonical"].to_numpy()].reset_index(drop=True), report
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from prediction_models.ingest import load_clean_dataset
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate listings (MinHash/LSH).")
+    parser.add_argument("--data-dir", default=str(CAR_DATA_DIR))
+    parser.add_argument("--out", default=str(DEDUPLICATED_PATH))
+    parser.add_argument("--clusters", default=str(CLUSTERS_PATH))
+    parser.add_argument("--report", default=str(DEDUP_REPORT_PATH))
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM)
+    parser.add_argument("--bands", type=int, default=BANDS)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.num_perm % args.bands:
+        parser.error("--num-perm must be a multiple of --bands")
+
+    logging.basicConfig(level=logging.INFO)
+
+    df, _ = load_clean_dataset(args.data_dir, workers=args.workers, include_description=True)
+    clusters, report = find_duplicates(
+        df, threshold=args.threshold, num_perm=args.num_perm, bands=args.bands, workers=args.workers,
+    )
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    df[clusters["canonical"].to_numpy()].to_csv(args.out, index=False)
+    clusters[clusters["cluster_size"] > 1].sort_values(["cluster", "position"]).to_csv(args.clusters, index=False)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"✓ {report['listings']} listings -> {report['listings'] - report['duplicates_removed']} canonical")
+    print(f"  Duplicate clusters: {report['duplicate_clusters']} "
+          f"({report['cross_brand_clusters']} across brands)")
+    print(f"  Canonical listings -> {args.out}")
+    print(f"  Clusters -> {args.clusters}")
+    print(f"  Report -> {args.report}")
+
+
+if __name__ == "__main__":
+    main()
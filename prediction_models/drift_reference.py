@@ -0,0 +1,52 @@
+"""
+Build the drift reference profile shipped with the model.
+
+Decile bins and proportions of the numeric request fields, the category
+shares of the categorical ones and the UNKNOWN-model rate of the training
+matrix; the API's drift monitor (backend/services/drift.py) compares the
+sketches of live requests against it. train.py writes it next to the lookup
+tables; this rebuilds it on its own.
+
+Usage (from the repository root):
+    python -m prediction_models.drift_reference --data prediction_models/data/processed/train_ready.csv
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from backend.services.drift import MONITORED_COLUMNS, build_reference_profile, write_reference_profile
+from prediction_models.config import DRIFT_REFERENCE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the drift reference profile.")
+    parser.add_argument("--data", default=None,
+                        help="training matrix (CSV/Parquet); default: refresh the feature store")
+    parser.add_argument("--out", default=str(DRIFT_REFERENCE_PATH))
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.data is None:
+        from prediction_models.feature_store import build
+        df, _ = build(workers=args.workers)
+    elif args.data.endswith(".parquet"):
+        from prediction_models.dataset_store import read_train_ready
+        df = read_train_ready(columns=MONITORED_COLUMNS, path=args.data)
+    else:
+        df = pd.read_csv(args.data, usecols=lambda c: c in MONITORED_COLUMNS)
+
+    profile = build_reference_profile(df)
+    write_reference_profile(profile, args.out)
+    print(f"✓ Drift reference: {profile['rows']} rows, "
+          f"{len(profile['numeric'])} numeric + {len(profile['categorical'])} categorical fields -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
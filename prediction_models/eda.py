@@ -0,0 +1,462 @@
+"""
+EDA report: the charts of data_cleaning.ipynb (plots/eda) from one pass over
+the cleaned dataset.
+
+The dataset is read once and every chart is reduced to the aggregates it
+draws (histogram counts, KDE curves, box statistics, value counts, the
+correlation matrix, sampled points for pairplots). Each chart's aggregates
+are hashed; charts whose hash matches the one recorded in the cache manifest
+(plots/eda/.eda_cache.json) are kept as they are, the others are rendered in
+parallel worker processes. Pairplots draw a fixed random sample of the rows
+(--pairplot-rows, 0 for all of them); their diagonals use the full data.
+
+Usage (from the repository root):
+    python -m prediction_models.eda --workers 4
+    python -m prediction_models.eda --force --pairplot-rows 0
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.feature_engineer import BRAND_CATEGORIES
+from prediction_models.config import BASE_DIR, CAR_DATA_DIR, CLEANED_PATH
+
+logger = logging.getLogger(__name__)
+
+
+PLOT_DIR = BASE_DIR / "plots" / "eda"
+CACHE_MANIFEST = ".eda_cache.json"
+# Bump when a renderer changes, so every chart is redrawn once
+RENDER_VERSION = 1
+DPI = 300
+
+NUMERIC_COLUMNS = ["pret", "capacitate motor", "putere", "rulaj", "an fabricatie"]
+CATEGORICAL_COLUMNS = ["marca", "model", "combustibil", "caroserie", "culoare", "cutie viteza"]
+LOG_PAIRPLOT_COLUMNS = ["pret_log", "capacitate motor", "putere", "rulaj", "an fabricatie"]
+MAIN_CATEGORIES = [
+    ("caroserie", "Log price by caroserie"),
+    ("brand_category", "Log price by brand category"),
+    ("combustibil", "Log price by fuel type (combustibil)"),
+    ("cutie viteza", "Log price by transmission (cutie viteza)"),
+]
+
+HIST_BINS = 100
+GRID_BINS = 50
+KDE_POINTS = 200
+TOP_CATEGORIES = 20
+COMMON_BRAND_MIN = 100
+PAIRPLOT_ROWS = 5000
+MAX_FLIERS = 500            # outliers drawn per box
+SEED = 42
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def load_eda_frame(data_path: Optional[os.PathLike] = None, workers: int = 1) -> pd.DataFrame:
+    """The cleaned listings (cleaned.csv, or ingested from carData) with pret_log and brand_category."""
+    if data_path is not None or CLEANED_PATH.exists():
+        df = pd.read_csv(data_path or CLEANED_PATH)
+    else:
+        from prediction_models.ingest import load_clean_dataset
+        df, _ = load_clean_dataset(CAR_DATA_DIR, workers=workers, include_description=False)
+
+    df = df.drop(columns=["descriere"], errors="ignore")
+    df["pret"] = pd.to_numeric(df["pret"], errors="coerce")
+    df = df[df["pret"].notna()].reset_index(drop=True)
+    df["pret_log"] = np.log1p(df["pret"])
+    df["brand_category"] = df["marca"].str.lower().map(BRAND_CATEGORIES).fillna("standard")
+    return df
+
+
+# ============================================================
+# AGGREGATES (computed once, in the parent process)
+# ============================================================
+
+def _histogram(values: pd.Series, bins: int, kde: bool = False) -> Dict[str, Any]:
+    values = values.dropna().to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(values, bins=bins)
+    hist = {"edges": edges, "counts": counts}
+    if kde and values.size > 1 and values.std() > 0:
+        from scipy.stats import gaussian_kde
+
+        grid = np.linspace(edges[0], edges[-1], KDE_POINTS)
+        # Scaled to counts per bin, like seaborn's histplot(kde=True)
+        hist["kde_x"] = grid
+        hist["kde_y"] = gaussian_kde(values)(grid) * values.size * (edges[1] - edges[0])
+    return hist
+
+
+def _box_stats(values: pd.Series, label: str = "") -> Dict[str, Any]:
+    from matplotlib.cbook import boxplot_stats
+
+    stats = boxplot_stats(values.dropna().to_numpy(dtype=np.float64), whis=1.5, labels=[label])[0]
+    fliers = np.sort(stats["fliers"])
+    if fliers.size > MAX_FLIERS:
+        # Evenly spaced over the sorted outliers keeps the extremes
+        fliers = fliers[np.linspace(0, fliers.size - 1, MAX_FLIERS).astype(int)]
+    stats["fliers"] = fliers
+    return {k: stats[k] for k in ("label", "whislo", "q1", "med", "q3", "whishi", "fliers")}
+
+
+def _grouped_box_stats(df: pd.DataFrame, by: str, value: str) -> List[Dict[str, Any]]:
+    groups = df.groupby(by, sort=False, observed=True)[value]
+    return [_box_stats(values, str(name)) for name, values in groups]
+
+
+def _sample(df: pd.DataFrame, columns: List[str], rows: int) -> pd.DataFrame:
+    frame = df[columns].dropna()
+    if rows and len(frame) > rows:
+        frame = frame.sample(n=rows, random_state=SEED)
+    return frame.reset_index(drop=True)
+
+
+def chart_specs(df: pd.DataFrame, pairplot_rows: int = PAIRPLOT_ROWS) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(file name, renderer, aggregates) of every chart of the report."""
+    specs = [
+        ("01_pret_distribution.png", "histogram", {
+            **_histogram(df["pret"], HIST_BINS, kde=True),
+            "title": "Distribution of Price (pret) with Density Curve", "xlabel": "pret",
+        }),
+        ("02_numeric_histograms.png", "histogram_grid", {
+            "panels": {col: _histogram(df[col], GRID_BINS) for col in NUMERIC_COLUMNS},
+            "title": "Numeric Feature Distributions",
+        }),
+        ("03_numeric_boxplots.png", "box_grid", {
+            "panels": {col: _box_stats(df[col]) for col in NUMERIC_COLUMNS},
+        }),
+    ]
+
+    for col in CATEGORICAL_COLUMNS:
+        counts = df[col].value_counts().head(TOP_CATEGORIES)
+        specs.append((f"04_counts_{col}.png", "bar_counts", {
+            "labels": [str(v) for v in counts.index], "counts": counts.to_numpy(),
+            "title": f"Top categories in {col}",
+        }))
+    for col in CATEGORICAL_COLUMNS:
+        specs.append((f"05_price_by_{col}.png", "category_boxes", {
+            "boxes": _grouped_box_stats(df, col, "pret"),
+            "title": f"Price distribution by {col}", "xlabel": col, "ylabel": "pret",
+        }))
+
+    specs += [
+        ("06_correlation_matrix.png", "heatmap", {
+            "corr": df[NUMERIC_COLUMNS].corr(), "title": "Correlation Matrix of Numeric Features",
+        }),
+        ("07_numeric_pairplot.png", "pairplot", {
+            "sample": _sample(df, NUMERIC_COLUMNS, pairplot_rows),
+            "diagonals": {col: _histogram(df[col], GRID_BINS, kde=True) for col in NUMERIC_COLUMNS},
+            "title": "Pairplot of Numeric Features",
+        }),
+    ]
+
+    scatters = [
+        ("08_price_vs_rulaj.png", "rulaj", "Price vs Mileage (rulaj)"),
+        ("09_price_vs_capacitate_motor.png", "capacitate motor", "Price vs Engine Capacity (capacitate motor)"),
+        ("10_price_vs_putere.png", "putere", "Price vs Power (putere)"),
+        ("11_price_vs_an_fabricatie.png", "an fabricatie", "Price vs Year of Fabrication"),
+    ]
+    for name, col, title in scatters:
+        points = df[[col, "pret"]].dropna()
+        specs.append((name, "scatter", {
+            "x": points[col].to_numpy(), "y": points["pret"].to_numpy(),
+            "title": title, "xlabel": col, "ylabel": "pret",
+        }))
+
+    specs += [
+        ("12_pret_log_distribution.png", "histogram", {
+            **_histogram(df["pret_log"], HIST_BINS, kde=True),
+            "title": "Log-Transformed Price Distribution", "xlabel": "log(1 + pret)",
+        }),
+        ("13_pairplot_log_price.png", "pairplot", {
+            "sample": _sample(df, LOG_PAIRPLOT_COLUMNS, pairplot_rows),
+            "diagonals": {col: _histogram(df[col], GRID_BINS, kde=True) for col in LOG_PAIRPLOT_COLUMNS},
+            "title": "Pairplot with Log-Transformed Price",
+        }),
+        ("log_price_by_main_categories.png", "category_box_grid", {
+            "panels": [
+                {"boxes": _grouped_box_stats(df, col, "pret_log"), "title": title, "xlabel": col,
+                 "ylabel": "log(1 + pret)", "rotate": col != "brand_category"}
+                for col, title in MAIN_CATEGORIES
+            ],
+            "title": "Log price vs main categorical features",
+        }),
+    ]
+
+    brand_counts = df["marca"].value_counts()
+    common = df[df["marca"].isin(brand_counts[brand_counts >= COMMON_BRAND_MIN].index)]
+    specs.append(("log_price_by_brand_common.png", "category_boxes", {
+        "boxes": _grouped_box_stats(common, "marca", "pret_log"),
+        "title": f"Log price by brand (brands with ≥ {COMMON_BRAND_MIN} cars)",
+        "xlabel": "marca", "ylabel": "log(1 + pret)", "rotation": 45, "figsize": (14, 6),
+    }))
+    return specs
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+def _feed(h, obj: Any) -> None:
+    """Hash obj's content (not its pickle, which is not stable across runs)."""
+    if isinstance(obj, dict):
+        h.update(b"{")
+        for key in sorted(obj, key=str):
+            h.update(repr(key).encode())
+            _feed(h, obj[key])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _feed(h, item)
+        h.update(b"]")
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        names = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        h.update(repr(names).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        h.update(repr(obj).encode())
+
+
+def chart_digest(name: str, renderer: str, payload: Dict[str, Any], dpi: int = DPI) -> str:
+    h = hashlib.sha256()
+    _feed(h, (RENDER_VERSION, name, renderer, dpi, payload))
+    return h.hexdigest()
+
+
+def _read_manifest(path: Path) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ============================================================
+# RENDERERS (run in the worker processes)
+# ============================================================
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+
+    mpl.rcParams["axes.formatter.useoffset"] = False
+    mpl.rcParams["axes.formatter.limits"] = (0, 5)   # no sci-notation between 1 and 100 000
+    return plt
+
+
+def _draw_histogram(ax, hist: Dict[str, Any]) -> None:
+    edges = hist["edges"]
+    ax.stairs(hist["counts"], edges, fill=True, alpha=0.6)
+    if "kde_x" in hist:
+        ax.plot(hist["kde_x"], hist["kde_y"])
+
+
+def _draw_boxes(ax, boxes: List[Dict[str, Any]], vert: bool = True) -> None:
+    ax.bxp(boxes, orientation="vertical" if vert else "horizontal", patch_artist=True,
+           flierprops={"markersize": 3, "alpha": 0.5})
+
+
+def render_histogram(plt, p):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    _draw_histogram(ax, p)
+    ax.set(title=p["title"], xlabel=p["xlabel"], ylabel="Frequency")
+    return fig
+
+
+def render_histogram_grid(plt, p):
+    fig, axes = plt.subplots(2, 3, figsize=(14, 10))
+    for ax, (col, hist) in zip(axes.ravel(), p["panels"].items()):
+        _draw_histogram(ax, hist)
+        ax.set_title(col)
+    for ax in axes.ravel()[len(p["panels"]):]:
+        ax.set_visible(False)
+    fig.suptitle(p["title"])
+    return fig
+
+
+def render_box_grid(plt, p):
+    fig, axes = plt.subplots(2, 3, figsize=(14, 8))
+    for ax, (col, stats) in zip(axes.ravel(), p["panels"].items()):
+        _draw_boxes(ax, [stats], vert=False)
+        ax.set(title=f"Outliers in {col}", xlabel=col, yticks=[])
+    for ax in axes.ravel()[len(p["panels"]):]:
+        ax.set_visible(False)
+    return fig
+
+
+def render_bar_counts(plt, p):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.bar(p["labels"], p["counts"])
+    ax.tick_params(axis="x", rotation=90)
+    ax.set(title=p["title"], ylabel="Count")
+    return fig
+
+
+def _category_boxes(ax, p) -> None:
+    _draw_boxes(ax, p["boxes"])
+    ax.set(title=p["title"], xlabel=p["xlabel"], ylabel=p["ylabel"])
+
+
+def render_category_boxes(plt, p):
+    fig, ax = plt.subplots(figsize=p.get("figsize", (12, 6)))
+    _category_boxes(ax, p)
+    ax.tick_params(axis="x", rotation=p.get("rotation", 90))
+    return fig
+
+
+def render_category_box_grid(plt, p):
+    fig, axes = plt.subplots(2, 2, figsize=(18, 10))
+    for ax, panel in zip(axes.ravel(), p["panels"]):
+        _category_boxes(ax, panel)
+        if panel["rotate"]:
+            ax.tick_params(axis="x", rotation=45)
+    fig.suptitle(p["title"], y=1.02, fontsize=16)
+    return fig
+
+
+def render_heatmap(plt, p):
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(p["corr"], annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
+    ax.set_title(p["title"])
+    return fig
+
+
+def render_pairplot(plt, p):
+    sample, columns = p["sample"], list(p["diagonals"])
+    n = len(columns)
+    fig, axes = plt.subplots(n, n, figsize=(2.5 * n, 2.5 * n))
+    for i, row in enumerate(columns):
+        for j, col in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                hist = p["diagonals"][col]
+                ax.plot(hist.get("kde_x", hist["edges"][:-1]), hist.get("kde_y", hist["counts"]))
+                ax.set_yticks([])
+            else:
+                ax.scatter(sample[col], sample[row], s=4, alpha=0.4, linewidths=0)
+            ax.set_xlabel(col if i == n - 1 else "")
+            ax.set_ylabel(row if j == 0 else "")
+    fig.suptitle(p["title"], y=1.02)
+    return fig
+
+
+def render_scatter(plt, p):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(p["x"], p["y"], alpha=0.4, s=12, linewidths=0)
+    ax.set(title=p["title"], xlabel=p["xlabel"], ylabel=p["ylabel"])
+    return fig
+
+
+RENDERERS: Dict[str, Callable] = {
+    "histogram": render_histogram,
+    "histogram_grid": render_histogram_grid,
+    "box_grid": render_box_grid,
+    "bar_counts": render_bar_counts,
+    "category_boxes": render_category_boxes,
+    "category_box_grid": render_category_box_grid,
+    "heatmap": render_heatmap,
+    "pairplot": render_pairplot,
+    "scatter": render_scatter,
+}
+
+
+def render_chart(path: str, renderer: str, payload: Dict[str, Any], dpi: int = DPI) -> str:
+    plt = _pyplot()
+    fig = RENDERERS[renderer](plt, payload)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return path
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def build_report(
+    df: pd.DataFrame,
+    out_dir: os.PathLike = PLOT_DIR,
+    workers: int = 1,
+    force: bool = False,
+    pairplot_rows: int = PAIRPLOT_ROWS,
+    dpi: int = DPI,
+) -> Dict[str, List[str]]:
+    """Render the charts whose aggregates changed; returns the rendered and cached file names."""
+    out_dir = Path(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = out_dir / CACHE_MANIFEST
+    manifest = {} if force else _read_manifest(manifest_path)
+
+    pending, cached = [], []
+    for name, renderer, payload in chart_specs(df, pairplot_rows=pairplot_rows):
+        digest = chart_digest(name, renderer, payload, dpi=dpi)
+        if manifest.get(name) == digest and (out_dir / name).exists():
+            cached.append(name)
+        else:
+            pending.append((name, renderer, payload, digest))
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_chart, str(out_dir / name), renderer, payload, dpi)
+                       for name, renderer, payload, _ in pending]
+            for future in futures:
+                future.result()
+    else:
+        for name, renderer, payload, _ in pending:
+            render_chart(str(out_dir / name), renderer, payload, dpi)
+
+    for name, _, _, digest in pending:
+        manifest[name] = digest
+        logger.info("✓ %s rendered", name)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return {"rendered": [name for name, *_ in pending], "cached": cached}
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render the EDA charts of the cleaned dataset.")
+    parser.add_argument("--data", default=None, help=f"cleaned CSV (default: {CLEANED_PATH}, else ingest carData)")
+    parser.add_argument("--out", default=str(PLOT_DIR))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pairplot-rows", type=int, default=PAIRPLOT_ROWS, help="0 draws every row")
+    parser.add_argument("--dpi", type=int, default=DPI)
+    parser.add_argument("--force", action="store_true", help="ignore the cache and redraw every chart")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    df = load_eda_frame(args.data, workers=args.workers)
+    result = build_report(
+        df, args.out, workers=args.workers, force=args.force, pairplot_rows=args.pairplot_rows, dpi=args.dpi,
+    )
+
+    print(f"✓ {len(df)} listings: {len(result['rendered'])} charts rendered, "
+          f"{len(result['cached'])} unchanged")
+    print(f"  Charts -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Accuracy vs. serving cost of every registered model artifact.
+
+Each artifact (models_storage/<model>.pkl for the models of train.py) is
+loaded in a fresh process and scored on the rows train.py held out for it
+(the test listing_keys saved next to its metadata, looked up in the same
+matrix: the feature store by default, like train.py, or --data; artifacts
+whose metadata records another data_source are flagged), measuring:
+    accuracy     the train.evaluate metrics on the split
+    latency      single-row predict, p50 / p95 over --runs rows
+    throughput   rows per second predicting the whole split at once
+    load         joblib.load time, artifact size, RSS added by the model
+                 and peak RSS of the process
+Artifacts not worse on all of accuracy, p50 latency and RSS than another
+are flagged pareto_optimal. The table is printed, saved as
+metadata/model_comparison.json, and each artifact's metadata JSON gets an
+"evaluation" section.
+
+Usage (from the repository root):
+    python -m prediction_models.evaluate
+    python -m prediction_models.evaluate random_forest_light hist_gradient_boosting --runs 500
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.services.text_features import TEXT_COLUMN
+from prediction_models.config import METADATA_DIR, MODELS_STORAGE_DIR
+from prediction_models.feature_store import META_COLUMNS
+from prediction_models.train import (
+    FEATURE_STORE_SOURCE,
+    MODEL_SPECS,
+    TARGET_COLUMN,
+    evaluate,
+    held_out_frame,
+    load_training_data,
+)
+
+logger = logging.getLogger(__name__)
+
+
+COMPARISON_FILENAME = "model_comparison.json"
+LATENCY_RUNS = 200
+THROUGHPUT_REPEATS = 3
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def held_out_split(
+    data_path: Optional[os.PathLike] = None,
+    with_text: bool = False,
+    workers: int = 1,
+    metadata_path: Optional[os.PathLike] = None,
+):
+    """
+    (X_test, y_test_log) the artifact of metadata_path was not trained on.
+
+    The matrix is loaded like train.py does (feature store unless data_path),
+    so categories are spelled as the encoders saw them in training; the rows
+    are picked by train.held_out_frame.
+    """
+    df, _ = load_training_data(data_path, workers=workers, with_text=with_text)
+    return _xy(held_out_frame(df, metadata_path))
+
+
+def _xy(df: pd.DataFrame):
+    meta = [c for c in META_COLUMNS if c in df.columns]
+    X = df.drop(columns=[TARGET_COLUMN] + meta)
+    return X, df[TARGET_COLUMN].to_numpy(dtype="float64")
+
+
+def data_source_mismatches(artifacts: Dict[str, Path], metadata_dir: os.PathLike, data_source: str) -> List[str]:
+    """Artifacts whose metadata says they were trained on another matrix."""
+    mismatched = []
+    for artifact in artifacts:
+        metadata_path = Path(metadata_dir) / f"{artifact}_metadata.json"
+        if not metadata_path.exists():
+            continue
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            trained_on = json.load(f).get("training_info", {}).get("data_source", FEATURE_STORE_SOURCE)
+        if trained_on != data_source:
+            mismatched.append(f"{artifact} (trained on {trained_on})")
+    return mismatched
+
+
+def find_artifacts(models_dir: os.PathLike, names: Optional[List[str]] = None) -> Dict[str, Path]:
+    """artifact name -> pickle, for the registered models (and their _text variants)."""
+    artifacts = {}
+    for name in names or list(MODEL_SPECS):
+        for artifact in (name, f"{name}_text"):
+            path = Path(models_dir) / f"{artifact}.pkl"
+            if path.exists():
+                artifacts[artifact] = path
+    return artifacts
+
+
+# ============================================================
+# MEASUREMENT (one fresh process per artifact)
+# ============================================================
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc), falling back to the peak."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_artifact(path: str, X_test: pd.DataFrame, y_test_log: np.ndarray, runs: int = LATENCY_RUNS) -> Dict[str, Any]:
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = joblib.load(path)
+    load_seconds = time.perf_counter() - start
+    rss_model = _rss_mb() - rss_before
+
+    y_pred_log = np.asarray(model.predict(X_test), dtype=np.float64)
+    metrics = evaluate(y_test_log, y_pred_log)
+
+    rows = [X_test.iloc[[i % len(X_test)]] for i in range(runs)]
+    model.predict(rows[0])  # warm-up
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    timings_ms = np.asarray(timings) * 1000
+
+    best = float("inf")
+    for _ in range(THROUGHPUT_REPEATS):
+        start = time.perf_counter()
+        model.predict(X_test)
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "performance_metrics": metrics,
+        "single_row_ms": {
+            "p50": float(np.percentile(timings_ms, 50)),
+            "p95": float(np.percentile(timings_ms, 95)),
+            "mean": float(timings_ms.mean()),
+        },
+        "batch_rows": int(len(X_test)),
+        "throughput_rows_per_s": float(len(X_test) / best),
+        "load_seconds": load_seconds,
+        "artifact_mb": os.path.getsize(path) / (1024 * 1024),
+        "model_rss_mb": rss_model,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def pareto_optimal(results: List[Dict[str, Any]]) -> None:
+    """Flag results no other result beats on accuracy, p50 latency and RSS at once."""
+    def key(r):
+        return (-r["performance_metrics"]["accuracy_percent"], r["single_row_ms"]["p50"], r["model_rss_mb"])
+
+    for r in results:
+        k = key(r)
+        r["pareto_optimal"] = not any(
+            all(a <= b for a, b in zip(key(o), k)) and key(o) != k for o in results if o is not r
+        )
+
+
+def compare(
+    artifacts: Dict[str, Path],
+    df: pd.DataFrame,
+    metadata_dir: os.PathLike = METADATA_DIR,
+    runs: int = LATENCY_RUNS,
+) -> List[Dict[str, Any]]:
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for artifact, path in artifacts.items():
+        X_test, y_test_log = _xy(held_out_frame(df, Path(metadata_dir) / f"{artifact}_metadata.json"))
+        if artifact.endswith("_text"):
+            if TEXT_COLUMN not in X_test.columns:
+                logger.warning("Skipping %s: the data has no %s column", artifact, TEXT_COLUMN)
+                continue
+        else:
+            X_test = X_test.drop(columns=[TEXT_COLUMN], errors="ignore")
+        # A fresh interpreter per artifact, so load time and RSS are not polluted
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            result = pool.submit(measure_artifact, str(path), X_test, y_test_log, runs).result()
+        results.append({"artifact": artifact, "path": str(path), **result})
+        logger.info("✓ %s measured", artifact)
+
+    pareto_optimal(results)
+    return results
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'artifact':<28}{'acc %':>7}{'RMSE €':>8}{'p50 ms':>8}{'p95 ms':>8}{'rows/s':>9}"
+        f"{'load s':>8}{'size MB':>9}{'RSS MB':>8}{'pareto':>8}"
+    )
+    for r in results:
+        perf, lat = r["performance_metrics"], r["single_row_ms"]
+        print(
+            f"{r['artifact']:<28}{perf['accuracy_percent']:>7.2f}{perf['rmse_price_eur']:>8.0f}"
+            f"{lat['p50']:>8.2f}{lat['p95']:>8.2f}{r['throughput_rows_per_s']:>9.0f}"
+            f"{r['load_seconds']:>8.2f}{r['artifact_mb']:>9.1f}{r['model_rss_mb']:>8.1f}"
+            f"{'✓' if r['pareto_optimal'] else '':>8}"
+        )
+
+
+def write_reports(results: List[Dict[str, Any]], metadata_dir: os.PathLike, data_path: str) -> Path:
+    evaluated_at = datetime.now().isoformat()
+    split = {"data": str(data_path), "rows": "test listing_keys saved at training (train.held_out_frame)"}
+
+    os.makedirs(metadata_dir, exist_ok=True)
+    for r in results:
+        metadata_path = Path(metadata_dir) / f"{r['artifact']}_metadata.json"
+        if not metadata_path.exists():
+            continue
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        metadata["evaluation"] = {
+            "evaluated_at": evaluated_at,
+            "split": split,
+            **{k: v for k, v in r.items() if k not in ("artifact", "path")},
+        }
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+
+    comparison_path = Path(metadata_dir) / COMPARISON_FILENAME
+    with open(comparison_path, "w", encoding="utf-8") as f:
+        json.dump({"evaluated_at": evaluated_at, "split": split, "results": results}, f, indent=2)
+    return comparison_path
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare accuracy, latency and memory of the model artifacts.")
+    parser.add_argument("models", nargs="*", default=None,
+                        help=f"registered models to evaluate (default: every artifact of {', '.join(MODEL_SPECS)})")
+    parser.add_argument("--models-dir", default=str(MODELS_STORAGE_DIR))
+    parser.add_argument("--metadata-dir", default=str(METADATA_DIR))
+    parser.add_argument("--data", default=None,
+                        help="training matrix (CSV/Parquet) the models were trained on; default: the feature store")
+    parser.add_argument("--runs", type=int, default=LATENCY_RUNS, help="single-row predictions timed")
+    parser.add_argument("--n-jobs", type=int, default=1, help="workers for refreshing the feature store")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    unknown = [n for n in args.models or [] if n not in MODEL_SPECS]
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+
+    artifacts = find_artifacts(args.models_dir, args.models or None)
+    if not artifacts:
+        parser.error(f"no model artifacts in {args.models_dir}")
+
+    data_source = args.data or FEATURE_STORE_SOURCE
+    mismatched = data_source_mismatches(artifacts, args.metadata_dir, data_source)
+    if mismatched:
+        logger.warning("Evaluating on %s, not the training matrix of: %s", data_source, ", ".join(mismatched))
+
+    with_text = any(artifact.endswith("_text") for artifact in artifacts)
+    df, _ = load_training_data(args.data, workers=args.n_jobs, with_text=with_text)
+    results = compare(artifacts, df, args.metadata_dir, runs=args.runs)
+
+    print_table(results)
+    comparison_path = write_reports(results, args.metadata_dir, data_source)
+    print(f"✓ Comparison -> {comparison_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Export a trained Pipeline (ColumnTransformer included) to ONNX and compare
+the inference backends of backend/services/predictor.py.
+
+The export is checked for parity against the sklearn Pipeline on the rows
+train.py held out for the model (train.held_out_frame) and only written when every prediction
+agrees within the tolerance. The report gives single-row latency and batch
+throughput for sklearn and for onnxruntime at each intra-op thread count.
+
+Serve it with INFERENCE_BACKEND=onnx (ONNX_MODEL_PATH defaults to the
+model path with an .onnx extension).
+
+Usage (from the repository root):
+    python -m prediction_models.export_onnx random_forest_light --threads 1 2 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.services.predictor import InferenceBackend, OnnxBackend, SklearnBackend
+from prediction_models.config import MODELS_STORAGE_DIR, PROCESSED_DIR, REPO_ROOT
+from backend.services.text_features import TEXT_COLUMN
+from prediction_models.feature_store import META_COLUMNS
+from prediction_models.train import FEATURE_STORE_SOURCE, TARGET_COLUMN, held_out_frame, load_training_data
+
+logger = logging.getLogger(__name__)
+
+
+ONNX_REPORT_PATH = PROCESSED_DIR / "onnx_report.json"
+
+# Max |log(price + 1)| difference; onnxruntime trees run in float32
+PARITY_TOLERANCE = 1e-4
+TARGET_OPSET = {"": 17, "ai.onnx.ml": 3}
+LATENCY_RUNS = 50
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def initial_types(X: pd.DataFrame) -> List[tuple]:
+    """One [None, 1] graph input per column: strings for categoricals, float otherwise."""
+    from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+
+    types = []
+    for column in X.columns:
+        dtype = X[column].dtype
+        is_string = dtype == object or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype))
+        types.append((column, StringTensorType([None, 1]) if is_string else FloatTensorType([None, 1])))
+    return types
+
+
+def convert(pipeline, X: pd.DataFrame, source: str):
+    """ONNX model of the Pipeline, with the input column names in its metadata."""
+    try:
+        from skl2onnx import to_onnx
+    except ImportError as e:
+        raise ImportError("Exporting to ONNX needs skl2onnx: pip install -r prediction_models/requirements.txt") from e
+
+    # Only the columns the ColumnTransformer reads become graph inputs
+    used = list(pipeline.named_steps["preprocessor"].feature_names_in_)
+    onx = to_onnx(pipeline, initial_types=initial_types(X[used]), target_opset=TARGET_OPSET)
+
+    for key, value in {"columns": json.dumps(used), "source_model": source}.items():
+        prop = onx.metadata_props.add()
+        prop.key, prop.value = key, value
+    return onx
+
+
+# ============================================================
+# COMPARISON
+# ============================================================
+
+def held_out_features(pipeline, metadata_path: Optional[os.PathLike] = None) -> pd.DataFrame:
+    """
+    Feature columns of the rows the model was not trained on (with
+    descriptions if the pipeline uses them), from the matrix its metadata
+    names as data_source.
+    """
+    data_source = FEATURE_STORE_SOURCE
+    if metadata_path is not None and Path(metadata_path).exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            data_source = json.load(f).get("training_info", {}).get("data_source", FEATURE_STORE_SOURCE)
+    with_text = TEXT_COLUMN in pipeline.named_steps["preprocessor"].feature_names_in_
+    df, _ = load_training_data(data_source, with_text=with_text)
+
+    test = held_out_frame(df, metadata_path)
+    return test.drop(columns=[TARGET_COLUMN] + [c for c in META_COLUMNS if c in test.columns])
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    ref_price, cand_price = np.expm1(reference), np.expm1(candidate)
+    return {
+        "max_abs_log_diff": float(np.max(np.abs(reference - candidate))),
+        "max_abs_price_diff_eur": float(np.max(np.abs(ref_price - cand_price))),
+        "max_rel_price_diff": float(np.max(np.abs(ref_price - cand_price) / np.abs(ref_price))),
+    }
+
+
+def check_parity(pipeline, onnx_path: os.PathLike, X: pd.DataFrame) -> Dict[str, float]:
+    """parity() of the sklearn Pipeline and the serialized ONNX model served by OnnxBackend."""
+    reference = SklearnBackend(pipeline).predict_log(X)
+    return parity(reference, OnnxBackend(str(onnx_path)).predict_log(X))
+
+
+def benchmark(backend: InferenceBackend, X: pd.DataFrame, runs: int = LATENCY_RUNS) -> Dict[str, float]:
+    """Median single-row latency (ms) and batch throughput (rows/s)."""
+    row = X.iloc[:1]
+    backend.predict_log(row)  # warm-up
+
+    single = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict_log(row)
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    backend.predict_log(X)
+    batch = time.perf_counter() - start
+
+    return {
+        "latency_single_ms": float(np.median(single) * 1000),
+        "throughput_rows_per_s": float(len(X) / batch),
+    }
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'backend':<22}{'1 row ms':>10}{'rows/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['backend']:<22}{r['latency_single_ms']:>10.3f}{r['throughput_rows_per_s']:>12.0f}")
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export a model Pipeline to ONNX and compare inference backends.")
+    parser.add_argument("model", nargs="?", default="random_forest_light")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--metadata-path", default=None,
+                        help="default: metadata/<model>_metadata.json next to the model")
+    parser.add_argument("--output", default=None, help="default: <model path>.onnx")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4],
+                        help="onnxruntime intra-op thread counts to benchmark")
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE,
+                        help="max |log(price + 1)| difference vs. sklearn")
+    parser.add_argument("--report", default=str(ONNX_REPORT_PATH))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    model_path = Path(args.model_path or MODELS_STORAGE_DIR / f"{args.model}.pkl")
+    output = Path(args.output or model_path.with_suffix(".onnx"))
+    metadata_path = Path(args.metadata_path or model_path.parent / "metadata" / f"{model_path.stem}_metadata.json")
+    pipeline = joblib.load(model_path)
+
+    X_test = held_out_features(pipeline, metadata_path)
+
+    try:
+        onx = convert(pipeline, X_test, os.path.relpath(model_path, REPO_ROOT))
+    except Exception as e:
+        # Converter errors embed whole attribute arrays; the first line is enough
+        print(f"✗ {args.model} cannot be exported to ONNX: {str(e).splitlines()[0][:300]}")
+        print("  Keep INFERENCE_BACKEND=sklearn for this model")
+        sys.exit(1)
+
+    # Parity and benchmarks run on the serialized file, exactly as served
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = os.path.join(tmp, "model.onnx")
+        with open(tmp_path, "wb") as f:
+            f.write(onx.SerializeToString())
+
+        checks = check_parity(pipeline, tmp_path, X_test)
+
+        sklearn_backend = SklearnBackend(pipeline)
+        rows = [{"backend": "sklearn", **benchmark(sklearn_backend, X_test)}]
+        for threads in args.threads:
+            backend = OnnxBackend(tmp_path, intra_op_threads=threads)
+            rows.append({"backend": f"onnx ({threads} thread{'s' if threads > 1 else ''})",
+                         "intra_op_threads": threads, **benchmark(backend, X_test)})
+
+        print_report(rows)
+        print(f"Parity on {len(X_test)} test rows: max |Δlog| {checks['max_abs_log_diff']:.2e}, "
+              f"max |Δprice| {checks['max_abs_price_diff_eur']:.2f} EUR")
+
+        passed = checks["max_abs_log_diff"] <= args.tolerance
+        if passed:
+            os.makedirs(output.parent, exist_ok=True)
+            with open(output, "wb") as f:
+                f.write(onx.SerializeToString())
+
+    report = {
+        "model": args.model,
+        "created_at": datetime.now().isoformat(),
+        "onnx_path": os.path.relpath(output, REPO_ROOT) if passed else None,
+        "test_rows": int(len(X_test)),
+        "tolerance": args.tolerance,
+        "parity": checks,
+        "passed": passed,
+        "backends": rows,
+    }
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if not passed:
+        print(f"✗ Parity above tolerance {args.tolerance:g}; nothing written")
+        sys.exit(1)
+
+    print(f"✓ ONNX model -> {output} ({os.path.getsize(output) / (1024 * 1024):.2f} MB)")
+    print(f"  Report -> {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Incremental feature store built from the per-brand carData CSVs.
+
+Each cars_<brand>.csv is fingerprinted by content hash. Only brands whose file
+(or the serving feature code) changed since the last build are re-ingested and
+re-engineered; every partition is cached on disk and the training matrix is
+assembled from the cached partitions.
+
+Features come from backend.services.feature_engineer, the same code the API
+runs per request, so training and serving cannot drift. The raw descriere is
+kept in the partitions for the optional hashed text features. The only cross-brand
+features (model_simplified / model_frequency) are resolved at assembly time
+from the model counts of all partitions.
+
+Usage (from the repository root):
+    python -m prediction_models.feature_store --workers 4 [--force] [--csv]
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services import feature_engineer, lookup_tables, text_features
+from backend.services.feature_engineer import (
+    builtin_lookup_tables,
+    engineer_features_frame,
+    normalize_model,
+)
+from prediction_models.config import (
+    CAR_DATA_DIR,
+    FEATURE_STORE_DIR,
+    TRAIN_READY_PARQUET_PATH,
+    TRAIN_READY_PATH,
+)
+from prediction_models.dataset_store import read_train_ready, train_ready_columns, write_train_ready
+from prediction_models.ingest import brand_files, clean_brand_file
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "manifest.json"
+MODEL_COUNTS_NAME = "model_counts.json"
+PARTITIONS_DIR = "partitions"
+
+TARGET_COLUMN = "pret_log"
+MODEL_KEY = "model_key"
+
+# Per-row bookkeeping (not features): a content hash of the listing and the
+# unix time its partition first contained it. The scraper rewrites the brand
+# files on every run, so first_seen is carried over from the previous partition.
+LISTING_KEY = "listing_key"
+FIRST_SEEN = "first_seen"
+META_COLUMNS = [LISTING_KEY, FIRST_SEEN, MODEL_KEY]
+
+# Bumped when the partition layout changes; older partitions are rebuilt
+PARTITION_FORMAT = 4
+
+TEXT_COLUMN = text_features.TEXT_COLUMN
+
+
+# ============================================================
+# FINGERPRINTS & MANIFEST
+# ============================================================
+
+def file_sha256(path: os.PathLike, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def feature_code_hash() -> str:
+    """Hash of the serving feature code; a change invalidates every partition."""
+    digest = hashlib.sha256()
+    for module in (feature_engineer, lookup_tables, text_features):
+        digest.update(inspect.getsource(module).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_manifest(store_dir: os.PathLike = FEATURE_STORE_DIR) -> Dict[str, Any]:
+    path = Path(store_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {"partitions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Any], store_dir: os.PathLike = FEATURE_STORE_DIR) -> None:
+    path = Path(store_dir) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def partition_path(brand: str, store_dir: os.PathLike = FEATURE_STORE_DIR) -> Path:
+    return Path(store_dir) / PARTITIONS_DIR / f"{brand}.parquet"
+
+
+# ============================================================
+# PARTITIONS
+# ============================================================
+
+def listing_keys(listings: pd.DataFrame) -> np.ndarray:
+    """Content hash of each cleaned listing (stable across scrapes)."""
+    columns = sorted(c for c in listings.columns if c != "descriere")
+    hashed = pd.util.hash_pandas_object(listings[columns].astype(str), index=False)
+    # int64 so the Parquet round trip keeps the exact value
+    return hashed.to_numpy().view("int64")
+
+
+def _previous_first_seen(path: Path, fallback: int) -> Dict[int, int]:
+    """listing_key -> first_seen from an existing partition."""
+    if not path.exists():
+        return {}
+    previous = read_train_ready(path=path)
+    if LISTING_KEY not in previous.columns:
+        return {}
+    first_seen = (
+        previous[FIRST_SEEN].to_numpy(dtype="int64")
+        if FIRST_SEEN in previous.columns
+        else np.full(len(previous), fallback, dtype="int64")
+    )
+    return dict(zip(previous[LISTING_KEY].to_numpy(dtype="int64").tolist(), first_seen.tolist()))
+
+
+def build_partition(
+    brand: str,
+    csv_path: os.PathLike,
+    store_dir: os.PathLike = FEATURE_STORE_DIR,
+    now: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Ingest one brand file, engineer its features and cache the partition.
+
+    Listings not in the previous partition get first_seen = now, the ingest
+    time of the refresh (shared by every brand it rebuilds, so first_seen
+    does not follow the order the brands were built in).
+    """
+    listings, stats = clean_brand_file(csv_path, include_description=True)
+    path = partition_path(brand, store_dir)
+
+    now = int(datetime.now().timestamp()) if now is None else int(now)
+    keys = listing_keys(listings)
+    seen = _previous_first_seen(path, fallback=now)
+
+    # Model features need counts over all brands; they are resolved in assemble()
+    features = engineer_features_frame(listings, tables=builtin_lookup_tables(model_counts={}))
+    features[MODEL_KEY] = [normalize_model(m) for m in listings["model"].tolist()]
+    features[TARGET_COLUMN] = np.log1p(listings["pret"].to_numpy(dtype="float64"))
+    features[LISTING_KEY] = keys
+    features[FIRST_SEEN] = np.array([seen.get(k, now) for k in keys.tolist()], dtype="int64")
+    features[TEXT_COLUMN] = listings[TEXT_COLUMN].fillna("").astype(str).to_numpy()
+
+    os.makedirs(path.parent, exist_ok=True)
+    write_train_ready(features.reset_index(drop=True), path)
+
+    return {
+        "rows": int(len(features)),
+        "new_rows": int(sum(k not in seen for k in keys.tolist())),
+        "format": PARTITION_FORMAT,
+        "built_at": datetime.now().isoformat(),
+        "parse_failures": stats.get("parse_failures", {}),
+    }
+
+
+def refresh(
+    data_dir: os.PathLike = CAR_DATA_DIR,
+    store_dir: os.PathLike = FEATURE_STORE_DIR,
+    workers: int = 1,
+    force: bool = False,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Rebuild the partitions whose source file or feature code changed.
+
+    Returns the updated manifest and the list of rebuilt brands.
+    """
+    manifest = load_manifest(store_dir)
+    partitions = manifest.setdefault("partitions", {})
+    code_hash = feature_code_hash()
+
+    files = brand_files(data_dir)
+    hashes = {brand: file_sha256(path) for brand, path in files.items()}
+
+    changed = [
+        brand for brand in files
+        if force
+        or brand not in partitions
+        or partitions[brand].get("sha256") != hashes[brand]
+        or partitions[brand].get("feature_hash") != code_hash
+        or partitions[brand].get("format") != PARTITION_FORMAT
+        or not partition_path(brand, store_dir).exists()
+    ]
+
+    if changed:
+        logger.info("Rebuilding %d partition(s): %s", len(changed), ", ".join(changed))
+        now = int(datetime.now().timestamp())
+        args = [(brand, files[brand], store_dir, now) for brand in changed]
+        if workers > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(build_partition, *zip(*args)))
+        else:
+            results = [build_partition(*a) for a in args]
+
+        for brand, entry in zip(changed, results):
+            entry.update({"sha256": hashes[brand], "feature_hash": code_hash})
+            partitions[brand] = entry
+    else:
+        logger.info("Feature store is up to date")
+
+    # Brand files that disappeared
+    for brand in [b for b in partitions if b not in files]:
+        partition_path(brand, store_dir).unlink(missing_ok=True)
+        del partitions[brand]
+        logger.info("Dropped partition for removed brand %s", brand)
+
+    manifest["updated_at"] = datetime.now().isoformat()
+    os.makedirs(store_dir, exist_ok=True)
+    save_manifest(manifest, store_dir)
+    return manifest, changed
+
+
+# ============================================================
+# ASSEMBLY
+# ============================================================
+
+def assemble(
+    store_dir: os.PathLike = FEATURE_STORE_DIR,
+    with_meta: bool = False,
+    with_text: bool = False,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Concatenate the cached partitions into the training matrix.
+
+    Returns the matrix (features + pret_log, plus listing_key / first_seen /
+    model_key when with_meta is set and descriere when with_text is set) and the model
+    counts used to resolve model_simplified / model_frequency.
+    """
+    manifest = load_manifest(store_dir)
+    brands = sorted(manifest.get("partitions", {}))
+    if not brands:
+        raise RuntimeError(f"Feature store at {store_dir} is empty; run refresh() first")
+
+    frames = []
+    for brand in brands:
+        path = partition_path(brand, store_dir)
+        columns = None if with_text else [c for c in train_ready_columns(path) if c != TEXT_COLUMN]
+        frames.append(read_train_ready(columns=columns, path=path))
+    df = pd.concat(frames, ignore_index=True)
+
+    model_keys = df.pop(MODEL_KEY).astype(str)
+    model_counts = {k: int(v) for k, v in model_keys.value_counts().items()}
+
+    tables = builtin_lookup_tables(model_counts)
+    resolved = {key: tables.resolve_model(key) for key in model_counts}
+    df["model_simplified"] = model_keys.map(lambda k: resolved[k][0]).astype("string")
+    df["model_frequency"] = model_keys.map(lambda k: resolved[k][1]).astype("float64")
+
+    for col in feature_engineer.CATEGORICAL_FEATURES:
+        df[col] = df[col].astype("string")
+
+    if with_text:
+        df[TEXT_COLUMN] = df[TEXT_COLUMN].astype(object)
+
+    if with_meta:
+        df[FIRST_SEEN] = df[FIRST_SEEN].astype("int64")
+        df[MODEL_KEY] = model_keys
+    else:
+        df = df.drop(columns=[LISTING_KEY, FIRST_SEEN])
+
+    return df, model_counts
+
+
+def build(
+    data_dir: os.PathLike = CAR_DATA_DIR,
+    store_dir: os.PathLike = FEATURE_STORE_DIR,
+    workers: int = 1,
+    force: bool = False,
+    with_meta: bool = False,
+    with_text: bool = False,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """refresh() + assemble(); also caches the model counts next to the manifest."""
+    refresh(data_dir, store_dir, workers=workers, force=force)
+    df, model_counts = assemble(store_dir, with_meta=with_meta, with_text=with_text)
+
+    with open(Path(store_dir) / MODEL_COUNTS_NAME, "w", encoding="utf-8") as f:
+        json.dump(model_counts, f, indent=2, ensure_ascii=False)
+
+    return df, model_counts
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Refresh the feature store and training matrix.")
+    parser.add_argument("--data-dir", default=str(CAR_DATA_DIR))
+    parser.add_argument("--store-dir", default=str(FEATURE_STORE_DIR))
+    parser.add_argument("--out", default=str(TRAIN_READY_PARQUET_PATH))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="rebuild every partition")
+    parser.add_argument("--csv", action="store_true",
+                        help=f"also write {TRAIN_READY_PATH.name} for the notebooks")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    df, model_counts = build(args.data_dir, args.store_dir, workers=args.workers, force=args.force)
+    write_train_ready(df, args.out)
+    print(f"✓ Training matrix: {df.shape[0]} rows × {df.shape[1]} columns -> {args.out}")
+    print(f"  Distinct models: {len(model_counts)}")
+
+    if args.csv:
+        df.to_csv(TRAIN_READY_PATH, index=False)
+        print(f"✓ Also saved {TRAIN_READY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
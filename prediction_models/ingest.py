@@ -0,0 +1,307 @@
+"""
+Vectorized ingestion of the raw carData/cars_<brand>.csv files.
+
+Reproduces the cleaning cells of data_cleaning.ipynb as an importable module:
+raw strings such as "5 500 €", "2 000 cm³", "177 CP" or "230 000 km" are
+parsed with pandas str/regex operations chunk by chunk, and every value that
+was present but could not be parsed is counted in the ingest report.
+
+Usage (from the repository root):
+    python -m prediction_models.ingest --workers 4
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from prediction_models.config import CAR_DATA_DIR, CLEANED_PATH, INGEST_REPORT_PATH
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# SCHEMA
+# ============================================================
+
+RAW_COLUMNS = [
+    "marca", "model", "pret", "capacitate motor", "putere",
+    "combustibil", "caroserie", "rulaj", "culoare",
+    "an fabricatie", "cutie viteza", "descriere",
+]
+
+# Everything is read as text; numeric parsing happens in parse_numeric_fields()
+RAW_DTYPES = {col: "string" for col in RAW_COLUMNS}
+
+CATEGORICAL_COLUMNS = [
+    "marca", "model", "combustibil", "caroserie", "culoare", "cutie viteza",
+]
+
+NUMERIC_COLUMNS = ["pret", "capacitate motor", "putere", "rulaj", "an fabricatie"]
+
+CLEAN_DTYPES = {
+    "pret": "float64",
+    "capacitate motor": "int32",
+    "putere": "int32",
+    "rulaj": "int32",
+    "an fabricatie": "int16",
+}
+
+# Open intervals (low, high) from the notebook's outlier filters
+VALID_RANGES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "pret": (1000, 80000),
+    "rulaj": (1000, 600000),
+    "capacitate motor": (500, 6000),
+    "putere": (20, 600),
+    "an fabricatie": (1950, None),
+}
+
+# Placeholder written by the scraper when a field is absent on the listing page
+MISSING_MARKER = "N/A"
+
+DEFAULT_CHUNKSIZE = 5000
+
+
+# ============================================================
+# PARSING
+# ============================================================
+
+def _first_number(values: pd.Series, strip_spaces: bool = True) -> pd.Series:
+    """'2 000 cm³' -> 2000 (first digit run, thousands separators removed)."""
+    if strip_spaces:
+        values = values.str.replace(r"\s", "", regex=True)
+    return pd.to_numeric(values.str.extract(r"(\d+)", expand=False), errors="coerce")
+
+
+def _parse_price(values: pd.Series) -> pd.Series:
+    """'5 500 €' -> 5500.0 (keep digits only, like the notebook)."""
+    digits = values.str.replace(r"[^\d]", "", regex=True).replace("", pd.NA)
+    return pd.to_numeric(digits, errors="coerce").astype("float64")
+
+
+def _parse_year(values: pd.Series) -> pd.Series:
+    """'2007' / '2007.0' -> 2007."""
+    return pd.to_numeric(values.str.extract(r"(\d{4})", expand=False), errors="coerce")
+
+
+PARSERS = {
+    "pret": _parse_price,
+    "capacitate motor": _first_number,
+    "putere": lambda s: _first_number(s, strip_spaces=False),
+    "rulaj": _first_number,
+    "an fabricatie": _parse_year,
+}
+
+
+def _present(values: pd.Series) -> pd.Series:
+    """Mask of raw values that carry data (not empty, not the scraper's N/A)."""
+    stripped = values.str.strip()
+    return (stripped.notna() & (stripped != "") & (stripped != MISSING_MARKER)).fillna(False)
+
+
+def parse_numeric_fields(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Dict[str, int]]]:
+    """
+    Parse the numeric text columns of a raw chunk.
+
+    Returns the parsed frame (numeric columns as float, NaN when missing) and
+    per-column counts of missing values and parse failures.
+    """
+    out = chunk.copy()
+    missing: Dict[str, int] = {}
+    failures: Dict[str, int] = {}
+
+    for col, parser in PARSERS.items():
+        raw = chunk[col].astype("string")
+        present = _present(raw)
+        parsed = parser(raw.where(present))
+
+        missing[col] = int((~present).sum())
+        failures[col] = int((present & parsed.isna()).sum())
+        out[col] = parsed.astype("float64")
+
+    return out, {"missing": missing, "parse_failures": failures}
+
+
+def _in_range(df: pd.DataFrame) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    for col, (low, high) in VALID_RANGES.items():
+        if low is not None:
+            mask &= df[col] > low
+        if high is not None:
+            mask &= df[col] < high
+    return mask
+
+
+def clean_chunk(
+    chunk: pd.DataFrame,
+    apply_filters: bool = True,
+    include_description: bool = True,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse, drop incomplete rows, apply the outlier ranges and cast to the clean dtypes."""
+    df, stats = parse_numeric_fields(chunk)
+
+    for col in CATEGORICAL_COLUMNS:
+        values = df[col].astype("string").str.strip()
+        values = values.where(_present(values))
+        df[col] = values.astype(object).where(values.notna(), None)
+
+    complete = df[NUMERIC_COLUMNS].notna().all(axis=1)
+    stats["incomplete_rows"] = int((~complete).sum())
+    df = df[complete]
+
+    if apply_filters:
+        in_range = _in_range(df)
+        stats["out_of_range_rows"] = int((~in_range).sum())
+        df = df[in_range]
+    else:
+        stats["out_of_range_rows"] = 0
+
+    df = df.astype(CLEAN_DTYPES)
+
+    if include_description:
+        df["descriere"] = df["descriere"].astype(object).where(df["descriere"].notna(), None)
+    else:
+        df = df.drop(columns=["descriere"])
+
+    stats["rows_read"] = int(len(chunk))
+    stats["rows_kept"] = int(len(df))
+    return df, stats
+
+
+# ============================================================
+# FILES
+# ============================================================
+
+def brand_files(data_dir: os.PathLike = CAR_DATA_DIR) -> Dict[str, Path]:
+    """Map brand -> path for every cars_<brand>.csv in data_dir."""
+    files = {}
+    for path in sorted(Path(data_dir).glob("cars_*.csv")):
+        files[path.stem[len("cars_"):]] = path
+    return files
+
+
+def _merge_stats(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in part.items():
+        if isinstance(value, dict):
+            bucket = total.setdefault(key, {})
+            for col, n in value.items():
+                bucket[col] = bucket.get(col, 0) + n
+        elif isinstance(value, int):
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def clean_brand_file(
+    path: os.PathLike,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    apply_filters: bool = True,
+    include_description: bool = True,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Clean one brand CSV, reading it in chunks."""
+    parts: List[pd.DataFrame] = []
+    stats: Dict[str, Any] = {}
+
+    reader = pd.read_csv(
+        path,
+        dtype=RAW_DTYPES,
+        usecols=RAW_COLUMNS,
+        chunksize=chunksize,
+        keep_default_na=False,
+        na_values=[""],
+    )
+    for chunk in reader:
+        cleaned, chunk_stats = clean_chunk(chunk, apply_filters, include_description)
+        parts.append(cleaned)
+        _merge_stats(stats, chunk_stats)
+
+    if parts:
+        df = pd.concat(parts, ignore_index=True)
+    else:
+        df = pd.DataFrame({col: pd.Series(dtype=CLEAN_DTYPES.get(col, object)) for col in RAW_COLUMNS})
+
+    stats["file"] = str(path)
+    logger.info(
+        "Ingested %s: %d/%d rows kept, parse failures=%s",
+        Path(path).name, stats.get("rows_kept", 0), stats.get("rows_read", 0),
+        stats.get("parse_failures", {}),
+    )
+    return df, stats
+
+
+def load_clean_dataset(
+    data_dir: os.PathLike = CAR_DATA_DIR,
+    workers: int = 1,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    apply_filters: bool = True,
+    include_description: bool = True,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Clean every brand file and return the combined table plus an ingest report.
+
+    With workers > 1 brand files are cleaned in separate processes.
+    """
+    files = brand_files(data_dir)
+    if not files:
+        raise FileNotFoundError(f"No cars_*.csv files found in {data_dir}")
+
+    args = [(path, chunksize, apply_filters, include_description) for path in files.values()]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(clean_brand_file, *zip(*args)))
+    else:
+        results = [clean_brand_file(*a) for a in args]
+
+    frames = [df for df, _ in results]
+    report: Dict[str, Any] = {"files": {}, "totals": {}}
+    for brand, (_, stats) in zip(files, results):
+        report["files"][brand] = stats
+        _merge_stats(report["totals"], {k: v for k, v in stats.items() if k != "file"})
+
+    df = pd.concat(frames, ignore_index=True)
+    return df, report
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Clean the raw carData CSVs.")
+    parser.add_argument("--data-dir", default=str(CAR_DATA_DIR))
+    parser.add_argument("--out", default=str(CLEANED_PATH))
+    parser.add_argument("--report", default=str(INGEST_REPORT_PATH))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--no-filters", action="store_true", help="keep out-of-range rows")
+    parser.add_argument("--drop-description", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    df, report = load_clean_dataset(
+        args.data_dir,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        apply_filters=not args.no_filters,
+        include_description=not args.drop_description,
+    )
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    df.to_csv(args.out, index=False)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    totals = report["totals"]
+    print(f"✓ Saved {len(df)} rows × {df.shape[1]} columns to {args.out}")
+    print(f"  Rows read: {totals.get('rows_read', 0)}")
+    print(f"  Parse failures: {totals.get('parse_failures', {})}")
+    print(f"  Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Build the lookup-table artifact shipped with the model.
+
+The artifact holds the model frequencies, brand categories and categorical
+vocabularies of the training matrix; the API loads it once at startup
+(backend/services/lookup_tables.py) instead of relying on empty constants.
+
+Usage (from the repository root):
+    python -m prediction_models.lookup_tables
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from backend.services.feature_engineer import (
+    BRAND_CATEGORIES,
+    CATEGORICAL_FEATURES,
+    RARE_MODEL_MEAN_FREQ,
+    RARE_MODEL_THRESHOLD,
+)
+from prediction_models.config import LOOKUP_TABLES_PATH
+
+logger = logging.getLogger(__name__)
+
+
+ARTIFACT_FORMAT = 1
+
+
+def build_lookup_tables(train_df: pd.DataFrame, model_counts: Dict[str, int]) -> Dict[str, Any]:
+    """Lookup tables for a training matrix and the model counts it was built with."""
+    vocabularies = {
+        col: sorted(train_df[col].dropna().astype(str).unique().tolist())
+        for col in CATEGORICAL_FEATURES
+        if col in train_df.columns
+    }
+
+    rare_counts = [n for n in model_counts.values() if n < RARE_MODEL_THRESHOLD]
+    unknown_model_frequency = (
+        float(sum(rare_counts) / len(rare_counts)) if rare_counts else RARE_MODEL_MEAN_FREQ
+    )
+
+    brands = set(BRAND_CATEGORIES) | {b.lower() for b in vocabularies.get("marca", [])}
+    brand_categories = {b: BRAND_CATEGORIES.get(b, "standard") for b in sorted(brands)}
+
+    tables = {
+        "format": ARTIFACT_FORMAT,
+        "rare_model_threshold": RARE_MODEL_THRESHOLD,
+        "unknown_model_frequency": unknown_model_frequency,
+        "model_counts": dict(sorted(model_counts.items())),
+        "brand_categories": brand_categories,
+        "vocabularies": vocabularies,
+    }
+
+    content_hash = hashlib.sha256(
+        json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:12]
+    created_at = datetime.now()
+    tables["version"] = f"{created_at:%Y%m%d}-{content_hash}"
+    tables["created_at"] = created_at.isoformat()
+    return tables
+
+
+def write_lookup_tables(tables: Dict[str, Any], path: os.PathLike = LOOKUP_TABLES_PATH) -> None:
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tables, f, indent=2, ensure_ascii=False)
+    logger.info("✓ Lookup tables %s written to %s", tables["version"], path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from prediction_models.feature_store import build
+
+    parser = argparse.ArgumentParser(description="Build the serving lookup-table artifact.")
+    parser.add_argument("--out", default=str(LOOKUP_TABLES_PATH))
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    train_df, model_counts = build(workers=args.workers)
+    tables = build_lookup_tables(train_df, model_counts)
+    write_lookup_tables(tables, args.out)
+    print(f"✓ Lookup tables {tables['version']}: {len(model_counts)} models -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
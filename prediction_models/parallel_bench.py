@@ -0,0 +1,150 @@
+"""
+Find the batch size from which a forest predicts faster on several threads.
+
+Times the sklearn backend of backend/services/predictor.py on batches drawn
+from the held-out split of train.py, once per thread count, and reports the
+smallest batch where the best multi-threaded run beats one thread by
+--min-gain. That is the value for PREDICT_PARALLEL_MIN_ROWS; PREDICT_THREADS
+(default: available CPUs / WORKERS) is the thread budget per process, so
+WORKERS x PREDICT_THREADS should not exceed the cores of the node.
+
+Usage (from the repository root):
+    python -m prediction_models.parallel_bench random_forest_light --threads 1 2 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.services.predictor import ExecutionPolicy, SklearnBackend, available_cpus
+from prediction_models.config import MODELS_STORAGE_DIR, PROCESSED_DIR
+from prediction_models.evaluate import held_out_split
+
+logger = logging.getLogger(__name__)
+
+
+PARALLEL_BENCH_PATH = PROCESSED_DIR / "parallel_bench.json"
+BATCH_SIZES = [1, 10, 100, 500, 1000, 5000, 20000]
+MIN_GAIN = 0.10             # multi-threaded must be at least 10 % faster
+ROWS_PER_SIZE = 50_000      # rows timed per batch size (at least 3 runs)
+SEED = 42
+
+
+def _batch(X: pd.DataFrame, rows: int) -> pd.DataFrame:
+    if rows <= len(X):
+        return X.iloc[:rows]
+    return X.sample(n=rows, replace=True, random_state=SEED)
+
+
+def time_predict(backend: SklearnBackend, X: pd.DataFrame) -> float:
+    """Median seconds per predict_log call on X."""
+    runs = max(3, min(50, ROWS_PER_SIZE // len(X)))
+    backend.predict_log(X)  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict_log(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def benchmark(pipeline, X: pd.DataFrame, batch_sizes: List[int], threads: List[int]) -> List[Dict[str, Any]]:
+    rows = []
+    for size in batch_sizes:
+        batch = _batch(X, size)
+        row: Dict[str, Any] = {"rows": size, "ms": {}}
+        for n in threads:
+            # parallel_min_rows=1: always use n threads, to see where it pays off
+            policy = ExecutionPolicy(n, parallel_min_rows=1)
+            policy.pin_thread_pools()
+            row["ms"][n] = time_predict(SklearnBackend(pipeline, policy), batch) * 1000
+        rows.append(row)
+        logger.info("✓ %d rows timed", size)
+    return rows
+
+
+def crossover(rows: List[Dict[str, Any]], min_gain: float = MIN_GAIN) -> Optional[Dict[str, Any]]:
+    """First batch size where some thread count > 1 is min_gain faster than 1 thread."""
+    for row in rows:
+        single = row["ms"].get(1)
+        multi = {n: ms for n, ms in row["ms"].items() if n > 1}
+        if single is None or not multi:
+            return None
+        best = min(multi, key=multi.get)
+        if multi[best] <= single * (1 - min_gain):
+            return {"rows": row["rows"], "threads": best, "speedup": single / multi[best]}
+    return None
+
+
+def print_report(rows: List[Dict[str, Any]], threads: List[int]) -> None:
+    header = f"{'rows':>8}" + "".join(f"{f'{n} thr ms':>12}" for n in threads) + f"{'best':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        best = min(row["ms"], key=row["ms"].get)
+        print(f"{row['rows']:>8}" + "".join(f"{row['ms'][n]:>12.2f}" for n in threads) + f"{best:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark forest predict on one vs. several threads.")
+    parser.add_argument("model", nargs="?", default="random_forest_light")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--data", default=None, help="training matrix (CSV/Parquet); default: the feature store")
+    parser.add_argument("--rows", type=int, nargs="+", default=BATCH_SIZES, help="batch sizes")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="thread counts (default: 1, 2, 4, ... up to the available CPUs)")
+    parser.add_argument("--min-gain", type=float, default=MIN_GAIN)
+    parser.add_argument("--report", default=str(PARALLEL_BENCH_PATH))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    cpus = available_cpus()
+    threads = sorted(set(args.threads or [1] + [2 ** i for i in range(1, 6) if 2 ** i <= cpus] + [cpus]))
+    if 1 not in threads:
+        threads.insert(0, 1)
+
+    model_path = Path(args.model_path or MODELS_STORAGE_DIR / f"{args.model}.pkl")
+    pipeline = joblib.load(model_path)
+    estimator = pipeline.steps[-1][1]
+    if not hasattr(estimator, "estimators_"):
+        parser.error(f"{type(estimator).__name__} is not a forest; its predict has no per-call n_jobs")
+
+    metadata_path = model_path.parent / "metadata" / f"{model_path.stem}_metadata.json"
+    X_test, _ = held_out_split(args.data, metadata_path=metadata_path)
+    rows = benchmark(pipeline, X_test, sorted(args.rows), threads)
+    found = crossover(rows, args.min_gain)
+
+    print_report(rows, threads)
+    if found:
+        print(f"✓ {found['threads']} threads are {found['speedup']:.2f}x faster from {found['rows']} rows: "
+              f"PREDICT_PARALLEL_MIN_ROWS={found['rows']}")
+    else:
+        print(f"✓ No batch size gains {args.min_gain:.0%} from threads on {cpus} CPU(s): keep PREDICT_THREADS=1")
+
+    report = {
+        "model": args.model,
+        "created_at": datetime.now().isoformat(),
+        "available_cpus": cpus,
+        "n_estimators": len(estimator.estimators_),
+        "min_gain": args.min_gain,
+        "results": rows,
+        "crossover": found,
+    }
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report -> {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+Incremental (warm-start) retraining on newly scraped listings.
+
+Starts from the published model instead of refitting from zero:
+    RandomForestRegressor          grows extra trees on the recent listings and
+                                   retires the same number of oldest trees
+    HistGradientBoostingRegressor  continues boosting on the recent listings
+
+The fitted preprocessor is kept as-is. Both the base and the candidate model
+are scored on a time-aware holdout: the newest listings first seen after the
+base model's data_cutoff, so neither model was trained on them. The candidate
+is published as a new versioned artifact only if its metrics do not regress;
+with fewer than MIN_HOLDOUT_ROWS such listings the guard cannot be evaluated
+honestly and nothing is published.
+
+Artifacts are written next to --model-path (its metadata/ and versions/
+directories), or under --output-dir.
+
+Usage (from the repository root):
+    python -m prediction_models.retrain random_forest_light --n-jobs 4
+"""
+
+import argparse
+import copy
+import json
+import logging
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+from prediction_models.config import MODELS_STORAGE_DIR
+from prediction_models.feature_store import FIRST_SEEN, LISTING_KEY, META_COLUMNS, build
+from prediction_models.lookup_tables import build_lookup_tables, write_lookup_tables
+from prediction_models.train import TARGET_COLUMN, evaluate, load_test_keys, save_test_keys, top_features
+
+logger = logging.getLogger(__name__)
+
+
+HOLDOUT_FRACTION = 0.3     # share of the listings newer than data_cutoff held out
+MIN_HOLDOUT_ROWS = 200
+MIN_RECENT_ROWS = 2000
+RETIRE_FRACTION = 0.2       # share of forest trees replaced per retrain
+EXTRA_ITERATIONS = 200      # boosting rounds added per retrain
+
+# Metrics that must not get worse (lower is better) beyond the tolerance
+GUARDED_METRICS = ("rmse_log", "mae_price_eur")
+
+# warm_start_boosting replaces private HistGradientBoosting methods; only
+# the sklearn releases it was checked against (backend/requirements.txt)
+BOOSTING_WARM_START_SKLEARN = ("1.7",)
+
+
+# ============================================================
+# DATA SPLITS
+# ============================================================
+
+def time_split(
+    df: pd.DataFrame,
+    data_cutoff: Optional[int],
+    holdout_fraction: float = HOLDOUT_FRACTION,
+    min_recent_rows: int = MIN_RECENT_ROWS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split the matrix into (recent, holdout) by first_seen.
+
+    holdout: the newest holdout_fraction of the listings first seen after the
+             base model's data_cutoff (empty without a data_cutoff, since any
+             older listing may be in the base model's training split).
+    recent:  the other new listings, padded with the next newest ones up to
+             min_recent_rows; never overlaps the holdout.
+
+    Listings ingested by the same refresh share a first_seen; ties are broken
+    by listing_key (a content hash), so the holdout is not the brands that
+    happen to come last in the matrix.
+    """
+    order = [FIRST_SEEN, LISTING_KEY] if LISTING_KEY in df.columns else [FIRST_SEEN]
+    ordered = df.sort_values(order, kind="stable")
+    n_new = int((ordered[FIRST_SEEN] > data_cutoff).sum()) if data_cutoff is not None else 0
+    n_holdout = int(round(n_new * holdout_fraction))
+    holdout = ordered.iloc[len(ordered) - n_holdout:]
+    rest = ordered.iloc[:len(ordered) - n_holdout]
+
+    n_recent = min(len(rest), max(n_new - n_holdout, min_recent_rows))
+    recent = rest.iloc[len(rest) - n_recent:]
+
+    logger.info(
+        "Time split: %d holdout, %d recent (%d new since the base model)",
+        len(holdout), len(recent), n_new,
+    )
+    return recent, holdout
+
+
+def _xy(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    X = df.drop(columns=[TARGET_COLUMN] + [c for c in META_COLUMNS if c in df.columns])
+    return X, df[TARGET_COLUMN].to_numpy(dtype="float64")
+
+
+# ============================================================
+# WARM START
+# ============================================================
+
+def warm_start_forest(
+    rf: RandomForestRegressor,
+    X: np.ndarray,
+    y: np.ndarray,
+    retire_fraction: float = RETIRE_FRACTION,
+    n_jobs: int = 1,
+) -> Dict[str, int]:
+    """Grow new trees on (X, y), then drop as many of the oldest trees."""
+    n_trees = len(rf.estimators_)
+    n_new = max(1, int(math.ceil(n_trees * retire_fraction)))
+
+    rf.set_params(warm_start=True, n_estimators=n_trees + n_new, n_jobs=n_jobs)
+    rf.fit(X, y)
+
+    rf.estimators_ = rf.estimators_[n_new:]
+    rf.set_params(warm_start=False, n_estimators=len(rf.estimators_), n_jobs=None)
+    return {"trees_added": n_new, "trees_retired": n_new, "n_estimators": len(rf.estimators_)}
+
+
+def warm_start_boosting(
+    hgb: HistGradientBoostingRegressor,
+    X: np.ndarray,
+    y: np.ndarray,
+    extra_iterations: int = EXTRA_ITERATIONS,
+) -> Dict[str, int]:
+    """
+    Continue boosting from the current ensemble on (X, y).
+
+    sklearn re-fits the bin mapper on every fit() call, but the existing trees
+    split on bin indices of the original mapper, so their raw predictions (and
+    the residuals the new trees learn) would be wrong. The original mapper is
+    kept for the duration of the fit.
+
+    That relies on the private _bin_data / _bin_mapper of the sklearn
+    releases in BOOSTING_WARM_START_SKLEARN; others are refused.
+    """
+    release = ".".join(sklearn.__version__.split(".")[:2])
+    if release not in BOOSTING_WARM_START_SKLEARN or not (
+        hasattr(hgb, "_bin_mapper") and callable(getattr(type(hgb), "_bin_data", None))
+    ):
+        raise RuntimeError(
+            f"Warm-starting HistGradientBoostingRegressor is only supported on scikit-learn "
+            f"{', '.join(BOOSTING_WARM_START_SKLEARN)} (installed: {sklearn.__version__}); "
+            "use prediction_models.train for a full refit"
+        )
+    bin_mapper = hgb._bin_mapper
+
+    def _bin_data(X, is_training_data):
+        hgb._bin_mapper = bin_mapper
+        binned = bin_mapper.transform(X)
+        return np.asfortranarray(binned) if is_training_data else np.ascontiguousarray(binned)
+
+    start_iter = int(hgb.n_iter_)
+    hgb.set_params(warm_start=True, max_iter=start_iter + extra_iterations)
+    hgb._bin_data = _bin_data
+    try:
+        hgb.fit(X, y)
+    finally:
+        del hgb._bin_data
+        hgb.set_params(warm_start=False)
+    return {"iterations_before": start_iter, "iterations_after": int(hgb.n_iter_)}
+
+
+def warm_start(
+    pipeline: Pipeline,
+    recent: pd.DataFrame,
+    n_jobs: int = 1,
+    retire_fraction: float = RETIRE_FRACTION,
+    extra_iterations: int = EXTRA_ITERATIONS,
+) -> Tuple[Pipeline, Dict[str, Any]]:
+    """Candidate pipeline (a copy of the base) updated on the recent listings."""
+    candidate = copy.deepcopy(pipeline)
+    X, y = _xy(recent)
+    Xt = candidate.named_steps["preprocessor"].transform(X)
+    estimator = candidate.steps[-1][1]
+
+    start = time.perf_counter()
+    if isinstance(estimator, RandomForestRegressor):
+        info = warm_start_forest(estimator, Xt, y, retire_fraction, n_jobs)
+    elif isinstance(estimator, HistGradientBoostingRegressor):
+        info = warm_start_boosting(estimator, Xt, y, extra_iterations)
+    else:
+        raise ValueError(
+            f"Warm start is not supported for {type(estimator).__name__}; "
+            "use prediction_models.train for a full refit"
+        )
+    info["fit_seconds"] = round(time.perf_counter() - start, 2)
+    info["recent_rows"] = int(len(recent))
+    return candidate, info
+
+
+# ============================================================
+# PUBLISHING
+# ============================================================
+
+def regressions(
+    base: Dict[str, float],
+    candidate: Dict[str, float],
+    tolerance: float = 0.0,
+) -> List[str]:
+    """Guarded metrics where the candidate is worse than the base."""
+    return [
+        f"{name}: {candidate[name]:.4f} > {base[name]:.4f}"
+        for name in GUARDED_METRICS
+        if candidate[name] > base[name] * (1 + tolerance)
+    ]
+
+
+def publish(
+    name: str,
+    pipeline: Pipeline,
+    metadata: Dict[str, Any],
+    lookup_tables: Dict[str, Any],
+    promote: bool = True,
+    storage_dir: os.PathLike = MODELS_STORAGE_DIR,
+    test_keys: Optional[np.ndarray] = None,
+) -> Path:
+    """
+    Write the versioned artifact under storage_dir/versions; with promote also
+    replace the live model, its metadata (and test_keys) and the lookup tables
+    in storage_dir.
+    """
+    storage_dir = Path(storage_dir)
+    versions_dir = storage_dir / "versions"
+    metadata_dir = storage_dir / "metadata"
+    version = metadata["version"]
+    os.makedirs(versions_dir, exist_ok=True)
+
+    versioned = versions_dir / f"{name}-{version}.pkl"
+    joblib.dump(pipeline, versioned)
+    with open(versions_dir / f"{name}-{version}_metadata.json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    if test_keys is not None:
+        save_test_keys(test_keys, versions_dir / f"{name}-{version}_metadata.json")
+    write_lookup_tables(lookup_tables, versions_dir / f"lookup_tables-{version}.json")
+
+    if promote:
+        os.makedirs(metadata_dir, exist_ok=True)
+        live = storage_dir / f"{name}.pkl"
+        tmp = live.with_suffix(".tmp")
+        joblib.dump(pipeline, tmp)
+        os.replace(tmp, live)
+        with open(metadata_dir / f"{name}_metadata.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        if test_keys is not None:
+            save_test_keys(test_keys, metadata_dir / f"{name}_metadata.json")
+        write_lookup_tables(lookup_tables, storage_dir / "lookup_tables.json")
+        logger.info("✓ Promoted %s as the live %s model", version, name)
+
+    return versioned
+
+
+def retrain(
+    name: str,
+    model_path: Optional[os.PathLike] = None,
+    metadata_path: Optional[os.PathLike] = None,
+    output_dir: Optional[os.PathLike] = None,
+    n_jobs: int = 1,
+    tolerance: float = 0.0,
+    retire_fraction: float = RETIRE_FRACTION,
+    extra_iterations: int = EXTRA_ITERATIONS,
+    promote: bool = True,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Warm-start the published model and publish it if it does not regress."""
+    model_path = Path(model_path or MODELS_STORAGE_DIR / f"{name}.pkl")
+    metadata_path = Path(metadata_path or model_path.parent / "metadata" / f"{name}_metadata.json")
+    storage_dir = Path(output_dir or model_path.parent)
+
+    base = joblib.load(model_path)
+    base_metadata: Dict[str, Any] = {}
+    if metadata_path.exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            base_metadata = json.load(f)
+    data_cutoff = base_metadata.get("training_info", {}).get("data_cutoff")
+
+    df, model_counts = build(workers=n_jobs, with_meta=True)
+    recent, holdout = time_split(df, data_cutoff)
+
+    candidate, info = warm_start(base, recent, n_jobs, retire_fraction, extra_iterations)
+
+    base_metrics: Optional[Dict[str, float]] = None
+    candidate_metrics: Optional[Dict[str, float]] = None
+    if len(holdout) < MIN_HOLDOUT_ROWS:
+        # Older listings may be in the base model's training split; scoring it
+        # on them would favour the base model over the candidate
+        problems = [
+            f"only {len(holdout)} holdout listings first seen after data_cutoff "
+            f"({data_cutoff}); at least {MIN_HOLDOUT_ROWS} needed to compare the models"
+        ]
+    else:
+        X_holdout, y_holdout = _xy(holdout)
+        base_metrics = evaluate(y_holdout, base.predict(X_holdout))
+        candidate_metrics = evaluate(y_holdout, candidate.predict(X_holdout))
+        problems = regressions(base_metrics, candidate_metrics, tolerance)
+
+    version = datetime.now().strftime("%Y%m%d%H%M%S")
+    metadata = copy.deepcopy(base_metadata)
+    metadata.update({
+        "saved_at": datetime.now().isoformat(),
+        "version": version,
+        "tuning_method": "warm_start",
+        "performance_metrics": candidate_metrics,
+        "top_features": top_features(candidate),
+        "retrain": {
+            "base_version": base_metadata.get("version") or base_metadata.get("saved_at"),
+            "holdout": "time-aware, newest first_seen after data_cutoff",
+            "holdout_rows": int(len(holdout)),
+            "base_holdout_metrics": base_metrics,
+            **info,
+        },
+    })
+    training_info = metadata.setdefault("training_info", {})
+    # Everything in this build, holdout included, is at or before the cutoff;
+    # the next retrain only treats listings ingested after it as new
+    training_info["data_cutoff"] = int(df[FIRST_SEEN].max())
+
+    # The candidate has not seen the base model's test rows (unless they were
+    # refit as recent listings) nor the holdout
+    recent_keys = recent[LISTING_KEY].to_numpy()
+    test_keys = holdout[LISTING_KEY].to_numpy()
+    base_test_keys = load_test_keys(metadata_path)
+    if base_test_keys is not None:
+        test_keys = np.concatenate([base_test_keys, test_keys])
+    test_keys = np.setdiff1d(test_keys, recent_keys)
+    training_info["test_keys"] = f"{name}_test_keys.npy"
+
+    published = not problems and not dry_run
+    result = {
+        "version": version,
+        "published": published,
+        "regressions": problems,
+        "base_metrics": base_metrics,
+        "candidate_metrics": candidate_metrics,
+        "retrain": metadata["retrain"],
+    }
+
+    if problems:
+        logger.warning("Candidate %s not published: %s", version, "; ".join(problems))
+    elif published:
+        lookup_tables = build_lookup_tables(df.drop(columns=META_COLUMNS), model_counts)
+        result["path"] = str(publish(name, candidate, metadata, lookup_tables, promote, storage_dir, test_keys))
+
+    return result
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Warm-start retraining on new listings.")
+    parser.add_argument("model", help="random_forest_light, random_forest_best or hist_gradient_boosting")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--metadata-path", default=None)
+    parser.add_argument("--output-dir", default=None,
+                        help="where to publish (default: the directory of --model-path)")
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="allowed relative regression of the guarded metrics")
+    parser.add_argument("--retire-fraction", type=float, default=RETIRE_FRACTION)
+    parser.add_argument("--extra-iterations", type=int, default=EXTRA_ITERATIONS)
+    parser.add_argument("--no-promote", action="store_true",
+                        help="only write the versioned artifact")
+    parser.add_argument("--dry-run", action="store_true", help="evaluate without publishing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    result = retrain(
+        args.model,
+        model_path=args.model_path,
+        metadata_path=args.metadata_path,
+        output_dir=args.output_dir,
+        n_jobs=args.n_jobs,
+        tolerance=args.tolerance,
+        retire_fraction=args.retire_fraction,
+        extra_iterations=args.extra_iterations,
+        promote=not args.no_promote,
+        dry_run=args.dry_run,
+    )
+
+    base, cand = result["base_metrics"], result["candidate_metrics"]
+    if base is not None:
+        print(f"Holdout RMSE (log): base {base['rmse_log']:.4f} -> candidate {cand['rmse_log']:.4f}")
+        print(f"Holdout MAE (EUR):  base {base['mae_price_eur']:,.0f} -> candidate {cand['mae_price_eur']:,.0f}")
+    if result["published"]:
+        print(f"✓ Published {result['version']} -> {result['path']}")
+    elif result["regressions"]:
+        print(f"✗ Not published: {'; '.join(result['regressions'])}")
+    else:
+        print("Dry run: nothing published")
+
+    # Non-zero exit lets a scheduled job notice a rejected candidate
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Accuracy gain vs. added latency of the hashed description features.
+
+Trains a registered model with and without the descriere features on the
+same split and times one API-style request (engineer_features + predict)
+for both, plus the hashing step alone.
+
+Usage (from the repository root):
+    python -m prediction_models.text_eval hist_gradient_boosting
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+
+from backend.models.schemas import CarPredictionRequest
+from backend.services.feature_engineer import engineer_features
+from backend.services.text_features import TEXT_COLUMN, hash_text
+from prediction_models.config import PROCESSED_DIR
+from prediction_models.train import load_training_data, train_model
+
+logger = logging.getLogger(__name__)
+
+
+TEXT_EVAL_PATH = PROCESSED_DIR / "text_eval.json"
+LATENCY_RUNS = 200
+
+SAMPLE_REQUEST = {
+    "marca": "Volkswagen",
+    "model": "Golf",
+    "an_fabricatie": 2015,
+    "rulaj": 180000,
+    "putere": 110,
+    "capacitate_motor": 1598,
+    "combustibil": "Diesel",
+    "caroserie": "Hatchback",
+    "culoare": "Negru",
+    "cutie_viteza": "Manuala",
+}
+
+
+def _median_us(fn, runs: int = LATENCY_RUNS) -> float:
+    fn()  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def request_latency_us(model_path: os.PathLike, description: str, runs: int = LATENCY_RUNS) -> float:
+    """Median latency of engineer_features + predict for one request."""
+    pipeline = joblib.load(model_path)
+    request = CarPredictionRequest(**SAMPLE_REQUEST, descriere=description)
+    return _median_us(lambda: pipeline.predict(engineer_features(request)), runs)
+
+
+def compare(name: str, n_jobs: int = 1, runs: int = LATENCY_RUNS) -> Dict[str, Any]:
+    df, _ = load_training_data(with_text=True, workers=n_jobs)
+    description = next(t for t in df[TEXT_COLUMN] if len(t) > 500)
+
+    with tempfile.TemporaryDirectory() as out:
+        plain = train_model(name, df.drop(columns=[TEXT_COLUMN]), output_dir=out, metadata_dir=out, n_jobs=n_jobs)
+        text = train_model(name, df, output_dir=out, metadata_dir=out, n_jobs=n_jobs)
+
+        plain_us = request_latency_us(Path(out) / f"{name}.pkl", description, runs)
+        text_us = request_latency_us(Path(out) / f"{name}_text.pkl", description, runs)
+
+    hashing_us = _median_us(lambda: hash_text(description), runs)
+    p, t = plain["performance_metrics"], text["performance_metrics"]
+    return {
+        "model": name,
+        "description_chars": len(description),
+        "accuracy_percent": {"without_text": p["accuracy_percent"], "with_text": t["accuracy_percent"]},
+        "mae_price_eur": {"without_text": p["mae_price_eur"], "with_text": t["mae_price_eur"]},
+        "rmse_price_eur": {"without_text": p["rmse_price_eur"], "with_text": t["rmse_price_eur"]},
+        "accuracy_gain_points": t["accuracy_percent"] - p["accuracy_percent"],
+        "request_latency_us": {"without_text": plain_us, "with_text": text_us},
+        "added_latency_us": text_us - plain_us,
+        "hashing_latency_us": hashing_us,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure the hashed text features.")
+    parser.add_argument("models", nargs="*", default=["hist_gradient_boosting"])
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--runs", type=int, default=LATENCY_RUNS)
+    parser.add_argument("--out", default=str(TEXT_EVAL_PATH))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = [compare(name, n_jobs=args.n_jobs, runs=args.runs) for name in args.models]
+
+    print(f"{'model':<24}{'acc %':>8}{'acc % +text':>13}{'gain':>7}{'req µs':>9}{'req µs +text':>14}{'hash µs':>9}")
+    for r in results:
+        acc, lat = r["accuracy_percent"], r["request_latency_us"]
+        print(
+            f"{r['model']:<24}{acc['without_text']:>8.2f}{acc['with_text']:>13.2f}{r['accuracy_gain_points']:>+7.2f}"
+            f"{lat['without_text']:>9.0f}{lat['with_text']:>14.0f}{r['hashing_latency_us']:>9.0f}"
+        )
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Report -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,632 @@
+"""
+Scripted training for the models of the four training notebooks.
+
+    random_forest_light      random_forest_light_model.ipynb
+    random_forest_best       random_forest_model.ipynb (randomized search)
+    hist_gradient_boosting   hist_gradient_boosting_model.ipynb
+    linear_regression        linear_regresion_model.ipynb
+
+The ColumnTransformer is fitted once on the train split and its output is
+cached on disk (data/cache/), so search trials and repeated runs reuse the
+encoded arrays (unlike the notebooks, CV folds share that one encoder).
+Hyperparameter search trials (candidate x fold) run on a process pool that
+memory-maps the cached arrays. Each run writes the Pipeline pickle, its
+metadata JSON (the schema ModelLoader.get_model_info reads) and the
+lookup-table artifact.
+
+Usage (from the repository root):
+    python -m prediction_models.train random_forest_light hist_gradient_boosting --n-jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import (
+    mean_absolute_error,
+    mean_absolute_percentage_error,
+    mean_squared_error,
+    r2_score,
+)
+from sklearn.model_selection import KFold, ParameterSampler, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from backend.services.text_features import TEXT_COLUMN, HashedTextFeatures
+from prediction_models.config import (
+    CACHE_DIR,
+    DRIFT_REFERENCE_PATH,
+    LOOKUP_TABLES_PATH,
+    METADATA_DIR,
+    MODELS_STORAGE_DIR,
+    REPO_ROOT,
+)
+from prediction_models.feature_store import FIRST_SEEN, LISTING_KEY, META_COLUMNS, build
+
+logger = logging.getLogger(__name__)
+
+
+TARGET_COLUMN = "pret_log"
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+FEATURE_STORE_SOURCE = "feature_store"   # training_info.data_source without --data
+TEST_KEYS_SUFFIX = "_test_keys.npy"       # listing_keys of the test split, next to the metadata
+DENSE_TEXT_FEATURES = 256                 # hashed text columns kept for dense-input estimators
+
+
+# ============================================================
+# MODEL SPECS (one per notebook)
+# ============================================================
+
+MODEL_SPECS: Dict[str, Dict[str, Any]] = {
+    "random_forest_light": {
+        "model_type": "RandomForestRegressor (lightweight)",
+        "step": "rf",
+        "estimator": RandomForestRegressor,
+        "params": {
+            "n_estimators": 150,
+            "max_depth": 12,
+            "min_samples_split": 6,
+            "min_samples_leaf": 2,
+            "max_features": 0.5,
+            "bootstrap": True,
+            "random_state": RANDOM_STATE,
+        },
+        "tuning_method": "manual_fixed_params",
+        "sparse_input": False,      # forests fit CSR input several times slower
+    },
+    "random_forest_best": {
+        "model_type": "RandomForestRegressor",
+        "step": "rf",
+        "estimator": RandomForestRegressor,
+        "params": {"random_state": RANDOM_STATE},
+        "tuning_method": "RandomizedSearchCV",
+        "sparse_input": False,
+        "search": {
+            "param_distributions": {
+                "rf__n_estimators": [800, 1000],
+                "rf__max_depth": [20, None],
+                "rf__min_samples_split": [4, 6, 8],
+                "rf__min_samples_leaf": [1, 2],
+                "rf__max_features": [0.5, 0.7],
+                "rf__bootstrap": [True],
+            },
+            "n_iter": 40,
+            "cv": 4,
+        },
+    },
+    "hist_gradient_boosting": {
+        "model_type": "HistGradientBoostingRegressor",
+        "step": "hgb",
+        "estimator": HistGradientBoostingRegressor,
+        "params": {
+            "max_depth": 8,
+            "learning_rate": 0.01,
+            "max_iter": 1500,
+            "max_leaf_nodes": 64,
+            "l2_regularization": 1.0,
+            "early_stopping": "auto",
+            "validation_fraction": 0.1,
+            "random_state": RANDOM_STATE,
+        },
+        "tuning_method": "manual_fixed_params",
+        "sparse_input": False,      # HistGradientBoosting only takes dense input
+    },
+    "linear_regression": {
+        "model_type": "LinearRegression",
+        "step": "regressor",
+        "estimator": LinearRegression,
+        "params": {},
+        "tuning_method": "none",
+        "sparse_input": True,
+    },
+}
+
+
+def make_estimator(name: str, params: Optional[Dict[str, Any]] = None, n_jobs: Optional[int] = None):
+    """Estimator of a registered model; params may carry the '<step>__' prefix."""
+    spec = MODEL_SPECS[name]
+    estimator = spec["estimator"](**spec["params"])
+    if params:
+        estimator.set_params(**_strip_step(params, spec["step"]))
+    if n_jobs is not None and "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+    return estimator
+
+
+# ============================================================
+# DATA
+# ============================================================
+
+def load_training_data(
+    data_path: Optional[str] = None,
+    workers: int = 1,
+    with_text: bool = False,
+) -> Tuple[pd.DataFrame, Optional[Dict[str, int]]]:
+    """
+    Training matrix plus the model counts it was built with.
+
+    Defaults to refreshing the feature store; an explicit CSV/Parquet file is
+    used as-is (no model counts, so no lookup tables are written).
+    """
+    if data_path is None or data_path == FEATURE_STORE_SOURCE:
+        return build(workers=workers, with_meta=True, with_text=with_text)
+
+    if str(data_path).endswith(".parquet"):
+        from prediction_models.dataset_store import read_train_ready
+        return read_train_ready(path=data_path), None
+    return pd.read_csv(data_path), None
+
+
+def test_keys_path(metadata_path: os.PathLike) -> Path:
+    """<artifact>_test_keys.npy next to <artifact>_metadata.json."""
+    metadata_path = Path(metadata_path)
+    return metadata_path.with_name(metadata_path.name.replace("_metadata.json", TEST_KEYS_SUFFIX))
+
+
+def load_test_keys(metadata_path: os.PathLike) -> Optional[np.ndarray]:
+    """listing_keys of the test split saved with the artifact, if any."""
+    path = test_keys_path(metadata_path)
+    return np.load(path) if path.exists() else None
+
+
+def save_test_keys(keys: np.ndarray, metadata_path: os.PathLike) -> Path:
+    path = test_keys_path(metadata_path)
+    os.makedirs(path.parent, exist_ok=True)
+    np.save(path, np.unique(np.asarray(keys, dtype="int64")))
+    return path
+
+
+def held_out_frame(df: pd.DataFrame, metadata_path: Optional[os.PathLike] = None) -> pd.DataFrame:
+    """
+    Rows of df the artifact of metadata_path was not trained on.
+
+    With the test listing_keys saved at training time, the rows carrying
+    them. Otherwise df is re-split like train_model, after dropping the
+    listings first seen after the artifact's data_cutoff (they were not in
+    the matrix it was split from). Without either the re-split may hold
+    rows the model was trained on, which is logged.
+    """
+    metadata: Dict[str, Any] = {}
+    if metadata_path is not None and Path(metadata_path).exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+    keys = load_test_keys(metadata_path) if metadata_path is not None else None
+    if keys is not None and LISTING_KEY in df.columns:
+        return df[df[LISTING_KEY].isin(keys)]
+
+    data_cutoff = metadata.get("training_info", {}).get("data_cutoff")
+    if data_cutoff is not None and FIRST_SEEN in df.columns:
+        logger.warning("No saved test keys for %s; re-splitting the listings up to data_cutoff", metadata_path)
+        df = df[df[FIRST_SEEN] <= data_cutoff]
+    else:
+        logger.warning(
+            "No saved test keys or data_cutoff for %s; the re-split may hold training rows", metadata_path
+        )
+    _, test = train_test_split(df, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    return test
+
+
+def split_columns(X: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    feature_columns = X.columns.drop(TEXT_COLUMN, errors="ignore")
+    categorical = X[feature_columns].select_dtypes(include=["object", "string", "category"]).columns.tolist()
+    numeric = [c for c in feature_columns if c not in categorical]
+    return categorical, numeric
+
+
+def make_preprocessor(
+    categorical_cols: List[str],
+    numeric_cols: List[str],
+    text: bool = False,
+    sparse_output: bool = False,
+) -> ColumnTransformer:
+    """
+    Dense output, as in the notebooks. With text, estimators that fit sparse
+    input quickly (sparse_output) get CSR output with every hashed column;
+    the others get the DENSE_TEXT_FEATURES most frequent hashed columns, so
+    the full hashed width is never densified.
+    """
+    sparse_output = sparse_output and text
+    transformers = [
+        ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=sparse_output), categorical_cols),
+        ("num", "passthrough", numeric_cols),
+    ]
+    if text:
+        max_features = None if sparse_output else DENSE_TEXT_FEATURES
+        transformers.append(("text", HashedTextFeatures(max_features=max_features), TEXT_COLUMN))
+    return ColumnTransformer(transformers=transformers, sparse_threshold=1.0 if sparse_output else 0)
+
+
+# ============================================================
+# PREPROCESSING CACHE
+# ============================================================
+
+def _frame_hash(X: pd.DataFrame, y: pd.Series) -> str:
+    digest = hashlib.sha256()
+    digest.update("|".join(map(str, X.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(X.astype(str), index=False).to_numpy().tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy(dtype="float64")).tobytes())
+    digest.update(sklearn.__version__.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def encode_cached(
+    X_train: pd.DataFrame,
+    X_test: pd.DataFrame,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    cache_dir: Optional[os.PathLike] = CACHE_DIR,
+    sparse_output: bool = False,
+) -> Tuple[ColumnTransformer, Path]:
+    """
+    Fit the ColumnTransformer on the train split and cache the encoded arrays.
+
+    Returns the fitted preprocessor and the cache directory holding
+    X_train / X_test (.npy, or .npz when the output is sparse) and
+    y_train.npy / y_test.npy.
+    """
+    text = TEXT_COLUMN in X_train.columns
+    key = _frame_hash(pd.concat([X_train, X_test]), pd.concat([y_train, y_test]))
+    path = Path(cache_dir) / f"preprocessed-{key}{'-sparse' if sparse_output and text else ''}"
+    preprocessor_file = path / "preprocessor.joblib"
+
+    if preprocessor_file.exists():
+        logger.info("✓ Reusing cached preprocessing %s", path.name)
+        return joblib.load(preprocessor_file), path
+
+    categorical_cols, numeric_cols = split_columns(X_train)
+    preprocessor = make_preprocessor(categorical_cols, numeric_cols, text=text, sparse_output=sparse_output)
+
+    start = time.perf_counter()
+    Xt_train = preprocessor.fit_transform(X_train)
+    Xt_test = preprocessor.transform(X_test)
+    logger.info("Encoded %s -> %s in %.2fs", X_train.shape, Xt_train.shape, time.perf_counter() - start)
+
+    tmp = path.with_name(path.name + ".tmp")
+    os.makedirs(tmp, exist_ok=True)
+    for name, Xt in (("X_train", Xt_train), ("X_test", Xt_test)):
+        if sparse.issparse(Xt):
+            sparse.save_npz(tmp / f"{name}.npz", Xt.tocsr().astype("float64"))
+        else:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(Xt, dtype="float64"))
+    np.save(tmp / "y_train.npy", y_train.to_numpy(dtype="float64"))
+    np.save(tmp / "y_test.npy", y_test.to_numpy(dtype="float64"))
+    joblib.dump(preprocessor, tmp / "preprocessor.joblib")
+    os.replace(tmp, path)
+
+    return preprocessor, path
+
+
+def load_arrays(cache_path: os.PathLike, mmap: bool = True) -> Dict[str, Any]:
+    """Cached arrays; sparse ones (.npz) are read into memory, dense ones memory-mapped."""
+    mode = "r" if mmap else None
+    arrays: Dict[str, Any] = {}
+    for name in ("X_train", "X_test", "y_train", "y_test"):
+        npz = Path(cache_path) / f"{name}.npz"
+        if npz.exists():
+            arrays[name] = sparse.load_npz(npz)
+        else:
+            arrays[name] = np.load(Path(cache_path) / f"{name}.npy", mmap_mode=mode)
+    return arrays
+
+
+# ============================================================
+# HYPERPARAMETER SEARCH
+# ============================================================
+
+def _strip_step(params: Dict[str, Any], step: str) -> Dict[str, Any]:
+    prefix = f"{step}__"
+    return {k[len(prefix):] if k.startswith(prefix) else k: v for k, v in params.items()}
+
+
+def _score_trial(
+    name: str,
+    params: Dict[str, Any],
+    cache_path: str,
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+) -> float:
+    """Fit one candidate on one fold; returns the validation MSE (log space)."""
+    arrays = load_arrays(cache_path)
+    X, y = arrays["X_train"], arrays["y_train"]
+
+    # Parallelism comes from the pool, not the estimator
+    estimator = make_estimator(name, params, n_jobs=1)
+    estimator.fit(X[train_idx], y[train_idx])
+    return float(mean_squared_error(y[val_idx], estimator.predict(X[val_idx])))
+
+
+def search_hyperparameters(
+    name: str,
+    cache_path: Path,
+    n_jobs: int,
+    n_iter: Optional[int] = None,
+    cv: Optional[int] = None,
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Randomized search over the spec's distributions, trials on a process pool.
+
+    Returns the best parameters (with the step prefix, as in the notebooks)
+    and the best mean CV score as negative MSE in log space.
+    """
+    spec = MODEL_SPECS[name]
+    search = spec["search"]
+    n_iter = n_iter or search["n_iter"]
+    cv = cv or search["cv"]
+
+    candidates = list(ParameterSampler(search["param_distributions"], n_iter=n_iter, random_state=RANDOM_STATE))
+    n_train = len(load_arrays(cache_path)["y_train"])
+    folds = list(KFold(n_splits=cv).split(np.arange(n_train)))
+
+    trials = [(i, f) for i in range(len(candidates)) for f in range(len(folds))]
+    logger.info("%s: %d candidates × %d folds on %d processes", name, len(candidates), cv, n_jobs)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [
+            pool.submit(
+                _score_trial,
+                name,
+                candidates[i],
+                str(cache_path),
+                folds[f][0],
+                folds[f][1],
+            )
+            for i, f in trials
+        ]
+        scores = [future.result() for future in futures]
+
+    mse = np.array(scores).reshape(len(candidates), len(folds)).mean(axis=1)
+    best = int(np.argmin(mse))
+    logger.info("%s: search done in %.1fs, best neg MSE %.5f", name, time.perf_counter() - start, -mse[best])
+    return candidates[best], float(-mse[best])
+
+
+# ============================================================
+# METRICS & METADATA
+# ============================================================
+
+def evaluate(y_test_log: np.ndarray, y_pred_log: np.ndarray) -> Dict[str, float]:
+    y_true = np.expm1(y_test_log)
+    y_pred = np.expm1(y_pred_log)
+    mape = mean_absolute_percentage_error(y_true, y_pred) * 100
+    return {
+        "rmse_log": float(np.sqrt(mean_squared_error(y_test_log, y_pred_log))),
+        "r2_log": float(r2_score(y_test_log, y_pred_log)),
+        "rmse_price_eur": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae_price_eur": float(mean_absolute_error(y_true, y_pred)),
+        "r2_price": float(r2_score(y_true, y_pred)),
+        "mape_percent": float(mape),
+        "accuracy_percent": float(100 - mape),
+    }
+
+
+def top_features(pipeline: Pipeline, n: int = 20) -> List[Dict[str, Any]]:
+    estimator = pipeline.steps[-1][1]
+    if hasattr(estimator, "feature_importances_"):
+        scores = np.asarray(estimator.feature_importances_)
+    elif hasattr(estimator, "coef_"):
+        scores = np.abs(np.asarray(estimator.coef_))
+    else:
+        return []
+
+    names = pipeline.named_steps["preprocessor"].get_feature_names_out()
+    order = np.argsort(scores)[::-1][:n]
+    return [
+        {"rank": rank, "name": str(names[i]), "importance": float(scores[i])}
+        for rank, i in enumerate(order)
+    ]
+
+
+def build_metadata(
+    name: str,
+    pipeline: Pipeline,
+    params: Dict[str, Any],
+    metrics: Dict[str, float],
+    X: pd.DataFrame,
+    n_train: int,
+    n_test: int,
+    model_path: Path,
+    search_info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    spec = MODEL_SPECS[name]
+    categorical_cols, numeric_cols = split_columns(X)
+    text_features = pipeline.named_steps["preprocessor"].named_transformers_.get("text")
+
+    metadata: Dict[str, Any] = {
+        "saved_at": datetime.now().isoformat(),
+        "model_type": spec["model_type"],
+        "tuning_method": spec["tuning_method"],
+        "best_parameters": params,
+        "performance_metrics": metrics,
+        "training_info": {
+            "train_samples": int(n_train),
+            "test_samples": int(n_test),
+            "total_features_raw": int(X.shape[1]),
+            "total_features_after_encoding": int(len(pipeline.named_steps["preprocessor"].get_feature_names_out())),
+            "categorical_features": categorical_cols,
+            "numeric_features": numeric_cols,
+            "text_features": (
+                {"column": TEXT_COLUMN, "n_features": text_features.n_features_out_, "method": "hashing"}
+                if text_features is not None else None
+            ),
+            "sklearn_version": sklearn.__version__,
+        },
+        "top_features": top_features(pipeline),
+        "paths": {
+            "model_path": os.path.relpath(model_path, REPO_ROOT),
+        },
+    }
+    if search_info:
+        metadata["random_search"] = search_info
+    return metadata
+
+
+# ============================================================
+# TRAINING
+# ============================================================
+
+def train_model(
+    name: str,
+    df: pd.DataFrame,
+    output_dir: os.PathLike = MODELS_STORAGE_DIR,
+    metadata_dir: os.PathLike = METADATA_DIR,
+    cache_dir: os.PathLike = CACHE_DIR,
+    n_jobs: int = 1,
+    n_iter: Optional[int] = None,
+    cv: Optional[int] = None,
+    data_source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Train one registered model, save pickle + metadata, return the metadata.
+
+    When df has a descriere column the model also gets the hashed text
+    features and is saved as <name>_text. data_source (the --data file, None
+    for the feature store) is recorded and the listing_keys of the test split
+    are saved, so evaluate.py scores the artifact on the same held-out rows.
+    """
+    spec = MODEL_SPECS[name]
+
+    meta = [c for c in META_COLUMNS if c in df.columns]
+    X = df.drop(columns=[TARGET_COLUMN] + meta)
+    artifact = f"{name}_text" if TEXT_COLUMN in X.columns else name
+    y_log = df[TARGET_COLUMN].astype("float64")
+    X_train, X_test, y_train_log, y_test_log = train_test_split(
+        X, y_log, test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+
+    preprocessor, cache_path = encode_cached(
+        X_train, X_test, y_train_log, y_test_log, cache_dir, sparse_output=spec["sparse_input"]
+    )
+    arrays = load_arrays(cache_path, mmap=False)
+
+    search_info = None
+    if "search" in spec:
+        params, best_cv = search_hyperparameters(name, cache_path, n_jobs, n_iter=n_iter, cv=cv)
+        search_info = {
+            "n_iter": n_iter or spec["search"]["n_iter"],
+            "cv_folds": cv or spec["search"]["cv"],
+            "scoring": "neg_mean_squared_error (log-space pret_log)",
+            "cv_best_neg_mse_log": best_cv,
+        }
+    else:
+        params = dict(spec["params"])
+
+    estimator = make_estimator(name, params, n_jobs=n_jobs)
+
+    start = time.perf_counter()
+    estimator.fit(arrays["X_train"], arrays["y_train"])
+    fit_seconds = time.perf_counter() - start
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=None)  # serving decides its own parallelism
+
+    pipeline = Pipeline(steps=[("preprocessor", preprocessor), (spec["step"], estimator)])
+    metrics = evaluate(arrays["y_test"], pipeline.predict(X_test))
+    if search_info:
+        metrics["cv_best_neg_mse_log"] = search_info["cv_best_neg_mse_log"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(metadata_dir, exist_ok=True)
+    model_path = Path(output_dir) / f"{artifact}.pkl"
+    joblib.dump(pipeline, model_path)
+
+    metadata = build_metadata(
+        name, pipeline, params, metrics, X, len(X_train), len(X_test), model_path, search_info
+    )
+    metadata["training_info"]["fit_seconds"] = round(fit_seconds, 2)
+    metadata["training_info"]["data_source"] = str(data_source) if data_source else FEATURE_STORE_SOURCE
+    if FIRST_SEEN in df.columns:
+        # Listings first seen after this are new to the model (see retrain.py)
+        metadata["training_info"]["data_cutoff"] = int(df[FIRST_SEEN].max())
+    metadata_path = Path(metadata_dir) / f"{artifact}_metadata.json"
+    if LISTING_KEY in df.columns:
+        # Duplicate listings on both sides of the split count as trained on
+        train_keys = df.loc[X_train.index, LISTING_KEY]
+        test_keys = df.loc[X_test.index, LISTING_KEY]
+        keys_path = save_test_keys(test_keys[~test_keys.isin(train_keys)].to_numpy(), metadata_path)
+        metadata["training_info"]["test_keys"] = keys_path.name
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    size_mb = os.path.getsize(model_path) / (1024 * 1024)
+    logger.info(
+        "✓ %s: accuracy %.2f%%, RMSE %.0f EUR, %.2f MB -> %s",
+        artifact, metrics["accuracy_percent"], metrics["rmse_price_eur"], size_mb, model_path,
+    )
+    return metadata
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train the car price models.")
+    parser.add_argument("models", nargs="*", default=["random_forest_light"],
+                        help=f"models to train: {', '.join(MODEL_SPECS)} or 'all'")
+    parser.add_argument("--data", default=None,
+                        help="training matrix (CSV/Parquet); default: refresh the feature store")
+    parser.add_argument("--output-dir", default=str(MODELS_STORAGE_DIR))
+    parser.add_argument("--metadata-dir", default=str(METADATA_DIR))
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--n-iter", type=int, default=None, help="override search iterations")
+    parser.add_argument("--cv", type=int, default=None, help="override search folds")
+    parser.add_argument("--text", action="store_true",
+                        help="add hashed descriere features (saved as <model>_text)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    names = list(MODEL_SPECS) if args.models == ["all"] else args.models
+    unknown = [n for n in names if n not in MODEL_SPECS]
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+
+    df, model_counts = load_training_data(args.data, workers=args.n_jobs, with_text=args.text)
+
+    for name in names:
+        metadata = train_model(
+            name, df,
+            output_dir=args.output_dir,
+            metadata_dir=args.metadata_dir,
+            cache_dir=args.cache_dir,
+            n_jobs=args.n_jobs,
+            n_iter=args.n_iter,
+            cv=args.cv,
+            data_source=args.data,
+        )
+        perf = metadata["performance_metrics"]
+        print(f"✓ {Path(metadata['paths']['model_path']).stem}: accuracy {perf['accuracy_percent']:.2f}%  "
+              f"RMSE {perf['rmse_price_eur']:,.0f} EUR  MAE {perf['mae_price_eur']:,.0f} EUR")
+
+    if model_counts is not None:
+        from prediction_models.lookup_tables import build_lookup_tables, write_lookup_tables
+        lookup_path = Path(args.output_dir) / LOOKUP_TABLES_PATH.name
+        write_lookup_tables(build_lookup_tables(df, model_counts), lookup_path)
+        print(f"✓ Lookup tables -> {lookup_path}")
+
+    from backend.services.drift import build_reference_profile, write_reference_profile
+    drift_path = Path(args.output_dir) / DRIFT_REFERENCE_PATH.name
+    write_reference_profile(build_reference_profile(df), drift_path)
+    print(f"✓ Drift reference profile -> {drift_path}")
+
+
+if __name__ == "__main__":
+    main()
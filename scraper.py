@@ -4,7 +4,10 @@ import csv
 import time
 import logging
 import os
+import re
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(
@@ -13,8 +16,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OLX detail URLs end in "-ID<listing id>.html"
+LISTING_ID_RE = re.compile(r'-ID([0-9A-Za-z]+)\.html')
+
+
+class RateLimiter:
+    """Space out requests from all threads by a minimum interval."""
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        # Reserve the next free slot under the lock, sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class OLXRomaniaScraper:
-    def __init__(self, output_dir='carData'):
+    def __init__(self, output_dir='carData', request_interval=2.0, max_workers=4):
         self.output_dir = output_dir  # Directory to save CSVs
         self.headers = {
             'User-Agent': (
@@ -26,6 +52,12 @@ class OLXRomaniaScraper:
         self.base_url = 'https://www.olx.ro/auto-masini-moto-ambarcatiuni/autoturisme/'
         self.base_params = {'currency': 'EUR'}
         self.rows = []
+        self.max_workers = max_workers
+        # Shared by all brand workers, so concurrency never exceeds the rate budget
+        self.rate_limiter = RateLimiter(request_interval)
+        # Global dedup index: listing id -> brand that claimed it first
+        self.seen_listings = {}
+        self._lock = threading.Lock()
         self.columns = [
             'marca', 'model', 'pret', 'capacitate motor', 'putere',
             'combustibil', 'caroserie', 'rulaj', 'culoare',
@@ -37,6 +69,7 @@ class OLXRomaniaScraper:
             os.makedirs(self.output_dir)
 
     def scrape_page(self, url, params=None):
+        self.rate_limiter.wait()
         try:
             logger.info(f"Scraping: {url}")
             resp = requests.get(url, headers=self.headers, timeout=15, params=params)
@@ -60,14 +93,88 @@ class OLXRomaniaScraper:
         logger.info(f"Collected {len(urls)} detail URLs from listing page")
         return list(urls)
 
+    @staticmethod
+    def listing_id(url):
+        """Stable listing key: the OLX ad id, or the URL without query/fragment."""
+        match = LISTING_ID_RE.search(url)
+        if match:
+            return match.group(1)
+        return url.split('#', 1)[0].split('?', 1)[0]
+
+    def claim_listing(self, url, brand):
+        """Register a listing in the global index; False if another query already has it."""
+        key = self.listing_id(url)
+        with self._lock:
+            if key in self.seen_listings:
+                return False
+            self.seen_listings[key] = brand
+            return True
+
+    def collect_brand_urls(self, brand, num_pages):
+        """Walk listing pages for a brand until a page brings no new URLs."""
+        brand_ids = set()
+        detail_urls = []
+
+        for page in range(1, num_pages + 1):
+            params = dict(self.base_params)
+            params['page'] = page
+            url = f"{self.base_url}{brand}"  # Generate URL for the specific brand
+            soup = self.scrape_page(url, params=params)
+            if not soup:
+                break
+
+            new_on_page = 0
+            for u in self.collect_listing_urls(soup):
+                key = self.listing_id(u)
+                if key in brand_ids:
+                    continue
+                brand_ids.add(key)
+                new_on_page += 1
+                # Promoted ads repeat across brands/pages - fetch each one once
+                if self.claim_listing(u, brand):
+                    detail_urls.append(u)
+
+            if new_on_page == 0:
+                # OLX keeps serving the last page (or promoted ads) past the end
+                logger.info(f"{brand}: page {page} brought no new listings, stopping")
+                break
+
+        return detail_urls
+
+    def scrape_brand(self, brand, num_pages):
+        """Collect listing URLs for one brand and scrape their detail pages."""
+        detail_urls = self.collect_brand_urls(brand, num_pages)
+        logger.info(f"Total detail pages to scrape for {brand}: {len(detail_urls)}")
+
+        brand_rows = []
+        for idx, u in enumerate(detail_urls, start=1):
+            dsoup = self.scrape_page(u)
+            if not dsoup:
+                continue
+            row = self.extract_car_detail_row(dsoup, u, brand)
+            if row['marca'] != brand:
+                logger.info(f"{u} was listed under {brand} but is a {row['marca']}")
+            brand_rows.append(row)
+            logger.info(f"[{brand} {idx}/{len(detail_urls)}] Scraped: {row.get('marca')} {row.get('model')} - {row.get('pret')}")
+
+        with self._lock:
+            self.rows.extend(brand_rows)
+        return len(brand_rows)
+
+    @staticmethod
+    def brand_slug(name):
+        """'Mercedes-Benz' -> 'mercedes-benz', the form of the brand queries and CSV names."""
+        return re.sub(r'\s+', '-', name.strip().lower())
+
     def extract_car_detail_row(self, soup, url, brand):
         """Extract car details into the requested fields"""
         row = {col: 'N/A' for col in self.columns}
 
-        # Asign marca based on the current brand
+        # marca comes from the ad's own parameters below: promoted ads show up
+        # under other brands' queries, and whichever brand thread claimed the
+        # ad first must not decide its make. The queried brand is the fallback.
         row['marca'] = brand
 
-
         # --- Price ---
         price_elem = soup.find('div', {'data-testid': 'ad-price-container'})
         if price_elem:
@@ -101,6 +208,8 @@ class OLXRomaniaScraper:
                         row['an fabricatie'] = value
                     elif 'cutie de viteze' in label:
                         row['cutie viteza'] = value
+                    elif label == 'marca' and value:
+                        row['marca'] = self.brand_slug(value)
         description_container = soup.find('div',{'data-cy' : 'ad_description'})
         if description_container:
             description_div = description_container.find('div', class_='css-19duwlz')
@@ -132,34 +241,16 @@ class OLXRomaniaScraper:
                 logger.error(f"Failed to save CSV for {marca}: {e}")
 
     def run(self, num_pages=20, brands=['audi', 'bmw', 'chevrolet', 'citroen', 'dacia','fiat','ford','honda','hyundai','kia','mazda','mercedes-benz','mitsubishi','nissan','opel','peugeot','porche','renault','seat','skoda','suzuki','tesla','toyota','volkswagen','volvo']):
-        # Loop through the list of brands
-        for brand in brands:
-            detail_urls = []  # Reset detail_urls for each brand
-            
-            # Scrape multiple pages for each brand
-            for page in range(1, num_pages + 1):
-                params = dict(self.base_params)
-                params['page'] = page
-                url = f"{self.base_url}{brand}"  # Generate URL for the specific brand
-                soup = self.scrape_page(url, params=params)
-                if not soup:
-                    break
-                urls = self.collect_listing_urls(soup)
-                detail_urls.extend(urls)
-                time.sleep(2)  # Sleep for 2 seconds to avoid overloading the server
-
-            detail_urls = list(dict.fromkeys(detail_urls))  # Deduplicate URLs
-            logger.info(f"Total detail pages to scrape for {brand}: {len(detail_urls)}")
-
-            # Scrape the car listings for the current brand
-            for idx, u in enumerate(detail_urls, start=1):
-                dsoup = self.scrape_page(u)
-                if not dsoup:
-                    continue
-                row = self.extract_car_detail_row(dsoup, u, brand)
-                self.rows.append(row)
-                logger.info(f"[{idx}/{len(detail_urls)}] Scraped: {row.get('marca')} {row.get('model')} - {row.get('pret')}")
-                time.sleep(2)  # Sleep to ensure the scraper doesn't overwhelm the server
+        # Brands are scraped concurrently; every request still waits on the shared rate limiter
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {brand: pool.submit(self.scrape_brand, brand, num_pages) for brand in brands}
+            for brand, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Scraping failed for {brand}: {e}")
+
+        logger.info(f"Unique listings across all brands: {len(self.seen_listings)}")
 
         # Save the data after scraping all the brands
         self.save_to_csv()
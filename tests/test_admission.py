@@ -0,0 +1,192 @@
+"""
+Admission control (backend/services/admission.py): request costing, priority
+of interactive over batch waiters, 503 on a full queue or an expired wait,
+429 from the per-client token bucket, and the middleware's early shedding.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.services.admission import (
+    BATCH,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    TokenBuckets,
+    _Waiter,
+    estimate_rows,
+    route_class,
+)
+
+
+def controller(max_rows=100, max_requests=1, max_queue=2, queue_timeout=1.0, **kwargs):
+    return AdmissionController(
+        max_rows=max_rows,
+        batch_rows_share=0.5,
+        max_requests={INTERACTIVE: max_requests, BATCH: max_requests},
+        max_queue={INTERACTIVE: max_queue, BATCH: max_queue},
+        queue_timeout=queue_timeout,
+        **kwargs,
+    )
+
+
+# ============================================================================
+# COSTING
+# ============================================================================
+
+@pytest.mark.parametrize("method, path, cls", [
+    ("POST", "/predict/", INTERACTIVE),
+    ("POST", "/predict-curve/", INTERACTIVE),
+    ("POST", "/predict-batch/columnar", BATCH),
+    ("POST", "/jobs/file", BATCH),
+    ("GET", "/predict/", None),
+    ("POST", "/health/ready", None),
+])
+def test_route_class(method, path, cls):
+    assert route_class(method, path) == cls
+
+
+def test_estimate_rows():
+    rows = json.dumps([{"marca": "audi"}, {"marca": "bmw"}, {"marca": "dacia"}]).encode()
+    columnar = json.dumps({"marca": ["audi", "bmw"], "an_fabricatie": [2016, 2019]}).encode()
+
+    assert estimate_rows("/predict/", rows) == 1
+    assert estimate_rows("/predict-batch/", rows) == 3
+    assert estimate_rows("/predict-batch/columnar", columnar) == 2
+    assert estimate_rows("/jobs", rows) == 3
+    assert estimate_rows("/jobs", columnar) == 2
+    assert estimate_rows("/jobs/file", b"marca,model\naudi,A4\nbmw,X3\ndacia,Logan\n") == 3
+
+
+# ============================================================================
+# CONTROLLER
+# ============================================================================
+
+def test_interactive_waiters_are_admitted_before_batch():
+    async def scenario():
+        admission = controller(max_rows=10)
+        await admission.acquire(BATCH, 5, "a")          # holds the batch row share
+        await admission.acquire(INTERACTIVE, 5, "a")    # fills max_rows
+
+        order = []
+
+        async def wait(cls):
+            await admission.acquire(cls, 5, "b")
+            order.append(cls)
+
+        batch = asyncio.create_task(wait(BATCH))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(wait(INTERACTIVE))
+        await asyncio.sleep(0)
+        assert admission.stats()["classes"][BATCH]["queue_depth"] == 1
+
+        admission.release(INTERACTIVE, 5, 0.01)         # room for one of them
+        await interactive
+        admission.release(BATCH, 5, 0.01)
+        await batch
+        return order
+
+    assert asyncio.run(scenario()) == [INTERACTIVE, BATCH]
+
+
+def test_expired_wait_is_rejected_with_503():
+    async def scenario():
+        admission = controller(queue_timeout=0.01)
+        await admission.acquire(INTERACTIVE, 1, "a")
+        with pytest.raises(AdmissionRejected) as info:
+            await admission.acquire(INTERACTIVE, 1, "a")
+        return admission, info.value
+
+    admission, rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason) == (503, "interactive_queue_timeout")
+    assert rejected.retry_after >= 1
+    assert admission.stats()["classes"][INTERACTIVE]["queue_depth"] == 0
+
+
+def test_full_queue_is_rejected_with_503():
+    async def scenario():
+        admission = controller(max_queue=1)
+        await admission.acquire(BATCH, 1, "a")
+        queued = asyncio.create_task(admission.acquire(BATCH, 1, "a"))
+        await asyncio.sleep(0)
+
+        admission.check_queue(INTERACTIVE)              # other classes are not affected
+        with pytest.raises(AdmissionRejected) as early:
+            admission.check_queue(BATCH)
+        with pytest.raises(AdmissionRejected) as late:
+            await admission.acquire(BATCH, 1, "a")
+
+        admission.release(BATCH, 1, 0.01)
+        await queued
+        return admission, early.value, late.value
+
+    admission, early, late = asyncio.run(scenario())
+    assert (early.status_code, early.reason) == (503, "batch_queue_full")
+    assert (late.status_code, late.reason) == (503, "batch_queue_full")
+    assert admission.stats()["shed"] == {"batch_queue_full": 2}
+
+
+def test_rate_limited_client_gets_429():
+    async def scenario():
+        admission = controller(max_requests=10, rate_limit=10, rate_burst=20)
+        await admission.acquire(BATCH, 20, "a")
+        admission.release(BATCH, 20, 0.01)
+        await admission.acquire(BATCH, 20, "b")         # buckets are per client
+        with pytest.raises(AdmissionRejected) as info:
+            await admission.acquire(BATCH, 20, "a")
+        return info.value
+
+    rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason) == (429, "rate_limited")
+    assert rejected.retry_after == 2
+
+
+def test_token_bucket_refills():
+    buckets = TokenBuckets(rate=10, burst=20)
+
+    assert buckets.take("a", 20, now=0.0) == 0
+    assert buckets.take("a", 10, now=0.0) == pytest.approx(1.0)
+    assert buckets.take("a", 10, now=1.0) == 0
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+async def echo_rows(scope, receive, send):
+    message = await receive()
+    body = json.dumps({"bytes": len(message["body"])}).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def test_middleware_passes_admitted_requests_and_rejects_large_bodies():
+    admission = controller()
+    client = TestClient(AdmissionMiddleware(echo_rows, controller=admission, max_body_bytes=1000))
+
+    ok = client.post("/predict-batch/", json=[{"marca": "audi"}])
+    assert ok.status_code == 200 and ok.json()["bytes"] > 0
+    assert admission.stats()["classes"][BATCH]["admitted"] == 1
+    assert admission.stats()["classes"][BATCH]["in_flight"] == 0
+
+    too_large = client.post("/predict-batch/", content=b"[" + b" " * 2000 + b"]")
+    assert too_large.status_code == 413
+    assert too_large.json()["reason"] == "body_too_large"
+
+
+def test_middleware_sheds_before_reading_the_body_when_the_queue_is_full():
+    admission = controller(max_queue=1)
+    loop = asyncio.new_event_loop()
+    admission.waiters.append(_Waiter(BATCH, 1, 0, loop.create_future()))   # one batch request already waiting
+    client = TestClient(AdmissionMiddleware(echo_rows, controller=admission, max_body_bytes=1000))
+
+    response = client.post("/jobs", json={"marca": ["audi"]})
+    assert response.status_code == 503
+    assert response.json()["reason"] == "batch_queue_full"
+    assert "retry-after" in response.headers
+    assert client.post("/predict/", json={"marca": "audi"}).status_code == 200
+    loop.close()
@@ -0,0 +1,112 @@
+"""
+Columnar batches (backend/services/columnar.py): validation against the
+CarPredictionRequest constraints, and the same prices as the row format.
+
+The parity test uses settings.model_path (MODEL_PATH) and is skipped when
+the model is missing.
+"""
+
+import os
+import time
+
+import pytest
+
+from backend.config import settings
+from backend.services.columnar import ColumnarError, parse_columnar
+
+CARS = [
+    {"marca": "audi", "model": "A4", "an_fabricatie": 2016, "rulaj": 150_000, "putere": 150,
+     "capacitate_motor": 1968, "combustibil": "Diesel", "caroserie": "Sedan", "culoare": "Negru",
+     "cutie_viteza": "Automata"},
+    {"marca": "dacia", "model": "Logan", "an_fabricatie": 2012, "rulaj": 210_000, "putere": 75,
+     "capacitate_motor": 1461, "combustibil": "Diesel", "caroserie": "Sedan", "culoare": "Alb",
+     "cutie_viteza": "Manuala", "descriere": "Un singur proprietar, revizii la zi."},
+    {"marca": "bmw", "model": "X3", "an_fabricatie": 2019, "rulaj": 80_000, "putere": 190,
+     "capacitate_motor": 1995, "combustibil": "Diesel", "caroserie": "SUV", "culoare": "Gri",
+     "cutie_viteza": "Automata"},
+]
+
+
+def columnar(cars=CARS):
+    fields = list(dict.fromkeys(name for car in cars for name in car))
+    return {name: [car.get(name) for car in cars] for name in fields}
+
+
+def errors_of(payload, **kwargs):
+    with pytest.raises(ColumnarError) as info:
+        parse_columnar(payload, **kwargs)
+    return info.value.errors
+
+
+def test_valid_payload():
+    columns, n_rows = parse_columnar(columnar())
+
+    assert n_rows == len(CARS)
+    assert columns["an_fabricatie"].tolist() == [2016, 2012, 2019]
+    assert columns["descriere"] == [None, "Un singur proprietar, revizii la zi.", None]
+
+
+@pytest.mark.parametrize("payload, message", [
+    ([1, 2], "body must be a JSON object of arrays"),
+    ({**columnar(), "vin": ["x", "y", "z"]}, "unknown column(s)"),
+    ({k: v for k, v in columnar().items() if k != "marca"}, "missing column(s)"),
+    ({**columnar(), "marca": "audi"}, "must be arrays"),
+    ({**columnar(), "marca": ["audi"]}, "columns have different lengths"),
+    ({name: [] for name in columnar()}, "no rows"),
+])
+def test_structural_errors(payload, message):
+    assert any(message in e["error"] for e in errors_of(payload))
+
+
+def test_too_many_rows():
+    assert "at most 2 rows" in errors_of(columnar(), max_rows=2)[0]["error"]
+
+
+@pytest.mark.parametrize("column, values, message, rows", [
+    ("an_fabricatie", [2016, 1990, 2030], "must be >= 2000", [1]),
+    ("an_fabricatie", [2016, 2012, 2026], "must be <= 2025", [2]),
+    ("an_fabricatie", [2016, 2012.5, 2019], "must be integers", [1]),
+    ("putere", [150, 0, 190], "must be > 0", [1]),
+    ("rulaj", [1, "mult", 3], "must contain only numbers", [1]),
+    ("rulaj", [1, float("nan"), 3], "must be finite numbers", [1]),
+    ("marca", ["audi", None, 3], "must contain only strings", [1, 2]),
+    ("descriere", [None, "x" * 20_001, None], "must be at most 20000 characters", [1]),
+])
+def test_column_errors_name_the_rows(column, values, message, rows):
+    errors = errors_of({**columnar(), column: values})
+
+    error = next(e for e in errors if e["column"] == column)
+    assert error["error"] == message
+    assert error["rows"] == rows
+
+
+def test_errors_of_all_columns_are_reported_together():
+    errors = errors_of({**columnar(), "an_fabricatie": [1990, 2012, 2019], "putere": [-1, 75, 190]})
+
+    assert {e["column"] for e in errors} == {"an_fabricatie", "putere"}
+
+
+def test_columnar_prices_match_the_row_format():
+    if not os.path.exists(settings.model_path):
+        pytest.skip(f"no model at {settings.model_path}")
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 60
+        while client.get("/health/ready").status_code != 200:
+            if time.monotonic() > deadline:
+                pytest.fail("the API did not become ready")
+            time.sleep(0.1)
+
+        rows = client.post("/predict-batch/", json=CARS)
+        columns = client.post("/predict-batch/columnar", json=columnar())
+
+    assert rows.status_code == 200, rows.text
+    assert columns.status_code == 200, columns.text
+    by_row = [p["prediction"] for p in rows.json()["predictions"]]
+    by_column = columns.json()
+    assert by_column["count"] == len(CARS)
+    for field in ("predicted", "min_price", "max_price", "margin"):
+        assert by_column[field] == pytest.approx([p[field] for p in by_row]), field
@@ -0,0 +1,99 @@
+"""
+MinHash / LSH near-duplicate detection (prediction_models/dedup.py) on small
+synthetic listings: reposts are clustered, different cars are not.
+"""
+
+import numpy as np
+import pandas as pd
+
+from prediction_models.dedup import (
+    cluster_labels,
+    confirm_pairs,
+    drop_duplicates,
+    find_duplicates,
+    lsh_candidate_pairs,
+    minhash_signatures,
+)
+
+DESCRIPTION = (
+    "Vand Audi A4 in stare foarte buna, revizie facuta la zi, carte service, "
+    "jante aliaj, navigatie, senzori parcare, climatronic, scaune incalzite."
+)
+
+
+def listing(marca="audi", model="A4", year=2015, mileage=180_000, power=150, price=12_500, text=DESCRIPTION):
+    return {
+        "marca": marca, "model": model, "an fabricatie": year, "rulaj": mileage,
+        "putere": power, "pret": price, "descriere": text,
+    }
+
+
+def listings() -> pd.DataFrame:
+    return pd.DataFrame([
+        listing(),                                                   # 0
+        listing(marca="bmw", text=DESCRIPTION + " Pret negociabil."),  # 1: repost of 0 under another brand
+        listing(mileage=180_500, price=12_300),                      # 2: repost of 0, specs within tolerance
+        listing(model="Golf", marca="volkswagen", year=2012, mileage=220_000, power=105, price=7_000,
+                text="Golf 6 diesel, proprietar, fara accidente, inmatriculat recent in Romania."),  # 3
+        listing(price=19_000),                                       # 4: same text, price too far apart
+        listing(year=2018),                                          # 5: same text, another year
+    ])
+
+
+def test_signatures_are_deterministic_and_chunk_independent():
+    df = listings()
+    whole = minhash_signatures(df, num_perm=64)
+    chunked = minhash_signatures(df, num_perm=64, chunk_size=2)
+
+    assert whole.shape == (len(df), 64)
+    np.testing.assert_array_equal(whole, chunked)
+    np.testing.assert_array_equal(whole, minhash_signatures(df, num_perm=64))
+
+
+def test_lsh_pairs_reposts_and_not_unrelated_listings():
+    signatures = minhash_signatures(listings())
+    pairs = {tuple(p) for p in lsh_candidate_pairs(signatures).tolist()}
+
+    assert (0, 2) in pairs
+    assert all(i < j for i, j in pairs)
+    assert not any(3 in p for p in pairs)
+
+
+def test_large_buckets_are_chained():
+    signatures = np.zeros((6, 16), dtype=np.uint32)   # every row in every bucket
+    pairs = lsh_candidate_pairs(signatures, bands=4, max_bucket_pairs=3)
+
+    assert pairs.tolist() == [[0, 1], [1, 2], [2, 3], [3, 4], [4, 5]]
+
+
+def test_confirm_requires_compatible_specs():
+    df = listings()
+    signatures = minhash_signatures(df)
+    candidates = np.array([[0, 2], [0, 4], [0, 5]])
+    confirmed, similarity = confirm_pairs(df, signatures, candidates, threshold=0.5)
+
+    assert confirmed.tolist() == [[0, 2]]
+    assert len(similarity) == 1 and 0.5 <= similarity[0] <= 1.0
+
+
+def test_clusters_are_connected_components():
+    labels = cluster_labels(5, np.array([[0, 1], [1, 3]]))
+
+    assert labels[0] == labels[1] == labels[3]
+    assert len({labels[0], labels[2], labels[4]}) == 3
+
+
+def test_find_and_drop_duplicates():
+    df = listings()
+    clusters, report = find_duplicates(df)
+
+    cluster_of = clusters.set_index("position")["cluster"]
+    assert cluster_of[0] == cluster_of[1] == cluster_of[2]
+    assert len({cluster_of[0], cluster_of[3], cluster_of[4], cluster_of[5]}) == 4
+    assert report["duplicates_removed"] == 2
+    assert report["cross_brand_clusters"] == 1
+
+    # The longest description of the cluster is kept
+    deduplicated, _ = drop_duplicates(df)
+    assert len(deduplicated) == 4
+    assert deduplicated["marca"].tolist() == ["bmw", "volkswagen", "audi", "audi"]
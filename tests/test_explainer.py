@@ -0,0 +1,97 @@
+"""
+Path contributions (backend/services/explainer.py) add up to the model:
+bias + sum(contributions) == predict, for forests and gradient boosting, and
+the EUR amounts of explain_row add up to the quoted price.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from backend.services.explainer import TreeExplainer, explain_row
+
+
+def frame(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "marca": rng.choice(["audi", "bmw", "dacia", "skoda"], n),
+        "combustibil": rng.choice(["Diesel", "Benzina"], n),
+        "an_fabricatie": rng.integers(2005, 2024, n).astype(float),
+        "rulaj": rng.uniform(5_000, 300_000, n),
+        "putere": rng.uniform(70, 300, n),
+    })
+
+
+def target(X: pd.DataFrame) -> np.ndarray:
+    premium = X["marca"].isin(["audi", "bmw"]).to_numpy()
+    return (
+        8.5 + 0.08 * (X["an_fabricatie"] - 2005) - X["rulaj"] / 400_000
+        + X["putere"] / 500 + 0.4 * premium
+    ).to_numpy()
+
+
+def pipeline(estimator) -> Pipeline:
+    preprocessor = ColumnTransformer(
+        [
+            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), ["marca", "combustibil"]),
+            ("num", "passthrough", ["an_fabricatie", "rulaj", "putere"]),
+        ],
+        sparse_threshold=0,
+    )
+    X = frame()
+    return Pipeline([("preprocessor", preprocessor), ("model", estimator)]).fit(X, target(X))
+
+
+ESTIMATORS = {
+    "random_forest": lambda: RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0),
+    "hist_gradient_boosting": lambda: HistGradientBoostingRegressor(max_iter=50, random_state=0),
+}
+
+
+@pytest.mark.parametrize("name", list(ESTIMATORS))
+def test_bias_plus_contributions_equals_predict(name):
+    model = pipeline(ESTIMATORS[name]())
+    X = frame(n=100, seed=1)
+    result = TreeExplainer(model).explain_frame(X)
+
+    assert result["contributions"].shape == (len(X), len(result["features"]))
+    np.testing.assert_allclose(
+        result["bias"] + result["contributions"].sum(axis=1), model.predict(X), rtol=0, atol=1e-9
+    )
+    np.testing.assert_allclose(result["predictions"], model.predict(X), rtol=0, atol=1e-9)
+
+
+def test_missing_values_follow_the_learned_direction():
+    X = frame()
+    X.loc[::7, "rulaj"] = np.nan
+    preprocessor = ColumnTransformer(
+        [("num", "passthrough", ["an_fabricatie", "rulaj", "putere"])], sparse_threshold=0
+    )
+    model = Pipeline([
+        ("preprocessor", preprocessor),
+        ("model", HistGradientBoostingRegressor(max_iter=30, random_state=0)),
+    ]).fit(X, np.nan_to_num(target(X.fillna(100_000))))
+
+    result = TreeExplainer(model).explain_frame(X.iloc[:50])
+    np.testing.assert_allclose(result["predictions"], model.predict(X.iloc[:50]), rtol=0, atol=1e-9)
+
+
+def test_explain_row_eur_adds_up_to_the_quoted_price():
+    model = pipeline(ESTIMATORS["random_forest"]())
+    row = frame(n=1, seed=2)
+    explanation = explain_row(TreeExplainer(model), row)
+
+    assert explanation["predicted"] == float(int(np.expm1(model.predict(row)[0])))
+    total = explanation["base_price"] + sum(c["eur"] for c in explanation["contributions"])
+    assert total == pytest.approx(explanation["predicted"], abs=1e-6)
+    assert {c["field"] for c in explanation["contributions"]} <= set(row.columns)
+
+
+def test_unsupported_estimator_is_rejected():
+    with pytest.raises(ValueError, match="not supported"):
+        TreeExplainer(pipeline(LinearRegression()))
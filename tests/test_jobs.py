@@ -0,0 +1,123 @@
+"""
+Batch job queue (backend/services/jobs.py): leases, requeueing of orphaned
+jobs, cancellation and result expiry, on a throwaway JobStore. Scoring is
+replaced by a stub, so no model is needed.
+"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from backend.services import jobs
+from backend.services.jobs import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_EXPIRED,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    JobStore,
+    LeaseLost,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs"))
+
+
+def submit(store, n_rows=3):
+    return store.submit({"rulaj": list(range(n_rows))}, n_rows)
+
+
+def test_claim_takes_the_oldest_job_under_a_new_attempt(store):
+    first, second = submit(store), submit(store)
+
+    job = store.claim(worker_pid=1)
+    assert job["id"] == first
+    assert job["status"] == STATUS_RUNNING and job["attempt"] == 1
+    assert store.claim(worker_pid=2)["id"] == second
+    assert store.claim(worker_pid=3) is None
+
+
+def test_orphaned_job_is_requeued_and_the_old_attempt_loses_its_lease(store):
+    job_id = submit(store)
+    old = store.claim(worker_pid=1)
+    open(store.tmp_result_path(job_id, old["attempt"]), "w").close()
+
+    assert store.requeue_orphans(lease_seconds=0) == 1
+    assert store.get(job_id)["status"] == STATUS_QUEUED
+    assert not os.path.exists(store.tmp_result_path(job_id, old["attempt"]))
+
+    new = store.claim(worker_pid=2)
+    assert new["attempt"] == 2
+    with pytest.raises(LeaseLost):
+        store.progress(job_id, old["attempt"], 1)
+    assert not store.finish(job_id, STATUS_DONE, attempt=old["attempt"])
+
+    assert store.progress(job_id, new["attempt"], 1)
+    assert store.finish(job_id, STATUS_DONE, attempt=new["attempt"])
+    assert store.get(job_id)["status"] == STATUS_DONE
+
+
+def test_live_lease_is_not_requeued(store):
+    submit(store)
+    store.claim(worker_pid=1)
+
+    assert store.requeue_orphans(lease_seconds=60) == 0
+
+
+def test_cancel_queued_and_running_jobs(store):
+    running, queued = submit(store), submit(store)
+    job = store.claim(worker_pid=1)
+
+    assert store.cancel(queued) == STATUS_CANCELLED
+    assert not os.path.exists(os.path.join(store.inputs_dir, f"{queued}.json"))
+
+    # A running job is only flagged; its worker stops at the next progress call
+    assert store.cancel(running) == STATUS_RUNNING
+    assert store.progress(running, job["attempt"], 1) is False
+    assert store.cancel("missing") is None
+
+
+def test_expired_results_are_deleted(store, tmp_path):
+    job_id = submit(store)
+    job = store.claim(worker_pid=1)
+    result_path = str(tmp_path / "result.csv")
+    open(result_path, "w").close()
+    store.finish(job_id, STATUS_DONE, result_path=result_path, ttl_seconds=3600, attempt=job["attempt"])
+
+    assert store.expire() == 0
+    assert store.expire(now=time.time() + 7200) == 1
+    assert store.get(job_id)["status"] == STATUS_EXPIRED
+    assert store.get(job_id)["result_path"] is None
+    assert not os.path.exists(result_path)
+
+
+def stub_scores(columns, start, end):
+    return pd.DataFrame({"rulaj": columns["rulaj"][start:end], "predicted": 1.0})
+
+
+def test_run_job_scores_every_chunk(store, monkeypatch):
+    monkeypatch.setattr(jobs, "score_chunk", stub_scores)
+    job_id = submit(store, n_rows=5)
+
+    assert jobs.run_job(store, store.claim(worker_pid=1), ttl_seconds=60, chunk_size=2) == STATUS_DONE
+    job = store.get(job_id)
+    assert job["processed"] == 5
+    assert pd.read_csv(job["result_path"])["rulaj"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_run_job_drops_its_result_when_the_lease_is_lost(store, monkeypatch):
+    def requeue_midway(columns, start, end):
+        store.requeue_orphans(lease_seconds=-1)
+        return stub_scores(columns, start, end)
+
+    monkeypatch.setattr(jobs, "score_chunk", requeue_midway)
+    job_id = submit(store, n_rows=5)
+    job = store.claim(worker_pid=1)
+
+    assert jobs.run_job(store, job, ttl_seconds=60, chunk_size=2) == STATUS_QUEUED
+    assert store.get(job_id)["status"] == STATUS_QUEUED
+    assert not os.listdir(store.results_dir)
@@ -0,0 +1,43 @@
+"""
+The ONNX export of the serving model predicts what the sklearn Pipeline does.
+
+Uses settings.model_path (MODEL_PATH) and the feature store built from
+carData/; skipped when the model, the data or skl2onnx / onnxruntime are
+missing.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxruntime")
+
+import joblib  # noqa: E402
+from skl2onnx.common.exceptions import MissingConverter, MissingShapeCalculator  # noqa: E402
+
+from backend.config import settings  # noqa: E402
+from prediction_models.config import CAR_DATA_DIR, REPO_ROOT  # noqa: E402
+from prediction_models.export_onnx import PARITY_TOLERANCE, check_parity, convert, held_out_features  # noqa: E402
+
+
+def test_onnx_export_matches_sklearn(tmp_path):
+    if not os.path.exists(settings.model_path):
+        pytest.skip(f"no model at {settings.model_path}")
+    if not any(CAR_DATA_DIR.glob("*.csv")):
+        pytest.skip(f"no listings in {CAR_DATA_DIR}")
+
+    model_path = Path(settings.model_path)
+    pipeline = joblib.load(model_path)
+    X_test = held_out_features(pipeline, model_path.parent / "metadata" / f"{model_path.stem}_metadata.json")
+    try:
+        onx = convert(pipeline, X_test, os.path.relpath(model_path, REPO_ROOT))
+    except (MissingConverter, MissingShapeCalculator) as e:
+        pytest.skip(f"model has no ONNX conversion: {str(e).splitlines()[0][:200]}")
+
+    onnx_path = tmp_path / "model.onnx"
+    onnx_path.write_bytes(onx.SerializeToString())
+
+    checks = check_parity(pipeline, onnx_path, X_test)
+    assert checks["max_abs_log_diff"] <= PARITY_TOLERANCE, checks
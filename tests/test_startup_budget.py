@@ -0,0 +1,15 @@
+"""
+Importing the API stays within settings.startup_budget_seconds and does not
+pull in numpy / pandas / sklearn / scipy / joblib (see backend/startup_profile.py).
+"""
+
+import pytest
+
+from backend import startup_profile
+
+
+def test_cold_start_within_budget():
+    try:
+        startup_profile.main(["--runs", "1", "--top", "0"])
+    except SystemExit as e:
+        pytest.fail(f"startup_profile failed (exit status {e.code}); see its output above")